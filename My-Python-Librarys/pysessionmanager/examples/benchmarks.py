@@ -0,0 +1,503 @@
+import datetime
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from pysessionmanager import (KeyRing, LogBuffer, PasswordHasher, Session, SessionManager, SessionTokens,
+                              ShardedSessionManager, SharedSessionManager, TieredSessionManager)
+
+SIZES = [10**4, 10**5, 10**6]
+
+
+def fill(manager: SessionManager, size: int):
+    for i in range(size):
+        manager.create(unick_name=f"user{i}")
+
+
+def timed(func, repeat: int = 1000) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_name_lookup(size: int):
+    """Name lookup through the index against the old linear scan over all sessions."""
+    manager = SessionManager("bench")
+    fill(manager, size)
+    name = f"user{size - 1}"
+
+    def linear_scan():
+        for session_id, session in manager.sessions.items():
+            if session["unick_name"] == name:
+                return session_id
+
+    indexed = timed(lambda: manager.get_with_unick_name(name))
+    scanned = timed(linear_scan, repeat=10)
+    print(f"name lookup  n={size:>8}  index={indexed * 1e6:8.2f}us  scan={scanned * 1e6:10.2f}us  "
+          f"gain={scanned / indexed:8.0f}x")
+
+
+def bench_expiry(size: int):
+    """expire_due() with nothing due against the old per-session scan in get_all()."""
+    manager = SessionManager("bench")
+    fill(manager, size)
+
+    def full_scan():
+        for session in manager.sessions.values():
+            if session["end_time"] < datetime.datetime.now():
+                pass
+
+    heap = timed(manager.expire_due)
+    scanned = timed(full_scan, repeat=3)
+    print(f"expiry check n={size:>8}  heap={heap * 1e6:9.2f}us  scan={scanned * 1e6:10.2f}us  "
+          f"gain={scanned / heap:8.0f}x")
+
+
+def bench_sqlite_save(size: int, changes: int = 100):
+    """Full SQLite rewrite against an incremental save after a few changes."""
+    manager = SessionManager("bench")
+    fill(manager, size)
+    db = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+    full = timed(lambda: manager.save_sqlite(db, full=True), repeat=1)
+    for i in range(changes):
+        manager.create(unick_name=f"extra{i}")
+    incremental = timed(lambda: manager.save_sqlite(db), repeat=1)
+    print(f"sqlite save  n={size:>8}  incremental({changes})={incremental * 1e3:8.2f}ms  "
+          f"full={full * 1e3:10.2f}ms")
+
+
+def bench_memory(size: int):
+    """Bytes per session for the old 6-key dict with datetimes against the Session record."""
+    def measure(build) -> float:
+        tracemalloc.start()
+        table = [build(i) for i in range(size)]
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del table
+        return used / size
+
+    now = datetime.datetime.now()
+    as_dict = measure(lambda i: {
+        "unick_name": f"user{i}",
+        "start_time": now + datetime.timedelta(microseconds=i),
+        "end_time": now + datetime.timedelta(seconds=3600, microseconds=i),
+        "protected": False,
+        "password": None,
+        "value": None,
+    })
+    epoch = now.timestamp()
+    as_record = measure(lambda i: Session(f"user{i}", epoch + i * 1e-6, epoch + 3600 + i * 1e-6))
+    print(f"memory       n={size:>8}  dict={as_dict:7.0f}B/session  Session={as_record:7.0f}B/session")
+
+
+def bench_pagination(size: int, batch_size: int = 1000):
+    """get_all() against iter_sessions(): time to the first page, time for all pages and peak extra memory."""
+    manager = SessionManager("bench")
+    manager.debug = False
+    manager.create_many([f"user{i}" for i in range(size)])
+
+    def measure(run) -> Tuple[float, float, float]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        first = run()
+        total = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return first - start, total, peak
+
+    def all_at_once() -> float:
+        sessions, _, _ = manager.get_all()
+        first = time.perf_counter()
+        del sessions
+        return first
+
+    def paged() -> float:
+        pages = manager.iter_sessions(batch_size=batch_size)
+        next(pages)
+        first = time.perf_counter()
+        for _ in pages:
+            pass
+        return first
+
+    (copy_first, copy_total, copy_peak), (page_first, page_total, page_peak) = measure(all_at_once), measure(paged)
+    print(f"pagination   n={size:>8}  get_all: first={copy_first * 1e3:8.2f}ms all={copy_total * 1e3:8.1f}ms "
+          f"peak={copy_peak / 2**20:7.1f}MB  iter_sessions({batch_size}): first={page_first * 1e3:6.2f}ms "
+          f"all={page_total * 1e3:7.1f}ms peak={page_peak / 2**20:5.2f}MB")
+
+
+def bench_threads(size: int, workers: int = 8, shards: int = 16):
+    """create/get/remove churn from a thread pool against one ShardedSessionManager."""
+    manager = ShardedSessionManager("bench", shards=shards)
+    per_worker = size // workers
+
+    def churn(worker: int):
+        kept = []
+        for i in range(per_worker):
+            session_id = manager.create(unick_name=f"w{worker}-{i}")
+            manager.get(session_id)
+            if i % 2:
+                manager.remove(session_id)
+            else:
+                kept.append(session_id)
+        return kept
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        kept = [session_id for ids in pool.map(churn, range(workers)) for session_id in ids]
+    elapsed = time.perf_counter() - start
+    consistent = len(manager) == len(kept) == len(manager.names) and all(manager.get(i) for i in kept)
+    print(f"threads      n={size:>8}  workers={workers} shards={shards}  "
+          f"{per_worker * workers / elapsed:10.0f} ops/s  consistent={consistent}")
+
+
+def bench_debug_log(size: int):
+    """is_active() with debug logging: old unbounded f-string list vs bounded LogBuffer, with and without sampling."""
+    manager = SessionManager("bench")
+    fill(manager, size)
+    session_ids = list(manager.sessions)
+
+    def run(logs) -> tuple:
+        manager.logs["debug"] = logs
+        tracemalloc.start()
+        start = time.perf_counter()
+        for session_id in session_ids:
+            manager.is_active(session_id)
+        elapsed = time.perf_counter() - start
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return elapsed / size * 1e9, retained / 1024
+
+    class OldList(list):
+        def append(self, message, *args):
+            super().append(message % args)
+
+    results = [run(OldList()), run(LogBuffer(1000)), run(LogBuffer(1000, 0.01))]
+    print(f"debug log    n={size:>8}  " + "  ".join(
+        f"{label}={ns:5.0f}ns {kb:8.0f}KiB" for label, (ns, kb) in zip(("list", "ring", "ring@1%"), results)))
+
+
+def bench_metrics(size: int, repeat: int = 100_000):
+    """get() cost with metrics disabled and enabled."""
+    manager = SessionManager("bench")
+    manager.debug = False
+    fill(manager, size)
+    session_id = next(iter(manager.sessions))
+    disabled = timed(lambda: manager.get(session_id), repeat)
+    manager.enable_metrics()
+    enabled = timed(lambda: manager.get(session_id), repeat)
+    manager.disable_metrics()
+    disabled_again = timed(lambda: manager.get(session_id), repeat)
+    print(f"metrics      n={size:>8}  disabled={disabled * 1e9:5.0f}ns  enabled={enabled * 1e9:5.0f}ns  "
+          f"disabled again={disabled_again * 1e9:5.0f}ns")
+
+
+def bench_eviction(size: int):
+    """create() cost with no limit and at a full max_sessions=size/2 under each eviction policy."""
+    results = []
+    for policy in (None, "lru", "lfu", "expiry"):
+        manager = SessionManager("bench", max_sessions=size // 2 if policy else None, eviction=policy or "lru")
+        manager.debug = False
+        start = time.perf_counter()
+        fill(manager, size)
+        results.append((policy or "unbounded", (time.perf_counter() - start) / size * 1e6, len(manager.sessions)))
+    print(f"eviction     n={size:>8}  " + "  ".join(f"{name}={us:5.2f}us ({kept})" for name, us, kept in results))
+
+
+def bench_sliding(size: int, repeat: int = 100_000):
+    """get() with and without sliding expiration, and journal bytes written by renewals per coalescing window."""
+    results = []
+    for auto_renew in (False, True):
+        manager = SessionManager("bench", auto_renew=auto_renew)
+        manager.debug = False
+        fill(manager, size)
+        session_id = next(iter(manager.sessions))
+        results.append(timed(lambda: manager.get(session_id), repeat))
+    written = []
+    with tempfile.TemporaryDirectory() as directory:
+        for touch_interval in (0.0, 1.0):
+            manager = SessionManager("bench", auto_renew=True, touch_interval=touch_interval)
+            manager.debug = False
+            path = os.path.join(directory, f"sliding{touch_interval}.journal")
+            manager.enable_journal(path, os.path.join(directory, f"sliding{touch_interval}.jsonl"), fsync="never")
+            ids = [manager.create(unick_name=f"user{i}") for i in range(min(size, 1000))]
+            before = os.path.getsize(path)
+            timed(lambda: manager.get(random.choice(ids)), repeat)
+            manager.flush_touches()
+            written.append(os.path.getsize(path) - before)
+            manager.close()
+    print(f"sliding      n={size:>8}  get={results[0] * 1e6:6.2f}us  renewing get={results[1] * 1e6:6.2f}us  "
+          f"journal: every touch={written[0] / 1024:8.0f}KB  coalesced 1s={written[1] / 1024:6.0f}KB")
+
+
+def bench_bulk(size: int, journal_size: int = 2000):
+    """create()/remove() loops against create_many()/remove_many(), in memory and with an fsync-always journal."""
+    def run(count: int, directory: Optional[str], bulk: bool) -> Tuple[float, float]:
+        manager = SessionManager("bench")
+        manager.debug = False
+        if directory:
+            manager.enable_journal(os.path.join(directory, f"bulk{bulk}.journal"),
+                                   os.path.join(directory, f"bulk{bulk}.jsonl"))
+        names = [f"user{i}" for i in range(count)]
+        start = time.perf_counter()
+        ids = manager.create_many(names) if bulk else [manager.create(unick_name=name) for name in names]
+        created = time.perf_counter() - start
+        start = time.perf_counter()
+        if bulk:
+            manager.remove_many(ids)
+        else:
+            for session_id in ids:
+                manager.remove(session_id)
+        removed = time.perf_counter() - start
+        manager.close()
+        return created / count * 1e6, removed / count * 1e6
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label, count, target in (("memory", size, None), ("journal", min(size, journal_size), directory)):
+            (loop_create, loop_remove), (bulk_create, bulk_remove) = run(count, target, False), run(count, target, True)
+            print(f"bulk {label:<7} n={count:>8}  create {loop_create:8.2f} -> {bulk_create:6.2f}us  "
+                  f"remove {loop_remove:8.2f} -> {bulk_remove:6.2f}us per session")
+
+
+def bench_lazy(size: int, value_bytes: int = 4096, repeat: int = 1000):
+    """load_sqlite() eager against lazy with ~4 KB values: load time, peak memory, first and cached get_value()."""
+    with tempfile.TemporaryDirectory() as directory:
+        db = os.path.join(directory, "lazy.db")
+        manager = SessionManager("bench")
+        manager.debug = False
+        ids = manager.create_many([{"unick_name": f"user{i}", "value": f"{i:08d}" * (value_bytes // 8)}
+                                   for i in range(size)])
+        manager.save_sqlite(db, full=True)
+        manager.close()
+        results = []
+        for lazy in (False, True):
+            loader = SessionManager("bench")
+            loader.debug = False
+            tracemalloc.start()
+            start = time.perf_counter()
+            loader.load_sqlite(db, lazy=lazy)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results.append((elapsed, peak))
+            if lazy:
+                sample = ids[:min(repeat, size)]
+                cold = iter(sample)
+                first = timed(lambda: loader.get_value(next(cold)), len(sample))
+                warm = iter(sample)
+                cached = timed(lambda: loader.get_value(next(warm)), len(sample))
+            loader.close()
+    (eager_time, eager_peak), (lazy_time, lazy_peak) = results
+    print(f"lazy load    n={size:>8}  eager={eager_time * 1e3:8.1f}ms {eager_peak / 2**20:7.1f}MB  "
+          f"lazy={lazy_time * 1e3:8.1f}ms {lazy_peak / 2**20:7.1f}MB  "
+          f"get_value first={first * 1e6:6.2f}us cached={cached * 1e6:5.2f}us")
+
+
+def bench_compression(size: int, items: int = 40, repeat: int = 2000):
+    """Stored value size and create()/get_value() cost per op for ~3 KB JSON carts, raw against zlib and lzma."""
+    rng = random.Random(0)
+    carts = [json.dumps([{"sku": f"SKU-{rng.randrange(10**5):05d}", "qty": rng.randint(1, 5),
+                          "price": f"{rng.uniform(1, 100):.2f}", "name": rng.choice(("t-shirt", "mug", "poster"))}
+                         for _ in range(items)]) for _ in range(min(size, repeat))]
+    raw_bytes = sum(len(cart) for cart in carts)
+    results = {}
+    for codec in (None, "zlib", "lzma"):
+        manager = SessionManager("bench")
+        manager.debug = False
+        if codec:
+            manager.enable_compression(codec)
+        cart = iter(enumerate(carts))
+
+        def create_one():
+            i, value = next(cart)
+            manager.create(f"user{i}", value=value)
+
+        create = timed(create_one, len(carts))
+        ids = list(manager.sessions)
+        stored = sum(len(session.value) for session in manager.sessions.values())
+        session_id = iter(ids)
+        get = timed(lambda: manager.get_value(next(session_id)), len(ids))
+        results[codec or "raw"] = (raw_bytes / stored, create, get)
+    print(f"compression  cart={raw_bytes // len(carts)}B  " + "  ".join(
+        f"{name}: ratio={ratio:4.2f} create={create * 1e6:6.1f}us get_value={get * 1e6:6.1f}us"
+        for name, (ratio, create, get) in results.items()))
+
+
+def bench_structured(size: int, items: int = 20, repeat: int = 5000):
+    """Dict values: json.dumps/loads around str values (today's path) against marshal and pickle 5 serialization."""
+    rng = random.Random(0)
+    carts = [{"user": i, "items": [{"sku": rng.randrange(10**5), "qty": rng.randint(1, 5),
+                                    "price": round(rng.uniform(1, 100), 2)} for _ in range(items)],
+              "token": os.urandom(32)} for i in range(min(size, repeat))]
+    managers = {}
+    for mode in ("json", "marshal", "pickle"):
+        manager = managers[mode] = SessionManager("bench")
+        manager.debug = False
+        if mode == "json":
+            read = lambda session_id: json.loads(manager.get_value(session_id))
+        else:
+            manager.enable_serialization(mode)
+            read = manager.get_value
+        start = time.perf_counter()
+        values = [json.dumps({**cart, "token": cart["token"].hex()}) for cart in carts] if mode == "json" else carts
+        ids = [manager.create(f"user{i}", value=value) for i, value in enumerate(values)]
+        create = (time.perf_counter() - start) / len(carts)
+        start = time.perf_counter()
+        for session_id in ids:
+            read(session_id)
+        get = (time.perf_counter() - start) / len(carts)
+        stored = sum(len(session.value) for session in manager.sessions.values()) / len(carts)
+        print(f"structured   {mode:<8} n={len(carts):>8}  create={create * 1e6:6.2f}us  get_value={get * 1e6:6.2f}us  "
+              f"value={stored:6.0f}B")
+    with tempfile.TemporaryDirectory() as directory:
+        saves = {mode: timed(lambda: manager.save_sqlite(os.path.join(directory, f"{mode}.db"), full=True), 1)
+                 for mode, manager in managers.items()}
+    print("structured   save_sqlite  " + "  ".join(f"{mode}={save * 1e3:6.1f}ms" for mode, save in saves.items()))
+
+
+
+def bench_encryption(size: int, value_bytes: int = 100):
+    """Per-value AES-GCM cost, and a plain JSON-lines snapshot against an encrypted one (save and load)."""
+    manager = SessionManager("bench")
+    manager.debug = False
+    manager.create_many([f"user{i}" for i in range(size)], value="x" * value_bytes)
+    start = time.perf_counter()
+    manager.enable_encryption(KeyRing())
+    encrypt = (time.perf_counter() - start) / size
+    session_id = next(iter(manager.sessions))
+    get = timed(lambda: manager.get_value(session_id))
+    with tempfile.TemporaryDirectory() as directory:
+        timings = {}
+        for name in ("sessions.jsonl", "sessions.jsonl.enc"):
+            path = os.path.join(directory, name)
+            save = timed(lambda: manager.save(path), 1)
+            load = timed(lambda: manager.load(path), 1)
+            timings[name.rpartition(".")[2]] = (save, load, os.path.getsize(path))
+    print(f"encryption   n={size:>8}  encrypt={encrypt * 1e6:6.2f}us/value  get_value={get * 1e6:6.2f}us  " +
+          "  ".join(f"{ext}: save={save * 1e3:7.1f}ms load={load * 1e3:7.1f}ms size={nbytes / 2**20:6.1f}MB"
+                    for ext, (save, load, nbytes) in timings.items()))
+
+def bench_tiered(size: int, repeat: int = 10_000):
+    """get() on an L1 hit and on an L1 miss read through from SQLite, with an L1 of size/10 sessions."""
+    l1_size = size // 10
+    with tempfile.TemporaryDirectory() as directory:
+        manager = TieredSessionManager("bench", os.path.join(directory, "tiered.db"), l1_size=l1_size)
+        manager.debug = False
+        ids = [manager.create(unick_name=f"user{i}") for i in range(size)]
+        manager.flush()
+        hot = ids[-1]
+        hit = timed(lambda: manager.get(hot), repeat)
+        cold = iter(ids[:repeat])
+        miss = timed(lambda: manager.get(next(cold)), min(repeat, size - l1_size))
+        resident = len(manager.sessions)
+        manager.close()
+    print(f"tiered       n={size:>8}  l1 hit={hit * 1e6:7.2f}us  l2 miss={miss * 1e6:7.2f}us  resident={resident}")
+
+
+
+def bench_tokens(size: int, repeat: int = 10_000):
+    """is_active() on a signed token against is_active() on an ID that misses L1, plus the revocation set size."""
+    l1_size = size // 10
+    with tempfile.TemporaryDirectory() as directory:
+        manager = TieredSessionManager("bench", os.path.join(directory, "tokens.db"), l1_size=l1_size)
+        manager.debug = False
+        tokens = manager.enable_tokens(SessionTokens(ttl=60))
+        issued = [manager.create(unick_name=f"user{i}") for i in range(size)]
+        manager.flush()
+        count = min(repeat, size - l1_size)
+        cold_tokens = iter(issued[:count])
+        stateless = timed(lambda: manager.is_active(next(cold_tokens)), count)
+        verify = timed(lambda: tokens.verify(issued[0]), repeat)
+        ids = [tokens.session_id(token) for token in issued]
+        manager.disable_tokens()
+        cold = iter(ids[count:2 * count] if 2 * count <= size - l1_size else ids[:count])
+        miss = timed(lambda: manager.is_active(next(cold)), count)
+        manager.enable_tokens(tokens)
+        manager.remove_many(ids[:count // 2])
+        revoked = len(tokens.revoked)
+        manager.close()
+    print(f"tokens       n={size:>8}  token={stateless * 1e6:7.2f}us (verify {verify * 1e6:5.2f}us)  "
+          f"id l2 miss={miss * 1e6:7.2f}us  revoked={revoked}")
+
+def _shared_worker(path: str, ids: list, repeat: int, queue):
+    manager = SharedSessionManager("bench", path, l1_size=len(ids))
+    manager.debug = False
+    rng = random.Random(os.getpid())
+    start = time.perf_counter()
+    for i in range(repeat):
+        session_id = rng.choice(ids)
+        if i % 20 == 0:
+            manager.set_value(session_id, str(i))
+        else:
+            manager.get_value(session_id)
+    queue.put(time.perf_counter() - start)
+    manager.close()
+
+
+def bench_shared(size: int, workers: int = 4, repeat: int = 20_000, sample: int = 10_000):
+    """get_value()/set_value() mix (one write in 20) from several processes sharing one SharedSessionManager file."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "shared.db")
+        manager = SharedSessionManager("bench", path, l1_size=1)
+        manager.debug = False
+        start = time.perf_counter()
+        ids = [manager.create(unick_name=f"user{i}") for i in range(size)]
+        create = (time.perf_counter() - start) / size
+        manager.close()
+        ids = random.sample(ids, min(size, sample))
+        queue = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=_shared_worker, args=(path, ids, repeat, queue))
+                     for _ in range(workers)]
+        for process in processes:
+            process.start()
+        elapsed = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+    op = sum(elapsed) / len(elapsed) / repeat
+    print(f"shared       n={size:>8}  workers={workers}  create={create * 1e6:6.2f}us  op={op * 1e6:6.2f}us  "
+          f"total={workers * repeat / max(elapsed):9.0f} ops/s")
+
+
+def bench_hashing(count: int = 64, algorithm: str = "pbkdf2_sha256", work_factor: int = 100_000):
+    """Password hashes per second on a PasswordHasher pool, from one worker up to every core."""
+    cores = os.cpu_count() or 1
+    for workers in sorted({1, 2, cores // 2 or 1, cores}):
+        hasher = PasswordHasher(algorithm, work_factor, workers=workers)
+        start = time.perf_counter()
+        hashes = [future.result() for future in [hasher.submit_hash(f"password{i}") for i in range(count)]]
+        elapsed = time.perf_counter() - start
+        hasher.close()
+        rate = count / elapsed
+        print(f"hashing      {algorithm} wf={work_factor}  workers={workers:>2}  "
+              f"{rate:8.1f} hashes/s  {rate / workers:6.1f}/s per worker  ({len(hashes)} hashes)")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    for size in sizes:
+        bench_name_lookup(size)
+        bench_expiry(size)
+        bench_sqlite_save(size)
+        bench_memory(size)
+        bench_pagination(size)
+        bench_threads(size)
+        bench_debug_log(size)
+        bench_metrics(size)
+        bench_eviction(size)
+        bench_sliding(size)
+        bench_bulk(size)
+        bench_lazy(size)
+        bench_compression(size)
+        bench_structured(size)
+        bench_encryption(size)
+        bench_tiered(size)
+        bench_tokens(size)
+        bench_shared(size)
+    bench_hashing()
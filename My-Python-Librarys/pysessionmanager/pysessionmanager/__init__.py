@@ -1 +1,13 @@
 from .core import SessionManager
+from .session import Session
+from .sharded import ShardedSessionManager
+from .async_manager import AsyncSessionManager
+from .logbuffer import LogBuffer
+from .metrics import SessionMetrics
+from .security import PasswordHasher
+from .tiered import TieredSessionManager
+from .shared import SharedSessionManager
+from .compression import ValueCodec
+from .serialization import PickleSerializer, ValueSerializer
+from .tokens import SessionTokens
+from .encryption import KeyRing
@@ -0,0 +1,374 @@
+import asyncio
+import datetime
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Union
+
+from pysessionmanager.codes import SessionMessages
+from .backends import payload_bytes
+from .compression import ValueCodec, ValueCompressor
+from .core import SessionManager
+from .encryption import KeyRing, ValueEncryptor
+from .metrics import SessionMetrics
+from .security import PasswordHasher
+from .serialization import ValueSerializer
+from .session import Session, SessionPage
+from .tokens import SessionTokens
+
+
+class AsyncSessionManager:
+    """
+    asyncio front-end for SessionManager.
+
+    In-memory operations run directly on the event loop. Every storage call runs
+    on a dedicated single-thread executor; snapshots are copied a chunk at a time
+    under the manager's lock, so requests keep being served while a snapshot of
+    any size is written. In journal mode every change appends (and may fsync or
+    compact) the journal, so changes go through the executor too.
+    """
+
+    def __init__(self, name: str, protect: bool = False, auto_renew: bool = False, min_password_length: int = 6,
+                 manager: Optional[SessionManager] = None, executor: Optional[ThreadPoolExecutor] = None,
+                 password_hasher: Optional[PasswordHasher] = None, log_capacity: int = 1000,
+                 debug_sample_rate: float = 1.0, max_sessions: Optional[int] = None, max_bytes: Optional[int] = None,
+                 eviction: str = "lru", renew_seconds: float = 3600.0, touch_interval: float = 5.0):
+        self.manager = manager or SessionManager(name, protect, auto_renew, min_password_length, password_hasher,
+                                                 log_capacity, debug_sample_rate, max_sessions, max_bytes, eviction,
+                                                 renew_seconds, touch_interval)
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-io")
+
+    async def _run_hashing(self, func: Callable, *args):
+        # Password hashing is CPU-bound: run it on the loop's default pool, never inline.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args))
+
+    async def _run_io(self, func: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def _run_change(self, func: Callable, *args):
+        # Inline while changes stay in memory; on the executor once they hit the journal.
+        if self.manager.journal is None:
+            return func(*args)
+        return await self._run_io(func, *args)
+
+    # In-memory operations
+
+    async def create(self, unick_name: str = None, duration_seconds: int = 3600, value: str = None,
+                     password: Optional[str] = None, custom_metadata: dict = {}) -> str:
+        if password and self.manager.protect:
+            return await self._run_hashing(self.manager.create, unick_name, duration_seconds, value, password,
+                                           custom_metadata)
+        return await self._run_change(self.manager.create, unick_name, duration_seconds, value, password,
+                                      custom_metadata)
+
+    async def create_many(self, entries: Iterable[Union[str, Dict]], duration_seconds: int = 3600,
+                          value: str = None, password: Optional[str] = None) -> List[str]:
+        # Hashes a whole batch of passwords: never inline on the loop.
+        return await self._run_hashing(self.manager.create_many, list(entries), duration_seconds, value, password)
+
+    async def remove(self, session_id: str):
+        return await self._run_change(self.manager.remove, session_id)
+
+    async def remove_many(self, session_ids: Iterable[str]) -> Dict[str, str]:
+        return await self._run_change(self.manager.remove_many, list(session_ids))
+
+    async def get_many(self, session_ids: Iterable[str]) -> Dict[str, Union[Session, str]]:
+        return self.manager.get_many(session_ids)
+
+    async def extend(self, session_id: str, seconds: float) -> str:
+        return await self._run_change(self.manager.extend, session_id, seconds)
+
+    async def extend_many(self, session_ids: Iterable[str], seconds: float) -> Dict[str, str]:
+        return await self._run_change(self.manager.extend_many, list(session_ids), seconds)
+
+    async def get(self, session_id: str) -> Optional[Session]:
+        return self.manager.get(session_id)
+
+    async def is_active(self, session_id: str) -> bool:
+        return self.manager.is_active(session_id)
+
+    async def get_time_remaining(self, session_id: str) -> float:
+        return self.manager.get_time_remaining(session_id)
+
+    async def time_passed(self, session_id: str) -> float:
+        return self.manager.time_passed(session_id)
+
+    async def get_value(self, session_id: str) -> Optional[str]:
+        return self.manager.get_value(session_id)
+
+    async def set_value(self, session_id: str, value: str) -> Optional[str]:
+        return await self._run_change(self.manager.set_value, session_id, value)
+
+    async def get_with_unick_name(self, unick_name: str, logging: bool = False) -> Optional[str]:
+        return self.manager.get_with_unick_name(unick_name, logging)
+
+    async def lock(self, session_id: str, password: str, logging: bool = False) -> Optional[str]:
+        return await self._run_hashing(self.manager.lock, session_id, password, logging)
+
+    async def unlock(self, unick_name: str, password: str, logging: bool = False) -> Optional[str]:
+        return await self._run_hashing(self.manager.unlock, unick_name, password, logging)
+
+    async def unlock_many(self, credentials: Dict[str, str], logging: bool = False) -> Dict[str, Optional[str]]:
+        return await self._run_hashing(self.manager.unlock_many, credentials, logging)
+
+    async def expire_due(self, now: Optional[datetime.datetime] = None, limit: Optional[int] = None) -> List[str]:
+        return await self._run_change(self.manager.expire_due, now, limit)
+
+    async def next_expiry(self) -> Optional[datetime.datetime]:
+        return self.manager.next_expiry()
+
+    async def get_all(self):
+        # O(n) copy: keep it off the event loop.
+        return await self._run_io(self.manager.get_all)
+
+    async def iter_sessions(self, filter: Optional[Callable[[str, Session], bool]] = None, batch_size: int = 1000,
+                            cursor: Optional[str] = None) -> AsyncIterator[SessionPage]:
+        # Each page is gathered on the executor; see SessionManager.iter_sessions.
+        pages = self.manager.iter_sessions(filter, batch_size, cursor)
+        while True:
+            page = await self._run_io(next, pages, None)
+            if page is None:
+                return
+            yield page
+
+    def start_reaper(self, batch_size: int = 1000, max_interval: float = 60.0,
+                     callback: Optional[Callable[[int, int], None]] = None, min_interval: float = 0.1):
+        """
+        Start the expiry reaper as a task on the running event loop.
+        """
+        return self.manager.start_reaper(batch_size, max_interval, callback, True, min_interval)
+
+    def stop_reaper(self):
+        self.manager.stop_reaper()
+
+    # Storage operations (executor)
+
+    async def save(self, filename: Optional[str] = None) -> bool:
+        """
+        Write a JSON, JSON-lines or encrypted snapshot without blocking the event loop.
+        """
+        manager = self.manager
+        await self._run_change(manager.flush_touches)
+        if filename is None and manager.journal is not None:
+            await self._run_io(manager.journal.sync)
+            return True
+        filename = filename or manager.filename
+
+        def write():
+            ext = manager._get_file_extension(filename)
+            if ext == "jsonl":
+                manager.storer.store_sessions_jsonl(manager.snapshot(), filename)
+            elif ext == "enc":
+                manager.storer.store_sessions_encrypted(manager.snapshot(), manager._require_encryptor(), filename)
+            else:
+                manager.storer.store_sessions_json(manager.snapshot(), filename)
+
+        start = time.perf_counter()
+        try:
+            await self._run_io(write)
+        except Exception as e:
+            if manager.debug:
+                manager.logs["errors"].append(f"[SAVE ERROR] ({filename}) {str(e)}")
+            return False
+        if manager.metrics is not None:
+            manager.metrics.observe("save", time.perf_counter() - start)
+            manager.metrics.add_io_bytes(manager._get_file_extension(filename), "write", os.path.getsize(filename))
+        if manager.debug:
+            manager.logs["successful"].append(SessionMessages.sessions_as_json_added_message(filename)[0])
+        return True
+
+    async def load(self, filename: str = None):
+        """
+        Parse a JSON, JSON-lines or encrypted snapshot on the executor, then swap it in.
+        """
+        loader = SessionManager(self.manager.name)
+        loader.metrics = self.manager.metrics
+        loader.encryptor = self.manager.encryptor
+        start = time.perf_counter()
+        message = await self._run_io(loader.load, filename)
+        if loader.metrics is not None:
+            loader.metrics.observe("load", time.perf_counter() - start)
+        await self._swap_in(loader, None)
+        return message
+
+    async def save_sqlite(self, filename: Optional[str] = None, full: bool = False) -> bool:
+        filename = filename or self.manager.db_name
+        return await self._save_db(
+            filename, full,
+            lambda items: self.manager.storer.store_sessions_sqlite(filename, items),
+            lambda rows, removed: self.manager.storer.store_sessions_sqlite_incremental(filename, rows, rows, removed),
+            "sqlite",
+        )
+
+    async def load_sqlite(self, filename: Optional[str] = None, lazy: bool = False,
+                          value_cache_bytes: int = 64 * 1024 * 1024):
+        filename = filename or self.manager.db_name
+        loader = SessionManager(self.manager.name)
+        loader.metrics = self.manager.metrics
+        loader.storer = self.manager.storer
+        start = time.perf_counter()
+        message = await self._run_io(loader.load_sqlite, filename, lazy, value_cache_bytes)
+        if loader.metrics is not None:
+            loader.metrics.observe("load_sqlite", time.perf_counter() - start)
+        await self._swap_in(loader, filename)
+        return message
+
+    async def save_postgresql(self, conn_string: str, full: bool = False) -> bool:
+        return await self._save_db(
+            conn_string, full,
+            lambda items: self.manager.storer.store_sessions_postgresql(sessions=items, conn_string=conn_string),
+            lambda rows, removed: self.manager.storer.store_sessions_postgresql_incremental(
+                rows, conn_string, rows, removed),
+            "postgresql",
+        )
+
+    async def load_postgresql(self, conn_string: str, lazy: bool = False,
+                              value_cache_bytes: int = 64 * 1024 * 1024):
+        loader = SessionManager(self.manager.name)
+        loader.metrics = self.manager.metrics
+        loader.storer = self.manager.storer
+        start = time.perf_counter()
+        message = await self._run_io(loader.load_postgresql, conn_string, lazy, value_cache_bytes)
+        if loader.metrics is not None:
+            loader.metrics.observe("load_postgresql", time.perf_counter() - start)
+        await self._swap_in(loader, conn_string)
+        return message
+
+    async def _save_db(self, target: str, full: bool, store_all: Callable, store_changes: Callable,
+                       backend: str = "db") -> bool:
+        manager = self.manager
+
+        def prepare():
+            # On the executor: renewed deadlines may append to the journal.
+            values = None
+            if (full or manager.synced_db != target) and manager.lazy_db == target:
+                # A full rewrite of the lazy source: read its values first, in one query and outside the lock.
+                values = manager._read_lazy_values()
+            with manager._lock:
+                manager.flush_touches()
+                is_full = full or manager.synced_db != target
+                if is_full and manager.lazy_db == target:
+                    manager._materialize_values(values)
+                if is_full:
+                    items, rows = manager.snapshot(), None
+                    dirty, removed = set(), set()
+                else:
+                    items = None
+                    dirty, removed = manager.dirty, manager.removed
+                    rows = {session_id: manager.sessions[session_id].copy()
+                            for session_id in dirty if session_id in manager.sessions}
+                # Changes made while the write runs are tracked against the new state.
+                manager._reset_sync_state(target)
+            return is_full, items, rows, dirty, removed
+
+        full, items, rows, dirty, removed = await self._run_io(prepare)
+        written = [0]
+        start = time.perf_counter()
+        try:
+            if full:
+                if manager.metrics is not None:
+                    items = self._count_bytes(items, written)
+                await self._run_io(store_all, items)
+            elif rows or removed:
+                if manager.metrics is not None:
+                    written[0] = sum(payload_bytes(session_id, session) for session_id, session in rows.items())
+                await self._run_io(store_changes, rows, removed)
+        except Exception as e:
+            with manager._lock:
+                if full:
+                    manager.synced_db = None
+                else:
+                    manager.dirty |= dirty
+                    manager.removed |= removed
+            if manager.debug:
+                manager.logs["errors"].append(f"[SAVE ERROR] ({target}) {str(e)}")
+            return False
+        if manager.metrics is not None:
+            manager.metrics.observe(f"save_{backend}", time.perf_counter() - start)
+            manager.metrics.add_io_bytes(backend, "write", written[0])
+        return True
+
+    @staticmethod
+    def _count_bytes(items, written: list):
+        # Sums payload sizes as the executor consumes the snapshot.
+        for session_id, session in items:
+            written[0] += payload_bytes(session_id, session)
+            yield session_id, session
+
+    async def _swap_in(self, loader: SessionManager, synced_db: Optional[str]):
+        manager = self.manager
+        with manager._lock:
+            manager.sessions = loader.sessions
+            manager.name_index = loader.name_index
+            manager.expiry_heap = loader.expiry_heap
+            manager._reset_sync_state(synced_db)
+            manager.lazy_db = loader.lazy_db
+            manager.value_cache = loader.value_cache
+            manager._rebuild_eviction()
+            if manager.tokens is not None:
+                manager.tokens.revoke_all()
+        if manager.journal is not None:
+            await self._run_io(self._compact_journal)
+
+    def _compact_journal(self):
+        with self.manager._lock:
+            self.manager.journal.compact(self.manager.sessions)
+
+    async def clean_all(self):
+        return await self._run_io(self.manager.clean_all)
+
+    async def enable_journal(self, *args, **kwargs) -> int:
+        return await self._run_io(self.manager.enable_journal, *args, **kwargs)
+
+    def enable_metrics(self, metrics: Optional[SessionMetrics] = None) -> SessionMetrics:
+        return self.manager.enable_metrics(metrics)
+
+    def disable_metrics(self):
+        self.manager.disable_metrics()
+
+    async def enable_compression(self, codec: Union[str, ValueCodec] = "zlib",
+                                 threshold: int = 1024) -> ValueCompressor:
+        # Compresses every value already held: off the loop.
+        return await self._run_io(self.manager.enable_compression, codec, threshold)
+
+    def disable_compression(self):
+        self.manager.disable_compression()
+
+    async def enable_serialization(self, serializer: Union[str, ValueSerializer] = "pickle") -> ValueSerializer:
+        return await self._run_io(self.manager.enable_serialization, serializer)
+
+    def disable_serialization(self):
+        self.manager.disable_serialization()
+
+    async def enable_encryption(self, key_ring: Optional[KeyRing] = None) -> ValueEncryptor:
+        # Encrypts every value already held: off the loop, like the calls below.
+        return await self._run_io(self.manager.enable_encryption, key_ring)
+
+    async def disable_encryption(self):
+        return await self._run_io(self.manager.disable_encryption)
+
+    async def rotate_encryption_key(self) -> str:
+        return await self._run_io(self.manager.rotate_encryption_key)
+
+    def enable_tokens(self, tokens: Optional[SessionTokens] = None) -> SessionTokens:
+        return self.manager.enable_tokens(tokens)
+
+    def disable_tokens(self):
+        self.manager.disable_tokens()
+
+    async def issue_token(self, session_id: str) -> str:
+        return self.manager.issue_token(session_id)
+
+    async def close(self):
+        """
+        Stop the reaper, finish pending storage work and release connections.
+        """
+        self.manager.stop_reaper()
+        await self._run_io(self.manager.close)
+        self.executor.shutdown(wait=True)
+
+    def __repr__(self):
+        return f"<AsyncSessionManager(name={self.manager.name}, sessions={len(self.manager.sessions)})>"
@@ -0,0 +1,608 @@
+import codecs
+import datetime
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .session import LazyValue, Session
+
+try:
+    import psycopg2
+    from psycopg2.extras import execute_values
+    from psycopg2.pool import ThreadedConnectionPool
+except ImportError:  # PostgreSQL support is optional
+    psycopg2 = None
+
+# `value` holds TEXT or, for bytes values, a BLOB: SQLite keeps each value's own storage class.
+SQLITE_CREATE_TABLE = """CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    unick_name TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    protected INTEGER,
+    password TEXT,
+    value TEXT
+)"""
+
+SQLITE_CREATE_NAME_INDEX = "CREATE INDEX IF NOT EXISTS sessions_unick_name ON sessions (unick_name)"
+
+# ISO timestamps compare correctly as text (a shorter one without microseconds sorts first).
+SQLITE_DELETE_EXPIRED = """DELETE FROM sessions
+WHERE end_time < ? AND NOT (protected = 1 AND password IS NULL)"""
+
+SQLITE_SELECT_METADATA = "SELECT session_id, unick_name, start_time, end_time, protected, password FROM sessions"
+
+SQLITE_UPSERT = """INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(session_id) DO UPDATE SET
+    unick_name = excluded.unick_name,
+    start_time = excluded.start_time,
+    end_time = excluded.end_time,
+    protected = excluded.protected,
+    password = excluded.password,
+    value = excluded.value"""
+
+
+def sqlite_row(session_id: str, session: Dict) -> tuple:
+    return (
+        session_id,
+        session["unick_name"],
+        session["start_time"].isoformat(),
+        session["end_time"].isoformat(),
+        int(session["protected"]),
+        session["password"],
+        session.get("value", None),
+    )
+
+
+def payload_bytes(session_id: str, session: Dict) -> int:
+    """Size of a session row as text (bytes values as is); driver and page overhead, and values still on disk, are not counted."""
+    value = session.value if isinstance(session, Session) else session.get("value")
+    fields = (session_id, session["unick_name"], session["start_time"].isoformat(), session["end_time"].isoformat(),
+              int(session["protected"]), session["password"], None if isinstance(value, LazyValue) else value)
+    return sum(len(field) if type(field) is bytes else len(str(field)) for field in fields if field is not None)
+
+
+def session_from_sqlite_row(row) -> Dict:
+    return {
+        "unick_name": row[1],
+        "start_time": datetime.datetime.fromisoformat(row[2]),
+        "end_time": datetime.datetime.fromisoformat(row[3]),
+        "protected": bool(row[4]),
+        "password": row[5],
+        "value": row[6] if len(row) > 6 else None
+    }
+
+
+class _ThreadConnection:
+    # Held in a thread-local slot: it is dropped when its thread ends, which closes the connection.
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+class SQLiteBackend:
+    """
+    Session table in a SQLite file, reached through long-lived connections.
+
+    Every thread gets its own connection, opened once and reused, and closed
+    when the thread ends, so executor and request-thread churn does not pile
+    up open files. The database
+    runs in WAL mode with synchronous=NORMAL, so readers in other threads or
+    processes do not block on a writer.
+    """
+
+    def __init__(self, filename: str = "sessions.db", cache_size_kb: int = 8192,
+                 busy_timeout: float = 5.0, wal: bool = True):
+        self.filename = filename
+        self.cache_size_kb = cache_size_kb
+        self.busy_timeout = busy_timeout
+        self.wal = wal
+        self._local = threading.local()
+        self._connections: Dict[sqlite3.Connection, weakref.finalize] = {}
+        self._connections_lock = threading.Lock()
+        with self.connection() as conn:
+            conn.execute(SQLITE_CREATE_TABLE)
+            conn.execute(SQLITE_CREATE_NAME_INDEX)
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Return this thread's connection, opening and tuning it on first use.
+        """
+        holder = getattr(self._local, "holder", None)
+        if holder is not None:
+            return holder.conn
+        # Each connection stays on its own thread; close() may run elsewhere.
+        conn = sqlite3.connect(self.filename, timeout=self.busy_timeout, check_same_thread=False)
+        if self.wal:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        holder = self._local.holder = _ThreadConnection(conn)
+        with self._connections_lock:
+            self._connections[conn] = weakref.finalize(holder, self._release, weakref.ref(self), conn)
+        return conn
+
+    @staticmethod
+    def _release(backend_ref: weakref.ref, conn: sqlite3.Connection):
+        # The connection's thread has ended.
+        backend = backend_ref()
+        if backend is not None:
+            with backend._connections_lock:
+                backend._connections.pop(conn, None)
+        conn.close()
+
+    def open_connections(self) -> int:
+        with self._connections_lock:
+            return len(self._connections)
+
+    def store_all(self, sessions: Dict[str, Dict]):
+        """
+        Replace the whole table with `sessions` (a dict or (session_id, session) pairs).
+        """
+        if isinstance(sessions, dict):
+            sessions = sessions.items()
+        with self.connection() as conn:
+            conn.execute('DELETE FROM sessions')
+            conn.executemany('INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)', (
+                sqlite_row(session_id, session) for session_id, session in sessions
+            ))
+
+    def store_changes(self, sessions: Dict[str, Dict], dirty: Iterable[str] = (), removed: Iterable[str] = ()):
+        """
+        Upsert the `dirty` sessions and delete the `removed` ones in one transaction.
+        """
+        with self.connection() as conn:
+            conn.executemany(SQLITE_UPSERT, (
+                sqlite_row(session_id, sessions[session_id])
+                for session_id in dirty if session_id in sessions
+            ))
+            conn.executemany('DELETE FROM sessions WHERE session_id = ?', (
+                (session_id,) for session_id in removed
+            ))
+
+    def load_all(self, lazy: bool = False) -> Dict[str, Dict]:
+        """
+        Load every session; with `lazy` the values stay on disk behind LazyValue placeholders.
+        """
+        if lazy:
+            cursor = self.connection().execute(SQLITE_SELECT_METADATA)
+            return {row[0]: session_from_sqlite_row(row + (LazyValue(self, row[0]),)) for row in cursor}
+        cursor = self.connection().execute('SELECT * FROM sessions')
+        return {row[0]: session_from_sqlite_row(row) for row in cursor}
+
+    def load_value(self, session_id: str):
+        row = self.connection().execute('SELECT value FROM sessions WHERE session_id = ?', (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def load_values(self) -> Dict[str, object]:
+        """
+        Every session's value in one query, keyed by session ID (to fill in a lazy load at once).
+        """
+        return dict(self.connection().execute('SELECT session_id, value FROM sessions'))
+
+    def load_page(self, after: Optional[str], limit: int) -> List[Tuple[str, Dict]]:
+        """
+        Up to `limit` sessions in session_id order, starting after `after` (keyset pagination on the primary key).
+        """
+        cursor = self.connection().execute(
+            'SELECT * FROM sessions WHERE session_id > ? ORDER BY session_id LIMIT ?', (after or "", limit))
+        return [(row[0], session_from_sqlite_row(row)) for row in cursor]
+
+    def load_one(self, session_id: str) -> Optional[Dict]:
+        """
+        Fetch a single session by primary key, or None.
+        """
+        row = self.connection().execute('SELECT * FROM sessions WHERE session_id = ?', (session_id,)).fetchone()
+        return session_from_sqlite_row(row) if row else None
+
+    def find_id(self, unick_name: str) -> Optional[str]:
+        """
+        Return the session ID stored under `unick_name`, or None.
+        """
+        row = self.connection().execute(
+            'SELECT session_id FROM sessions WHERE unick_name = ? LIMIT 1', (unick_name,)).fetchone()
+        return row[0] if row else None
+
+    def delete_expired(self, now: datetime.datetime) -> int:
+        """
+        Delete every session that ended before `now`, except protected ones without a password.
+        """
+        with self.connection() as conn:
+            return conn.execute(SQLITE_DELETE_EXPIRED, (now.isoformat(),)).rowcount
+
+    def close(self):
+        """
+        Close every connection opened by this backend.
+        """
+        with self._connections_lock:
+            for conn, finalizer in self._connections.items():
+                finalizer.detach()
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def reset_after_fork(self):
+        """
+        Forget the connections inherited from the parent process without closing them.
+        """
+        for finalizer in self._connections.values():
+            finalizer.detach()
+        self._connections = {}
+        self._connections_lock = threading.Lock()
+        self._local = threading.local()
+
+
+SQLITE_CREATE_CHANGES_TABLE = """CREATE TABLE IF NOT EXISTS session_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT,
+    origin TEXT,
+    changed_at REAL
+)"""
+
+SQLITE_CREATE_UNIQUE_NAME_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS sessions_unick_name_unique ON sessions (unick_name)"
+
+
+class SharedSQLiteBackend(SQLiteBackend):
+    """
+    SQLite session table shared by several processes on one host.
+
+    Every write also appends the changed session IDs to a `session_changes` log
+    in the same transaction, tagged with the writer's `origin`. Readers poll the
+    log with `changes_since()` to invalidate what they cached. `unick_name` is
+    unique at the database level, so two processes cannot create the same name.
+    """
+
+    def __init__(self, filename: str = "sessions.db", origin: str = "", cache_size_kb: int = 8192,
+                 busy_timeout: float = 5.0):
+        super().__init__(filename, cache_size_kb, busy_timeout, wal=True)
+        self.origin = origin
+        with self.connection() as conn:
+            conn.execute(SQLITE_CREATE_CHANGES_TABLE)
+            conn.execute(SQLITE_CREATE_UNIQUE_NAME_INDEX)
+
+    def store_changes(self, sessions: Dict[str, Dict], dirty: Iterable[str] = (), removed: Iterable[str] = ()):
+        """
+        Upsert `dirty`, delete `removed` and log both, in one transaction.
+        """
+        dirty = [session_id for session_id in dirty if session_id in sessions]
+        removed = list(removed)
+        now = time.time()
+        with self.connection() as conn:
+            conn.executemany(SQLITE_UPSERT, (sqlite_row(session_id, sessions[session_id]) for session_id in dirty))
+            conn.executemany('DELETE FROM sessions WHERE session_id = ?', ((session_id,) for session_id in removed))
+            conn.executemany('INSERT INTO session_changes (session_id, origin, changed_at) VALUES (?, ?, ?)', (
+                (session_id, self.origin, now) for session_id in dirty + removed
+            ))
+
+    def last_change(self) -> int:
+        return self.connection().execute('SELECT COALESCE(MAX(seq), 0) FROM session_changes').fetchone()[0]
+
+    def changes_since(self, seq: int) -> Tuple[List[str], int, bool]:
+        """
+        Return (session IDs changed by other origins after `seq`, the new last seq, whether entries were pruned).
+        """
+        rows = self.connection().execute(
+            'SELECT seq, session_id, origin FROM session_changes WHERE seq > ?', (seq,)).fetchall()
+        if not rows:
+            return [], seq, False
+        changed = [session_id for _, session_id, origin in rows if origin != self.origin]
+        return changed, rows[-1][0], rows[0][0] != seq + 1
+
+    def prune_changes(self, older_than: float) -> int:
+        """
+        Delete change-log entries written more than `older_than` seconds ago.
+        """
+        with self.connection() as conn:
+            return conn.execute('DELETE FROM session_changes WHERE changed_at < ?',
+                                (time.time() - older_than,)).rowcount
+
+
+POSTGRESQL_COLUMNS = "session_id, unick_name, start_time, end_time, protected, password, value, value_bytes"
+
+# A str value goes to `value`, a bytes value to `value_bytes`; at most one of the two is set.
+POSTGRESQL_CREATE_TABLE = """CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    unick_name TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    protected BOOLEAN,
+    password TEXT,
+    value TEXT,
+    value_bytes BYTEA
+)"""
+
+POSTGRESQL_ADD_BYTES_COLUMN = "ALTER TABLE sessions ADD COLUMN IF NOT EXISTS value_bytes BYTEA"
+
+POSTGRESQL_CREATE_NAME_INDEX = "CREATE INDEX IF NOT EXISTS sessions_unick_name ON sessions (unick_name)"
+
+POSTGRESQL_UPSERT = f"""INSERT INTO sessions ({POSTGRESQL_COLUMNS}) VALUES %s
+ON CONFLICT (session_id) DO UPDATE SET
+    unick_name = EXCLUDED.unick_name,
+    start_time = EXCLUDED.start_time,
+    end_time = EXCLUDED.end_time,
+    protected = EXCLUDED.protected,
+    password = EXCLUDED.password,
+    value = EXCLUDED.value,
+    value_bytes = EXCLUDED.value_bytes"""
+
+# COPY text format: backslash escapes for the control characters, \ooo (octal) and \xhh (hex) for
+# raw bytes of the server encoding, and any other backslashed character stands for itself.
+_COPY_ESCAPES = {"\\": "\\\\", "\b": "\\b", "\f": "\\f", "\n": "\\n", "\r": "\\r", "\t": "\\t", "\v": "\\v"}
+_COPY_UNESCAPES = {b"b": b"\b", b"f": b"\f", b"n": b"\n", b"r": b"\r", b"t": b"\t", b"v": b"\v"}
+_COPY_ESCAPE_RE = re.compile(r"[\\\b\f\n\r\t\v]")
+_COPY_UNESCAPE_RE = re.compile(rb"\\(?:([0-7]{1,3})|x([0-9A-Fa-f]{1,2})|(.))", re.DOTALL)
+
+
+def postgresql_row(session_id: str, session: Dict) -> tuple:
+    value = session.get("value", None)
+    binary = type(value) is bytes
+    return (
+        session_id,
+        session["unick_name"],
+        session["start_time"].isoformat(),
+        session["end_time"].isoformat(),
+        bool(session["protected"]),
+        session["password"],
+        None if binary else value,
+        value if binary else None,
+    )
+
+
+def session_from_postgresql_row(row) -> Dict:
+    value = row[6] if len(row) > 6 else None
+    if value is None and len(row) > 7 and row[7] is not None:
+        value = bytes(row[7])  # psycopg2 returns BYTEA as a memoryview
+    return {
+        "unick_name": row[1],
+        "start_time": datetime.datetime.fromisoformat(row[2]),
+        "end_time": datetime.datetime.fromisoformat(row[3]),
+        "protected": row[4],
+        "password": row[5],
+        "value": value
+    }
+
+
+def copy_escape(value) -> str:
+    """Encode one field for PostgreSQL COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, bytes):
+        return "\\\\x" + value.hex()  # BYTEA hex format, its backslash escaped for COPY
+    return _COPY_ESCAPE_RE.sub(lambda m: _COPY_ESCAPES[m.group(0)], str(value))
+
+
+def _copy_unescape_match(match) -> bytes:
+    octal, hexadecimal, char = match.groups()
+    if octal is not None:
+        return bytes((int(octal, 8) & 0xFF,))
+    if hexadecimal is not None:
+        return bytes((int(hexadecimal, 16),))
+    return _COPY_UNESCAPES.get(char, char)
+
+
+def copy_unescape(field: str):
+    """Decode one field of PostgreSQL COPY text format; \\N is NULL."""
+    if field == "\\N":
+        return None
+    if "\\" not in field:
+        return field
+    # Octal and hex escapes are bytes of the (UTF-8) server encoding, so decode at the byte level.
+    return _COPY_UNESCAPE_RE.sub(_copy_unescape_match, field.encode()).decode()
+
+
+def copy_line(row: tuple) -> str:
+    """Encode one row in PostgreSQL COPY text format."""
+    return "\t".join(copy_escape(value) for value in row) + "\n"
+
+
+def parse_copy_line(line: str) -> tuple:
+    """Decode one line of PostgreSQL COPY text format (without the newline)."""
+    fields = [copy_unescape(field) for field in line.split("\t")]
+    fields[4] = fields[4] == "t"
+    if len(fields) > 7 and fields[7] is not None:
+        fields[7] = bytes.fromhex(fields[7][2:])
+    return tuple(fields)
+
+
+class _CopyReader:
+    """File-like object that feeds COPY FROM from a row iterator without building the whole payload."""
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._lines = (copy_line(row) for row in rows)
+        self._buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+        if size < 0:
+            data, self._buffer = self._buffer, ""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    readline = read
+
+
+class _CopyWriter:
+    """File-like object that decodes COPY TO output into sessions as it arrives."""
+
+    def __init__(self, sessions: Dict[str, Dict], lazy_backend=None):
+        self.sessions = sessions
+        self.lazy_backend = lazy_backend
+        self._pending = ""
+        # A chunk may end inside a multi-byte character.
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def write(self, data):
+        if isinstance(data, bytes):
+            data = self._decoder.decode(data)
+        lines = (self._pending + data).split("\n")
+        self._pending = lines.pop()
+        for line in lines:
+            row = parse_copy_line(line)
+            if self.lazy_backend is not None:
+                row = row[:6] + (LazyValue(self.lazy_backend, row[0]),)
+            self.sessions[row[0]] = session_from_postgresql_row(row)
+        return len(data)
+
+
+class PostgreSQLBackend:
+    """
+    Session table in PostgreSQL, reached through a thread-safe connection pool.
+
+    Full snapshots use COPY FROM / COPY TO, incremental saves use batched
+    `execute_values` upserts, and `iter_sessions` streams rows through a
+    server-side cursor.
+    """
+
+    def __init__(self, conn_string: str, minconn: int = 1, maxconn: int = 8, page_size: int = 1000):
+        if psycopg2 is None:
+            raise ImportError("psycopg2 is required for PostgreSQL support (pip install psycopg2).")
+        if not conn_string:
+            raise ValueError("Connection string is required for PostgreSQL.")
+        self.conn_string = conn_string
+        self.page_size = page_size
+        self.pool = ThreadedConnectionPool(minconn, maxconn, conn_string)
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(POSTGRESQL_CREATE_TABLE)
+            cursor.execute(POSTGRESQL_ADD_BYTES_COLUMN)
+            cursor.execute(POSTGRESQL_CREATE_NAME_INDEX)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a pooled connection for one transaction.
+        """
+        conn = self.pool.getconn()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self.pool.putconn(conn)
+
+    def store_all(self, sessions: Dict[str, Dict]):
+        """
+        Replace the whole table with `sessions` (a dict or (session_id, session) pairs) using COPY FROM.
+        """
+        if isinstance(sessions, dict):
+            sessions = sessions.items()
+        rows = (postgresql_row(session_id, session) for session_id, session in sessions)
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM sessions')
+            cursor.copy_expert(f"COPY sessions ({POSTGRESQL_COLUMNS}) FROM STDIN", _CopyReader(rows))
+
+    def store_changes(self, sessions: Dict[str, Dict], dirty: Iterable[str] = (), removed: Iterable[str] = ()):
+        """
+        Upsert the `dirty` sessions and delete the `removed` ones in one transaction.
+        """
+        rows = [postgresql_row(session_id, sessions[session_id]) for session_id in dirty if session_id in sessions]
+        removed = list(removed)
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            if rows:
+                execute_values(cursor, POSTGRESQL_UPSERT, rows, page_size=self.page_size)
+            if removed:
+                cursor.execute('DELETE FROM sessions WHERE session_id = ANY(%s)', (removed,))
+
+    def load_all(self, lazy: bool = False) -> Dict[str, Dict]:
+        """
+        Load the whole table using COPY TO; with `lazy` the values stay in the database behind LazyValue placeholders.
+        """
+        sessions: Dict[str, Dict] = {}
+        if lazy:
+            query = "COPY (SELECT session_id, unick_name, start_time, end_time, protected, password, NULL FROM sessions) TO STDOUT"
+        else:
+            query = f"COPY sessions ({POSTGRESQL_COLUMNS}) TO STDOUT"
+        with self.connection() as conn:
+            conn.cursor().copy_expert(query, _CopyWriter(sessions, self if lazy else None))
+        return sessions
+
+    def load_value(self, session_id: str):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value, value_bytes FROM sessions WHERE session_id = %s", (session_id,))
+            row = cursor.fetchone()
+        if not row:
+            return None
+        return row[0] if row[1] is None else bytes(row[1])
+
+    def load_values(self) -> Dict[str, object]:
+        """
+        Every session's value in one query, keyed by session ID (to fill in a lazy load at once).
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT session_id, value, value_bytes FROM sessions")
+            return {row[0]: row[1] if row[2] is None else bytes(row[2]) for row in cursor}
+
+    def load_page(self, after: Optional[str], limit: int) -> List[Tuple[str, Dict]]:
+        """
+        Up to `limit` sessions in session_id order, starting after `after` (keyset pagination on the primary key).
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {POSTGRESQL_COLUMNS} FROM sessions WHERE session_id > %s "
+                           f"ORDER BY session_id LIMIT %s", (after or "", limit))
+            rows = cursor.fetchall()
+        return [(row[0], session_from_postgresql_row(row)) for row in rows]
+
+    def load_one(self, session_id: str) -> Optional[Dict]:
+        """
+        Fetch a single session by primary key, or None.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {POSTGRESQL_COLUMNS} FROM sessions WHERE session_id = %s", (session_id,))
+            row = cursor.fetchone()
+        return session_from_postgresql_row(row) if row else None
+
+    def find_id(self, unick_name: str) -> Optional[str]:
+        """
+        Return the session ID stored under `unick_name`, or None.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT session_id FROM sessions WHERE unick_name = %s LIMIT 1", (unick_name,))
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    def delete_expired(self, now: datetime.datetime) -> int:
+        """
+        Delete every session that ended before `now`, except protected ones without a password.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM sessions WHERE end_time < %s AND NOT (protected AND password IS NULL)",
+                (now.isoformat(),))
+            return cursor.rowcount
+
+    def iter_sessions(self, batch_size: int = 1000) -> Iterator[Tuple[str, Dict]]:
+        """
+        Stream (session_id, session) pairs through a server-side cursor, `batch_size` rows per round trip.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor(name="pysessionmanager_stream")
+            cursor.itersize = batch_size
+            cursor.execute(f"SELECT {POSTGRESQL_COLUMNS} FROM sessions")
+            for row in cursor:
+                yield row[0], session_from_postgresql_row(row)
+            cursor.close()
+
+    def close(self):
+        """
+        Close every pooled connection.
+        """
+        self.pool.closeall()
@@ -49,6 +49,7 @@ class SessionMessages:
     SESSION_SAVE_FILE_EXTENSION_FAILED = "SESSION_SAVE_FILE_EXTENSION_FAILED"
     UNSUPPORTED_FILE_EXTENSION = "UNSUPPORTED_FILE_EXTENSION"
     SESSION_PASSWORD_TOO_SHORT = "SESSION_PASSWORD_TOO_SHORT"
+    SESSION_EXTENDED = "SESSION_EXTENDED"
 
     # Message methods
     @staticmethod
@@ -139,3 +140,5 @@ class SessionMessages:
     def session_as_postgresql_loaded_failed_message(file_path): return (f"Failed to load session from PostgreSQL file: {file_path}", SessionMessages.SESSION_AS_POSTGRESQL_LOADED_FAILED)
     @staticmethod
     def session_password_short(mpl: int): return (f"Password must be at least {mpl} characters long.", SessionMessages.SESSION_PASSWORD_TOO_SHORT)
+    @staticmethod
+    def session_extended_message(session_id): return (f"Session {session_id} has been extended.", SessionMessages.SESSION_EXTENDED)
@@ -0,0 +1,176 @@
+import base64
+import lzma
+import zlib
+from typing import Dict, Union
+
+# Marks a compressed string: PREFIX + codec name + ":" + base64 of the compressed bytes.
+# Plain text survives every store (JSON, CSV, JSON lines, SQLite and PostgreSQL TEXT).
+COMPRESSED_PREFIX = "\x1f"
+# The same for bytes values, without the base64 step.
+COMPRESSED_BYTES_PREFIX = b"\x1f"
+
+# \x1c-\x1f start the stored forms (escaped, encrypted, serialized, compressed). A value
+# given by the user that starts with one of them is stored with ESCAPE_PREFIX in front,
+# so it is never mistaken for one.
+ESCAPE_PREFIX = "\x1c"
+ESCAPE_BYTES_PREFIX = b"\x1c"
+
+# Upper bound on the size of one decompressed value, against decompression bombs.
+MAX_DECOMPRESSED_BYTES = 64 * 1024 * 1024
+
+
+class ValueCodec:
+    """
+    A compression algorithm for session values, looked up by `name` when a value is read back.
+    """
+
+    name = ""
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decompress(self, data, max_length: int = MAX_DECOMPRESSED_BYTES) -> bytes:
+        # `data` may be a memoryview. Raise ValueError rather than produce more than `max_length` bytes.
+        raise NotImplementedError
+
+
+def _too_large(max_length: int) -> ValueError:
+    return ValueError(f"Compressed value is truncated or expands beyond {max_length} bytes.")
+
+
+class ZlibCodec(ValueCodec):
+    name = "zlib"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data, max_length: int = MAX_DECOMPRESSED_BYTES) -> bytes:
+        decompressor = zlib.decompressobj()
+        result = decompressor.decompress(data, max_length)
+        if not decompressor.eof:
+            raise _too_large(max_length)
+        return result
+
+
+class LzmaCodec(ValueCodec):
+    """
+    Smaller output than zlib at several times the CPU cost.
+    """
+
+    name = "lzma"
+
+    def __init__(self, preset: int = 6):
+        self.preset = preset
+
+    def compress(self, data: bytes) -> bytes:
+        return lzma.compress(data, preset=self.preset)
+
+    def decompress(self, data, max_length: int = MAX_DECOMPRESSED_BYTES) -> bytes:
+        decompressor = lzma.LZMADecompressor()
+        result = decompressor.decompress(data, max_length)
+        if not decompressor.eof:
+            raise _too_large(max_length)
+        return result
+
+
+CODECS: Dict[str, ValueCodec] = {"zlib": ZlibCodec(), "lzma": LzmaCodec()}
+
+
+def register_codec(codec: ValueCodec):
+    """
+    Make `codec` available for reading values back; needed in every process that reads them.
+    """
+    if not codec.name or ":" in codec.name:
+        raise ValueError(f"Invalid codec name: {codec.name!r}")
+    CODECS[codec.name] = codec
+
+
+def is_compressed(value) -> bool:
+    kind = type(value)
+    return (kind is str and value.startswith(COMPRESSED_PREFIX)) or (
+        kind is bytes and value.startswith(COMPRESSED_BYTES_PREFIX))
+
+
+def _codec(name: str) -> ValueCodec:
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Unknown compression codec: {name}")
+    return codec
+
+
+def decompress_value(value, max_length: int = MAX_DECOMPRESSED_BYTES):
+    """
+    Return the original value of a compressed one; anything else is returned unchanged.
+
+    Raises ValueError for a value that would decompress to more than `max_length` bytes.
+    """
+    if not is_compressed(value):
+        return value
+    if type(value) is bytes:
+        separator = value.index(b":")
+        return _codec(value[1:separator].decode()).decompress(memoryview(value)[separator + 1:], max_length)
+    name, _, payload = value[1:].partition(":")
+    return _codec(name).decompress(base64.b64decode(payload), max_length).decode()
+
+
+def escape_value(value):
+    """
+    Prefix a str or bytes value that starts with a marker character (\\x1c-\\x1f) with ESCAPE_PREFIX.
+    """
+    kind = type(value)
+    if kind is str:
+        if value and "\x1c" <= value[0] <= "\x1f":
+            return ESCAPE_PREFIX + value
+    elif kind is bytes:
+        if value and 0x1c <= value[0] <= 0x1f:
+            return ESCAPE_BYTES_PREFIX + value
+    return value
+
+
+def unescape_value(value):
+    kind = type(value)
+    if (kind is str and value.startswith(ESCAPE_PREFIX)) or (kind is bytes and value.startswith(ESCAPE_BYTES_PREFIX)):
+        return value[1:]
+    return value
+
+
+class ValueCompressor:
+    """
+    Compresses str and bytes values of at least `threshold` characters/bytes with `codec`.
+
+    A value is only kept compressed when that makes it shorter. Values that
+    start with the compressed marker are always wrapped, so they read back intact.
+    """
+
+    def __init__(self, codec: Union[str, ValueCodec] = "zlib", threshold: int = 1024):
+        if isinstance(codec, str):
+            if codec not in CODECS:
+                raise ValueError(f"Unknown compression codec: {codec}")
+            codec = CODECS[codec]
+        else:
+            register_codec(codec)
+        self.codec = codec
+        self.threshold = threshold
+        self._header = f"{COMPRESSED_PREFIX}{codec.name}:"
+        self._bytes_header = self._header.encode()
+
+    def compress(self, value):
+        if type(value) is bytes:
+            reserved = value.startswith(COMPRESSED_BYTES_PREFIX)
+            if len(value) < self.threshold and not reserved:
+                return value
+            packed = self._bytes_header + self.codec.compress(value)
+            return packed if reserved or len(packed) < len(value) else value
+        if type(value) is not str:
+            return value
+        reserved = value.startswith(COMPRESSED_PREFIX)
+        if len(value) < self.threshold and not reserved:
+            return value
+        packed = self._header + base64.b64encode(self.codec.compress(value.encode())).decode("ascii")
+        return packed if reserved or len(packed) < len(value) else value
+
+    def __repr__(self):
+        return f"<ValueCompressor(codec={self.codec.name}, threshold={self.threshold})>"
@@ -1,39 +1,196 @@
 import datetime
+import heapq
+import itertools
 import json
-from typing import Dict, Literal, Optional
+import operator
+import os
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Literal, Optional, Set, Tuple, Union
 import csv
-import sqlite3
-import psycopg2
+import threading
 import logging as log
 from pysessionmanager.codes import SessionMessages  
-from .security import generate_session_id, hash_password, verify_password
-from .utils import get_default_unick_name
+from .backends import PostgreSQLBackend, SQLiteBackend, payload_bytes
+from .compression import (ValueCodec, ValueCompressor, decompress_value, escape_value, is_compressed,
+                          unescape_value)
+from .encryption import KeyRing, ValueEncryptor, is_encrypted
+from .journal import SessionJournal
+from .eviction import EvictionPolicy, make_policy
+from .logbuffer import LogBuffer
+from .metrics import SessionMetrics, instrument, uninstrument
+from .reaper import SessionReaper
+from .session import LazyValue, Session, SessionPage, ValueCache
+from .serialization import (ValueSerializer, is_serialized, make_serializer, unpack_value, value_from_text,
+                            value_to_text)
+from .security import PasswordHasher, generate_session_id, generate_session_ids, hash_password, verify_password
+from .tokens import SessionTokens, TokenClaims
+from .utils import fsync_directory, get_default_unick_name, resolves_token, synchronized
 
 class SessionStoring:
-    def __init__(self, filename: str = "sessions.json", db_name: str = "sessions.db"):
+    def __init__(self, filename: str = "sessions.json", db_name: str = "sessions.db", sqlite_cache_size_kb: int = 8192):
         self.filename = filename
         self.db_name = db_name
         self.logging = False
+        self.sqlite_cache_size_kb = sqlite_cache_size_kb
+        self.sqlite_backends: Dict[str, SQLiteBackend] = {}
+        self.postgresql_backends: Dict[str, PostgreSQLBackend] = {}
 
 
     def store_sessions_json(self, sessions: Dict[str, Dict], filename: str = "sessions.json", logging: bool = False):
-        sessions_to_save = {
-            session_id: {
-                "unick_name": session["unick_name"],
-                "start_time": session["start_time"].isoformat(),
-                "end_time": session["end_time"].isoformat(),
-                "protected": session["protected"],
-                "password": session.get("password"),
-                "value": session.get("value"),
-            }
-            for session_id, session in sessions.items()
-        }
+        # Written entry by entry so no second copy of the session table is built.
+        if isinstance(sessions, dict):
+            sessions = sessions.items()
         with open(filename, 'w') as f:
-            json.dump(sessions_to_save, f)
+            f.write("{")
+            separator = ""
+            for session_id, session in sessions:
+                f.write(f"{separator}{json.dumps(session_id)}: {json.dumps(self._serialize_session(session))}")
+                separator = ", "
+            f.write("}")
             if logging or self.logging:
                 log.info(SessionMessages.sessions_as_json_added_message(filename)[0])
         return SessionMessages.sessions_as_json_added_message(filename)[1]
 
+    def store_sessions_jsonl(self, sessions: Iterable[Tuple[str, Dict]], filename: str = "sessions.jsonl",
+                             durable: bool = False):
+        """
+        Write a JSON-lines snapshot: one session per line, streamed from `sessions`.
+
+        `sessions` may be a dict or any iterable of (session_id, session) pairs.
+        The snapshot is written to a temporary file and moved into place, so a
+        crash mid-write never leaves a truncated snapshot behind. With `durable`
+        the file and the rename are fsynced before returning.
+        """
+        if isinstance(sessions, dict):
+            sessions = sessions.items()
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, 'w') as f:
+            for session_id, session in sessions:
+                entry = self._serialize_session(session)
+                entry["session_id"] = session_id
+                f.write(json.dumps(entry))
+                f.write("\n")
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_filename, filename)
+        if durable:
+            fsync_directory(filename)
+        return SessionMessages.sessions_as_json_added_message(filename)[1]
+
+    def iter_sessions_jsonl(self, filename: str = "sessions.jsonl") -> Iterator[Tuple[str, Dict]]:
+        """
+        Yield (session_id, session) pairs from a JSON-lines snapshot, one line at a time.
+        """
+        with open(filename, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                yield entry.pop("session_id"), self._deserialize_session(entry)
+
+    def load_sessions_jsonl(self, filename: str = "sessions.jsonl") -> Dict[str, Dict]:
+        return dict(self.iter_sessions_jsonl(filename))
+
+    def store_sessions_encrypted(self, sessions: Iterable[Tuple[str, Dict]], encryptor: ValueEncryptor,
+                                 filename: str = "sessions.jsonl.enc", frame_bytes: int = 1024 * 1024):
+        """
+        Write an encrypted JSON-lines snapshot.
+
+        The lines are packed into frames of about `frame_bytes` and every frame is
+        sealed with a single AES-GCM call, so the cost follows the cipher's
+        throughput rather than the number of sessions. Each frame is stored as a
+        4-byte big-endian length followed by the sealed bytes.
+        """
+        if isinstance(sessions, dict):
+            sessions = sessions.items()
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, 'wb') as f:
+            # Frame numbers and a sealed end frame are authenticated too: frames can't be reordered or dropped.
+            index = 0
+            for index, frame in enumerate(self._jsonl_frames(sessions, frame_bytes), 1):
+                self._write_frame(f, encryptor.encrypt(frame, f"snapshot:{index - 1}"))
+            self._write_frame(f, encryptor.encrypt(b"", f"snapshot:end:{index}"))
+        os.replace(tmp_filename, filename)
+        return SessionMessages.sessions_as_json_added_message(filename)[1]
+
+    @staticmethod
+    def _write_frame(f, sealed: bytes):
+        f.write(len(sealed).to_bytes(4, "big"))
+        f.write(sealed)
+
+    @staticmethod
+    def _read_frame(f, filename: str) -> Optional[bytes]:
+        length = f.read(4)
+        if not length:
+            return None
+        sealed = f.read(int.from_bytes(length, "big"))
+        if len(length) < 4 or not is_encrypted(sealed):
+            raise ValueError(f"'{filename}' is not an encrypted snapshot.")
+        return sealed
+
+    def _jsonl_frames(self, sessions: Iterable[Tuple[str, Dict]], frame_bytes: int) -> Iterator[bytes]:
+        lines, size = [], 0
+        for session_id, session in sessions:
+            entry = self._serialize_session(session)
+            entry["session_id"] = session_id
+            line = json.dumps(entry)
+            lines.append(line)
+            size += len(line) + 1
+            if size >= frame_bytes:
+                lines.append("")
+                yield "\n".join(lines).encode()
+                lines, size = [], 0
+        if lines:
+            lines.append("")
+            yield "\n".join(lines).encode()
+
+    def iter_sessions_encrypted(self, encryptor: ValueEncryptor,
+                                filename: str = "sessions.jsonl.enc") -> Iterator[Tuple[str, Dict]]:
+        """
+        Yield (session_id, session) pairs from an encrypted snapshot, one frame at a time.
+        """
+        with open(filename, 'rb') as f:
+            index = 0
+            sealed = self._read_frame(f, filename)
+            while sealed is not None:
+                following = self._read_frame(f, filename)
+                try:
+                    if following is None:
+                        encryptor.decrypt(sealed, f"snapshot:end:{index}")
+                        return
+                    frame = encryptor.decrypt(sealed, f"snapshot:{index}")
+                except ValueError:
+                    raise ValueError(f"'{filename}' is truncated, reordered or was tampered with.") from None
+                for line in frame.splitlines():
+                    entry = json.loads(line)
+                    yield entry.pop("session_id"), self._deserialize_session(entry)
+                index += 1
+                sealed = following
+            raise ValueError(f"'{filename}' is not an encrypted snapshot.")
+
+    @staticmethod
+    def _serialize_session(session: Dict) -> Dict:
+        return {
+            "unick_name": session["unick_name"],
+            "start_time": session["start_time"].isoformat(),
+            "end_time": session["end_time"].isoformat(),
+            "protected": session["protected"],
+            "password": session.get("password"),
+            "value": value_to_text(session.get("value")),
+        }
+
+    @staticmethod
+    def _deserialize_session(entry: Dict) -> Dict:
+        return {
+            "unick_name": entry.get("unick_name", get_default_unick_name()),
+            "start_time": datetime.datetime.fromisoformat(entry["start_time"]),
+            "end_time": datetime.datetime.fromisoformat(entry["end_time"]),
+            "protected": entry.get("protected", False),
+            "password": entry.get("password"),
+            "value": value_from_text(entry.get("value")),
+        }
+
     def store_sessions_csv(self, sessions: Dict[str, Dict], filename: str = "sessions.csv"):
         with open(filename, mode='w', newline='') as f:
             writer = csv.writer(f)
@@ -46,7 +203,7 @@ class SessionStoring:
                     session["end_time"].isoformat(),
                     session["protected"],
                     session["password"],
-                    session.get("value", "")
+                    value_to_text(session.get("value", ""))
                 ])
 
     def load_sessions_csv(self, csv_filename: str = "sessions.csv") -> Dict[str, Dict]:
@@ -61,118 +218,129 @@ class SessionStoring:
                         "end_time": datetime.datetime.fromisoformat(row["end_time"]),
                         "protected": row["protected"] == 'True',
                         "password": row["password"],
-                        "value": row["value"] if row["value"] else None
+                        "value": value_from_text(row["value"]) if row["value"] else None
                     }
         except FileNotFoundError:
             return {}
         return sessions
 
+    def sqlite_backend(self, filename: str = None) -> SQLiteBackend:
+        """
+        Return the long-lived SQLite backend for `filename`, creating it on first use.
+        """
+        filename = filename or self.db_name
+        backend = self.sqlite_backends.get(filename)
+        if backend is None:
+            backend = SQLiteBackend(filename, cache_size_kb=self.sqlite_cache_size_kb)
+            self.sqlite_backends[filename] = backend
+        return backend
+
     def store_sessions_sqlite(self, filename:str="sessions.db" ,sessions: Dict[str, Dict]=None):
-        conn = sqlite3.connect(self.db_name if not filename else filename)
-        cursor = conn.cursor()
-        cursor.execute("""CREATE TABLE IF NOT EXISTS sessions (
-            session_id TEXT PRIMARY KEY,
-            unick_name TEXT,
-            start_time TEXT,
-            end_time TEXT,
-            protected INTEGER,
-            password TEXT,
-            value TEXT
-        )""")
-        cursor.execute('DELETE FROM sessions')
-        for session_id, session in sessions.items():
-            cursor.execute('''INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)''', (
-                session_id,
-                session["unick_name"],
-                session["start_time"].isoformat(),
-                session["end_time"].isoformat(),
-                int(session["protected"]),
-                session["password"],
-                session.get("value", None),
-            ))
-        conn.commit()
-        conn.close()
+        self.sqlite_backend(filename).store_all(sessions)
 
-    def load_sessions_sqlite(self, filename:str="sessions.db") -> Dict[str, Dict]:
-        sessions = {}
-        conn = sqlite3.connect(self.db_name if not filename else filename)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM sessions')
-        for row in cursor.fetchall():
-            sessions[row[0]] = {
-                "unick_name": row[1],
-                "start_time": datetime.datetime.fromisoformat(row[2]),
-                "end_time": datetime.datetime.fromisoformat(row[3]),
-                "protected": bool(row[4]),
-                "password": row[5],
-                "value": row[6] if len(row) > 6 else None
-            }
-        conn.close()
-        return sessions
+    def store_sessions_sqlite_incremental(self, filename: str = "sessions.db", sessions: Dict[str, Dict] = None,
+                                          dirty: Iterable[str] = (), removed: Iterable[str] = ()):
+        """
+        Upsert only the `dirty` sessions and delete only the `removed` ones, in one transaction.
+        """
+        self.sqlite_backend(filename).store_changes(sessions, dirty, removed)
 
-    def store_sessions_postgresql(self, filename:str="sessions.db", sessions: Dict[str, Dict]=None, conn_string:str=None):
-        if not conn_string:
-            raise ValueError("Connection string is required for PostgreSQL.")
-        conn = psycopg2.connect(conn_string)
-        cursor = conn.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS sessions (
-            session_id TEXT PRIMARY KEY,
-            unick_name TEXT,
-            start_time TEXT,
-            end_time TEXT,
-            protected BOOLEAN,
-            password TEXT,
-            value TEXT
-        )''')
-        cursor.execute('DELETE FROM sessions')
-        for session_id, session in sessions.items():
-            cursor.execute('''INSERT INTO sessions VALUES (%s, %s, %s, %s, %s, %s, %s)''', (
-                session_id,
-                session["unick_name"],
-                session["start_time"].isoformat(),
-                session["end_time"].isoformat(),
-                session["protected"],
-                session["password"],
-                session.get("value", None)
-            ))
-        conn.commit()
-        conn.close()
+    def load_sessions_sqlite(self, filename:str="sessions.db", lazy: bool = False) -> Dict[str, Dict]:
+        return self.sqlite_backend(filename).load_all(lazy)
 
-    def load_sessions_postgresql(self, conn_string: str) -> Dict[str, Dict]:
-        sessions = {}
+    def close(self):
+        """
+        Close every pooled database connection.
+        """
+        for backend in list(self.sqlite_backends.values()) + list(self.postgresql_backends.values()):
+            backend.close()
+        self.sqlite_backends.clear()
+        self.postgresql_backends.clear()
+
+    def postgresql_backend(self, conn_string: str) -> PostgreSQLBackend:
+        """
+        Return the pooled PostgreSQL backend for `conn_string`, creating it on first use.
+        """
         if not conn_string:
             raise ValueError("Connection string is required for PostgreSQL.")
-        conn = psycopg2.connect(conn_string)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM sessions')
-        for row in cursor.fetchall():
-            sessions[row[0]] = {
-                "unick_name": row[1],
-                "start_time": datetime.datetime.fromisoformat(row[2]),
-                "end_time": datetime.datetime.fromisoformat(row[3]),
-                "protected": row[4],
-                "password": row[5],
-                "value": row[6] if len(row) > 6 else None
-            }
-        conn.close()
-        return sessions
+        backend = self.postgresql_backends.get(conn_string)
+        if backend is None:
+            backend = PostgreSQLBackend(conn_string)
+            self.postgresql_backends[conn_string] = backend
+        return backend
+
+    def store_sessions_postgresql(self, filename:str="sessions.db", sessions: Dict[str, Dict]=None, conn_string:str=None):
+        self.postgresql_backend(conn_string).store_all(sessions)
+
+    def store_sessions_postgresql_incremental(self, sessions: Dict[str, Dict] = None, conn_string: str = None,
+                                              dirty: Iterable[str] = (), removed: Iterable[str] = ()):
+        """
+        Upsert only the `dirty` sessions and delete only the `removed` ones, in one transaction.
+        """
+        self.postgresql_backend(conn_string).store_changes(sessions, dirty, removed)
+
+    def load_sessions_postgresql(self, conn_string: str, lazy: bool = False) -> Dict[str, Dict]:
+        return self.postgresql_backend(conn_string).load_all(lazy)
 
 
 class SessionManager:
-    def __init__(self, name:str, protect: bool = False, auto_renew: bool = False, min_password_length:int=6):
-        self.sessions: Dict[str, Dict] = {}
+    # Methods timed into latency histograms while metrics are enabled.
+    METRIC_OPERATIONS = ("create", "get", "remove", "lock", "unlock", "unlock_many", "expire_due", "save", "load",
+                         "save_sqlite", "load_sqlite", "save_postgresql", "load_postgresql")
+
+    def __init__(self, name:str, protect: bool = False, auto_renew: bool = False, min_password_length:int=6,
+                 password_hasher: Optional[PasswordHasher] = None, log_capacity: int = 1000,
+                 debug_sample_rate: float = 1.0, max_sessions: Optional[int] = None,
+                 max_bytes: Optional[int] = None, eviction: Union[str, EvictionPolicy] = "lru",
+                 renew_seconds: float = 3600.0, touch_interval: float = 5.0):
+        self.sessions: Dict[str, Session] = {}
+        self.name_index: Dict[str, str] = {}  # unick_name -> session_id
+        self.expiry_heap: List[Tuple[float, str]] = []  # (end epoch, session_id)
+        # Changes since the last save to / load from `synced_db`; only tracked once synced.
+        self.dirty: Set[str] = set()
+        self.removed: Set[str] = set()
+        self.synced_db: Optional[str] = None
+        self.journal: Optional[SessionJournal] = None
         self.filename = "sessions.json"
         self.db_name = "sessions.db"
         self.name = name
         self.protect = protect
-        self.logging = auto_renew
+        self.logging = False
+        # Sliding expiration: an access moves end_time to now + renew_seconds. The new
+        # deadlines are written to storage in one batch at most every touch_interval seconds.
+        self.auto_renew = auto_renew
+        self.renew_seconds = renew_seconds
+        self.touch_interval = touch_interval
+        self.touched: Set[str] = set()
+        self._last_touch_flush = time.monotonic()
         self.storer = SessionStoring(self.filename, self.db_name)
         self.mpl = min_password_length
+        self.hasher = password_hasher
         self.debug = True
+        self._lock = threading.RLock()
+        self.reaper = None
+        self.on_remove: Optional[Callable[[str, Session], None]] = None
+        self.metrics: Optional[SessionMetrics] = None
+        # Capacity limits; `eviction` stays None (and costs nothing) without one.
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.eviction: Optional[EvictionPolicy] = (
+            make_policy(eviction, self) if max_sessions is not None or max_bytes is not None else None
+        )
+        self.session_bytes: Dict[str, int] = {}
+        self.used_bytes = 0
+        # Set by a lazy load: values stay in `lazy_db` and are fetched into this cache on demand.
+        self.value_cache: Optional[ValueCache] = None
+        self.lazy_db: Optional[str] = None
+        self.compressor: Optional[ValueCompressor] = None
+        self.serializer: Optional[ValueSerializer] = None
+        self.encryptor: Optional[ValueEncryptor] = None
+        self.tokens: Optional[SessionTokens] = None
+        # Bounded ring buffers; per-call "debug" entries can be sampled.
         self.logs={
-            "errors": [],
-            "successful": [],
-            "debug": []
+            "errors": LogBuffer(log_capacity),
+            "successful": LogBuffer(log_capacity),
+            "debug": LogBuffer(log_capacity, debug_sample_rate)
         }
 
 
@@ -181,7 +349,8 @@ class SessionManager:
             duration_seconds: int = 3600, 
             value: str = None, 
             password: Optional[str] = None, 
-            custom_metadata: dict = {}
+            custom_metadata: dict = {},
+            session_id: Optional[str] = None
             ) -> str:
         """
         Create a new session and return its unique session ID.
@@ -195,120 +364,514 @@ class SessionManager:
                 a default name will be generated. If that name already exists, session
                 creation fails.
             duration_seconds (int): Duration of the session in seconds. Defaults to 3600 (1 hour).
-            value (str, optional): Optional value/data to attach to the session.
+            value (str, optional): Optional value/data to attach to the session; any
+                serializable object after enable_serialization().
             password (str, optional): Password for protected sessions. Required if `self.protect` is True.
             custom_metadata (dict, optional): Additional session metadata.
+            session_id (str, optional): Use this ID instead of generating a new one.
 
         Returns:
-            str: Unique session ID if successful, or error message string if failed.
+            str: Unique session ID if successful (a signed token for it once
+                enable_tokens() was called), or error message string if failed.
         """
-        session_id = generate_session_id()
-        now = datetime.datetime.now()
         protected = self.protect
         if unick_name is None:
             unick_name = get_default_unick_name()
-        if any(session.get("unick_name") == unick_name for session in self.sessions.values()):
+        if unick_name in self.name_index or session_id in self.sessions:
             return SessionMessages.SESSION_ALREADY_EXISTS
         if protected:
             if not password:
                 return SessionMessages.PROTECTED_SESSION
             if len(password) < self.mpl:
                 return SessionMessages.session_password_short(self.mpl)
-            hashed_password = hash_password(password)
+            # Hashed before taking the lock: a slow KDF must not stall other callers.
+            hashed_password = self._hash_password(password)
             if self.debug:
                 self.logs["successful"].append(SessionMessages.SESSION_PASSWORD_CREATED)
         else:
             hashed_password = None
             if password and self.debug:
                 self.logs["errors"].append(SessionMessages.session_password_incorrect_message(unick_name))
-        self.sessions[session_id] = {
-                "unick_name": unick_name,
-                "start_time": now,
-                "end_time": now + datetime.timedelta(seconds=duration_seconds),
-                "protected": protected,
-                "password": hashed_password,
-                "value": value,
-        }
-        print(self.sessions)
+        if session_id is None:
+            session_id = generate_session_id()
+        value = self._pack_value(value, session_id)  # encrypted values are bound to their session ID
+        with self._lock:
+            if unick_name in self.name_index or session_id in self.sessions:
+                return SessionMessages.SESSION_ALREADY_EXISTS
+            now = time.time()
+            session = Session(unick_name, now, now + duration_seconds, 1 if protected else 0, hashed_password, value)
+            if self.eviction is not None:
+                self._make_room(1, session.nbytes() if self.max_bytes is not None else 0)
+            self.sessions[session_id] = session
+            self.name_index[unick_name] = session_id
+            if self.eviction is not None:
+                self._track(session_id, session)
+            self._mark_dirty(session_id)
+            heapq.heappush(self.expiry_heap, (session.end, session_id))
+        if self.tokens is not None:
+            return self.tokens.issue(session_id, session.end, protected)
         return str(session_id) 
 
+    def create_many(self, entries: Iterable[Union[str, Dict]], duration_seconds: int = 3600, value: str = None,
+                    password: Optional[str] = None) -> List[str]:
+        """
+        Create many sessions at once.
+
+        Each entry is a unick_name or a dict of create() arguments (unick_name,
+        duration_seconds, value, password, session_id); missing ones fall back to
+        the arguments given here. Passwords are checked and hashed as one batch
+        (in parallel with a PasswordHasher), the indexes are updated under a single
+        lock and the new sessions are persisted as one batch. Returns, in input
+        order, the session ID (or token, see create) or the SessionMessages code
+        for every entry.
+        """
+        entries = [{"unick_name": entry} if isinstance(entry, str) or entry is None else entry for entry in entries]
+        # IDs are assigned up front: encrypted values are bound to their session ID.
+        new_ids = iter(generate_session_ids(sum(1 for entry in entries if not entry.get("session_id"))))
+        specs = []
+        for entry in entries:
+            session_id = entry.get("session_id") or next(new_ids)
+            specs.append((
+                entry.get("unick_name") or get_default_unick_name(),
+                entry.get("duration_seconds", duration_seconds),
+                self._pack_value(entry.get("value", value), session_id),
+                entry.get("password", password),
+                session_id,
+            ))
+        results: List[Optional[str]] = [None] * len(specs)
+        hashed: Dict[int, str] = {}
+        if self.protect:
+            for index, spec in enumerate(specs):
+                if not spec[3]:
+                    results[index] = SessionMessages.PROTECTED_SESSION
+                elif len(spec[3]) < self.mpl:
+                    results[index] = SessionMessages.SESSION_PASSWORD_TOO_SHORT
+            to_hash = [index for index, result in enumerate(results) if result is None]
+            hashed = dict(zip(to_hash, self._hash_many([specs[index][3] for index in to_hash])))
+        with self._lock:
+            pending = [index for index, result in enumerate(results) if result is None]
+            if self.eviction is not None:
+                self._make_room(len(pending))
+            protected = 1 if self.protect else 0
+            now = time.time()
+            created, entries_due = [], []
+            for index in pending:
+                unick_name, duration, session_value, _, session_id = specs[index]
+                if unick_name in self.name_index or session_id in self.sessions:
+                    results[index] = SessionMessages.SESSION_ALREADY_EXISTS
+                    continue
+                session = Session(unick_name, now, now + duration, protected, hashed.get(index), session_value)
+                self.sessions[session_id] = session
+                self.name_index[unick_name] = session_id
+                if self.eviction is not None:
+                    self._track(session_id, session)
+                created.append(session_id)
+                entries_due.append((session.end, session_id))
+                results[index] = session_id if self.tokens is None else self.tokens.issue(session_id, session.end,
+                                                                                          protected)
+            if len(entries_due) > len(self.expiry_heap):
+                self.expiry_heap.extend(entries_due)
+                heapq.heapify(self.expiry_heap)
+            else:
+                for entry in entries_due:
+                    heapq.heappush(self.expiry_heap, entry)
+            self._mark_dirty_many(created)
+            if self.eviction is not None:
+                self._make_room()
+        return results
 
+    @resolves_token
+    @synchronized
     def remove(self, session_id: str):
         """
         Remove a session by ID.
         """
         if session_id not in self.sessions:
             return SessionMessages.SESSION_NOT_FOUND
-        self.sessions.pop(session_id)
+        session = self.sessions.pop(session_id)
+        self._mark_removed(session_id)
+        self._forget(session_id, session)
+        # Heap entries are dropped lazily; rebuild once stale ones dominate.
+        if len(self.expiry_heap) > 2 * len(self.sessions) + 64:
+            self._rebuild_expiry_heap()
+
+    @synchronized
+    def remove_many(self, session_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Remove many sessions under one lock and persist the removals as one batch.
 
-    def get(self, session_id: str) -> Optional[Dict]:
+        Returns {session_id: SESSION_DELETE_SUCCESS or SESSION_NOT_FOUND}.
         """
-        Get the session dictionary for a given session ID.
+        results, removed = {}, []
+        for session_id in session_ids:
+            session = self.sessions.pop(session_id, None)
+            if session is None:
+                results[session_id] = SessionMessages.SESSION_NOT_FOUND
+                continue
+            self._forget(session_id, session)
+            removed.append(session_id)
+            results[session_id] = SessionMessages.SESSION_DELETE_SUCCESS
+        self._mark_removed_many(removed)
+        if len(self.expiry_heap) > 2 * len(self.sessions) + 64:
+            self._rebuild_expiry_heap()
+        return results
+
+    def _forget(self, session_id: str, session: Session):
+        # Index bookkeeping for a session that was just popped from self.sessions.
+        if self.value_cache is not None:
+            self.value_cache.discard(session_id)
+        if self.eviction is not None:
+            self._untrack(session_id)
+        if self.name_index.get(session.unick_name) == session_id:
+            self.name_index.pop(session.unick_name)
+        if self.tokens is not None and session.end > time.time():
+            # Tokens of an ended session fail their own expiry check; no need to keep them in the set.
+            self.tokens.revoke((session_id,))
+        if self.on_remove is not None:
+            self.on_remove(session_id, session)
+
+    @resolves_token
+    def get(self, session_id: str) -> Optional[Session]:
         """
-        if session_id in self.sessions:
-            return self.sessions[session_id]
+        Get the session (a dict-compatible Session record) for a given session ID.
+        """
+        # Read the record once: another thread may remove the session while we touch or renew it.
+        session = self.sessions.get(session_id)
+        if session is not None:
+            if self.metrics is not None:
+                self.metrics.increment("hits")
+            if self.eviction is not None:
+                self._touch(session_id)
+            if self.auto_renew:
+                self._renew(session_id)
+            return session
         else:
+            if self.metrics is not None:
+                self.metrics.increment("misses")
             message = SessionMessages.session_not_found_message(session_id)[1]
             if self.debug:
                 self.logs["errors"].append(message)
-                self.logs["debug"].append(f"GET -- {session_id}")
+                self.logs["debug"].append("GET -- %s", session_id)
             return message
 
+    def get_many(self, session_ids: Iterable[str]) -> Dict[str, Union[Session, str]]:
+        """
+        Return {session_id: Session, or SESSION_NOT_FOUND} for many IDs in one pass.
+
+        The bulk calls take plain session IDs, not tokens.
+        """
+        results, hits = {}, 0
+        for session_id in session_ids:
+            session = self.sessions.get(session_id)
+            if session is None:
+                results[session_id] = SessionMessages.SESSION_NOT_FOUND
+                continue
+            hits += 1
+            if self.eviction is not None:
+                self._touch(session_id)
+            if self.auto_renew:
+                self._renew(session_id)
+            results[session_id] = session
+        if self.metrics is not None:
+            self.metrics.increment("hits", hits)
+            self.metrics.increment("misses", len(results) - hits)
+        return results
+
+    @resolves_token
+    def extend(self, session_id: str, seconds: float) -> str:
+        """
+        Move a session's end_time `seconds` later (earlier if negative). See extend_many.
+        """
+        return self.extend_many((session_id,), seconds)[session_id]
+
+    @synchronized
+    def extend_many(self, session_ids: Iterable[str], seconds: float) -> Dict[str, str]:
+        """
+        Move the end_time of many sessions by `seconds` and persist them as one batch.
+
+        Returns {session_id: SESSION_EXTENDED, SESSION_TIMEOUT for a session that
+        already ended, or SESSION_NOT_FOUND}.
+        """
+        results, extended = {}, []
+        now = time.time()
+        for session_id in session_ids:
+            session = self.sessions.get(session_id)
+            if session is None:
+                results[session_id] = SessionMessages.SESSION_NOT_FOUND
+                continue
+            if session.end < now:
+                results[session_id] = SessionMessages.SESSION_TIMEOUT
+                continue
+            session.end += seconds
+            if seconds < 0:
+                # Later deadlines are re-filed lazily by _peek_expiry; earlier ones need an entry now.
+                heapq.heappush(self.expiry_heap, (session.end, session_id))
+            self.touched.discard(session_id)
+            extended.append(session_id)
+            results[session_id] = SessionMessages.SESSION_EXTENDED
+        if seconds < 0 and self.tokens is not None:
+            self.tokens.revoke(extended)
+        self._mark_dirty_many(extended)
+        if self.debug or self.logging:
+            for session_id in extended:
+                message = SessionMessages.session_extended_message(session_id)[0]
+                if self.debug:
+                    self.logs["successful"].append(message)
+                if self.logging:
+                    log.info(message)
+        return results
+
     def is_active(self, session_id: str) -> bool:
         """
         Check if the session is currently active.
+
+        A fresh signed token (see enable_tokens) is answered from its claims
+        alone, without a lookup or an auto_renew; anything else from the store.
         """
+        claims = self._token_claims(session_id)
+        if claims is not None:
+            if self._token_valid(claims):
+                return True
+            session_id = claims.session_id
+            if session_id not in self.sessions:
+                return False
         session = self.sessions[session_id]
-        now = datetime.datetime.now()
+        now = time.time()
         if self.debug:
-            self.logs["debug"].append(f"IS_ACTIVE -- {session_id}")
-        return session["start_time"] <= now <= session["end_time"]
+            self.logs["debug"].append("IS_ACTIVE -- %s", session_id)
+        active = session.start <= now <= session.end
+        if active and self.auto_renew:
+            self._renew(session_id)
+        return active
 
     def get_time_remaining(self, session_id: str) -> float:
         """
         Get the number of seconds remaining before the session expires.
         """
+        claims = self._token_claims(session_id)
+        if claims is not None:
+            if self._token_valid(claims):
+                return claims.expires - time.time()
+            session_id = claims.session_id
         session = self.get(session_id)
         if self.debug:
-            self.logs["debug"].append(f"GET_TIME_REMAINING -- {session_id}")
-        return max((session["end_time"] - datetime.datetime.now()).total_seconds(), 0.0)
+            self.logs["debug"].append("GET_TIME_REMAINING -- %s", session_id)
+        return max(session.end - time.time(), 0.0)
 
+    @resolves_token
     def time_passed(self, session_id: str) -> float:
         """
         Get the number of seconds that have passed since the session started.
         """
         session = self.get(session_id)
         if self.debug:
-            self.logs["debug"].append(f"TIME_PASSED -- {session_id}")
-        return max((datetime.datetime.now() - session["start_time"]).total_seconds(), 0.0)
+            self.logs["debug"].append("TIME_PASSED -- %s", session_id)
+        return max(time.time() - session.start, 0.0)
 
+    @synchronized
     def get_all(self) -> Dict[str, Dict]:
         """
         Return all sessions.
         """
-        removed_sessions = []
-        protected_sessions = []
-        for session_id, session in list(self.sessions.items()):
-            if session["protected"]:
-                if not session.get("password"):
-                    protected_sessions.append(session_id)
-                    continue
-            if session ["end_time"] < datetime.datetime.now():
-                removed_sessions.append(session_id)
-                self.remove(session_id)
+        removed_sessions = self.expire_due()
+        protected_sessions = [
+            session_id for session_id, session in self.sessions.items()
+            if session.protected and not session.password
+        ]
         if self.debug:
-            self.logs["debug"].append(f"GET_ALL -- total: {len(self.sessions)}")          
+            self.logs["debug"].append("GET_ALL -- total: %d", len(self.sessions))
         return {
-            session_id: self._flatten_session(session["session"])
+            session_id: self._flatten_session(session)
             for session_id, session in self.sessions.items()
         }, removed_sessions, protected_sessions
 
+    @synchronized
+    def expire_due(self, now: Optional[datetime.datetime] = None, limit: Optional[int] = None) -> List[str]:
+        """
+        Remove every session whose end_time has passed and return their IDs.
+
+        Only the sessions that are actually due are popped from the expiry heap,
+        so the cost is O(k log n) for k expired sessions instead of a full scan.
+        Protected sessions without a password are never expired. With `limit`
+        at most that many sessions are removed per call.
+        """
+        now = now.timestamp() if now else time.time()
+        expired, kept = [], []
+        while True:
+            head = self._peek_expiry()
+            if head is None or head[0] >= now:
+                break
+            if limit is not None and len(expired) >= limit:
+                break
+            entry = heapq.heappop(self.expiry_heap)
+            session = self.sessions[entry[1]]
+            if session.protected and not session.password:
+                kept.append(entry)  # back on the heap below: it expires once unlocked
+                continue
+            self.remove(entry[1])
+            expired.append(entry[1])
+        for entry in kept:
+            heapq.heappush(self.expiry_heap, entry)
+        if expired and self.metrics is not None:
+            self.metrics.increment("expirations", len(expired))
+        return expired
+
+    @synchronized
+    def next_expiry(self) -> Optional[datetime.datetime]:
+        """
+        Return the earliest end_time among the live sessions, or None if there are none.
+        """
+        head = self._peek_expiry()
+        return datetime.datetime.fromtimestamp(head[0]) if head is not None else None
+
+    def _peek_expiry(self) -> Optional[Tuple[float, str]]:
+        """
+        Return the heap's earliest live (end epoch, session_id), cleaning the top as it goes.
+
+        Entries of removed sessions are dropped; renewed sessions are pushed back
+        with their new deadline, since renewing never touches the heap itself.
+        """
+        heap = self.expiry_heap
+        while heap:
+            end_time, session_id = heap[0]
+            session = self.sessions.get(session_id)
+            if session is None or session.end < end_time:
+                heapq.heappop(heap)
+            elif session.end > end_time:
+                heapq.heapreplace(heap, (session.end, session_id))
+            else:
+                return heap[0]
+        return None
+
+    def iter_sessions(self, filter: Optional[Callable[[str, Session], bool]] = None, batch_size: int = 1000,
+                      cursor: Optional[str] = None) -> Iterator[SessionPage]:
+        """
+        Yield the sessions page by page, `batch_size` per page, without copying them.
+
+        Pages hold the live Session records (read them, do not change them) of
+        the sessions `filter(session_id, session)` accepts. Each page carries a
+        cursor: pass it back later, even to a new call, to continue after that
+        page. The last page, possibly empty, has cursor None. Sessions created
+        or removed meanwhile may or may not be included; removing sessions
+        already read, even while iterating, is safe. Only when the session a
+        cursor points to (the first one not read yet) is removed together with
+        earlier ones can a few sessions be skipped or repeated.
+        """
+        position, next_id = 0, None
+        if cursor:
+            offset, _, next_id = cursor.partition(":")
+            position, next_id = int(offset), next_id or None
+        items = None
+        size = 0
+        page: List[Tuple[str, Session]] = []
+        done = False
+        while not done:
+            with self._lock:
+                if items is None or len(self.sessions) != size or next_id not in self.sessions:
+                    items, position = self._seek(position, next_id)
+                try:
+                    for session_id, session in items:
+                        if len(page) == batch_size:
+                            # Keep the first session of the next page as the anchor for the cursor.
+                            next_id = session_id
+                            items = itertools.chain(((session_id, session),), items)
+                            size = len(self.sessions)
+                            break
+                        position += 1
+                        next_id = None
+                        if filter is None or filter(session_id, session):
+                            page.append((session_id, session))
+                    else:
+                        done = True
+                except RuntimeError:
+                    # The filter changed the table: find our place again.
+                    items = None
+                    continue
+            yield SessionPage(page, None if done else f"{position}:{next_id}")
+            page = []
+
+    def _seek(self, position: int, next_id: Optional[str]) -> Tuple[Iterator, int]:
+        # Iterator over self.sessions starting at `next_id`, expected at index `position`.
+        if next_id is not None:
+            items = itertools.islice(self.sessions.items(), position, None)
+            first = next(items, None)
+            if first is not None and first[0] == next_id:
+                return itertools.chain((first,), items), position
+            if next_id in self.sessions:
+                position = operator.indexOf(self.sessions, next_id)
+        return itertools.islice(self.sessions.items(), position, None), position
+
+    def snapshot(self, chunk_size: int = 10000) -> Iterator[Tuple[str, Session]]:
+        """
+        Return an iterator over copies of every current session.
+
+        The set of session IDs is fixed when this is called; the copies are then
+        taken `chunk_size` sessions at a time under the lock, so a long write of
+        the snapshot never blocks other callers for more than one chunk.
+        """
+        with self._lock:
+            session_ids = list(self.sessions)
+        return self._snapshot_chunks(session_ids, chunk_size)
+
+    def _snapshot_chunks(self, session_ids: List[str], chunk_size: int) -> Iterator[Tuple[str, Session]]:
+        for start in range(0, len(session_ids), chunk_size):
+            with self._lock:
+                chunk = [
+                    (session_id, self.sessions[session_id].copy())
+                    for session_id in session_ids[start:start + chunk_size]
+                    if session_id in self.sessions
+                ]
+            yield from chunk
+
+    def start_reaper(self, batch_size: int = 1000, max_interval: float = 60.0,
+                     callback: Optional[Callable[[int, int], None]] = None,
+                     use_asyncio: bool = False, min_interval: float = 0.1):
+        """
+        Start a background reaper that evicts expired sessions as they fall due.
+
+        The reaper runs as a daemon thread, or as a task on the running asyncio
+        loop when `use_asyncio` is True. `callback(expired, remaining)` is called
+        after every batch that removed at least one session.
+        """
+        if self.reaper is not None:
+            self.stop_reaper()
+        self.reaper = SessionReaper(self, batch_size, max_interval, callback, min_interval)
+        if use_asyncio:
+            self.reaper.start_async()
+        else:
+            self.reaper.start()
+        return self.reaper
+
+    def stop_reaper(self):
+        """
+        Stop the background reaper, if one is running.
+        """
+        if self.reaper is not None:
+            self.reaper.stop()
+            self.reaper = None
+
+    @synchronized
     def save(self, filename: Optional[str] = None) -> bool:
         """
-        Save all current session data to a file.
+        Save all current session data to a file (JSON, JSON-lines for '.jsonl', or an
+        encrypted JSON-lines snapshot for '.enc' once encryption is enabled).
         """
+        self.flush_touches()
+        if filename is None and self.journal is not None:
+            # Every change is already in the journal; just make sure it is on disk.
+            self.journal.sync()
+            return True
+        filename = filename or self.filename
         try:
-            self.storer.store_sessions_json(self.sessions, filename)
+            ext = self._get_file_extension(filename)
+            if ext == "jsonl":
+                self.storer.store_sessions_jsonl(self.sessions, filename)
+            elif ext == "enc":
+                self.storer.store_sessions_encrypted(self.sessions, self._require_encryptor(), filename)
+            else:
+                self.storer.store_sessions_json(self.sessions, filename)
+            if self.metrics is not None:
+                self.metrics.add_io_bytes(self._get_file_extension(filename), "write", os.path.getsize(filename))
             msg = SessionMessages.sessions_as_json_added_message(filename)[0]
             if self.debug:
                 self.logs["successful"].append(msg)
@@ -318,6 +881,112 @@ class SessionManager:
                 self.logs["errors"].append(f"[SAVE ERROR] ({filename}) {str(e)}")
             return False
 
+    @synchronized
+    def save_sqlite(self, filename: Optional[str] = None, full: bool = False) -> bool:
+        """
+        Save sessions to a SQLite database.
+
+        When the database is the one last saved to or loaded from, only the
+        sessions changed since then are upserted and removed ones deleted.
+        Otherwise (or with `full=True`) the whole table is rewritten.
+        """
+        filename = filename or self.db_name
+        return self._save_db(
+            filename, full,
+            lambda: self.storer.store_sessions_sqlite(filename, self.sessions),
+            lambda: self.storer.store_sessions_sqlite_incremental(filename, self.sessions, self.dirty, self.removed),
+            SessionMessages.sessions_as_sqlite_added_message(filename)[0], "sqlite",
+        )
+
+    @synchronized
+    def load_sqlite(self, filename: Optional[str] = None, lazy: bool = False,
+                    value_cache_bytes: int = 64 * 1024 * 1024):
+        """
+        Load sessions from a SQLite database and restore them into the session manager.
+
+        With `lazy=True` only the metadata is read; each value is fetched on its
+        first get_value() and kept in an LRU cache of `value_cache_bytes`.
+        """
+        filename = filename or self.db_name
+        return self._load_db(
+            filename,
+            lambda: self.storer.load_sessions_sqlite(filename, lazy),
+            SessionMessages.session_as_sqlite_loaded_message(filename), "sqlite",
+            value_cache_bytes if lazy else None,
+        )
+
+    @synchronized
+    def save_postgresql(self, conn_string: str, full: bool = False) -> bool:
+        """
+        Save sessions to PostgreSQL: COPY for a full snapshot, batched upserts for later saves.
+        """
+        return self._save_db(
+            conn_string, full,
+            lambda: self.storer.store_sessions_postgresql(sessions=self.sessions, conn_string=conn_string),
+            lambda: self.storer.store_sessions_postgresql_incremental(self.sessions, conn_string, self.dirty, self.removed),
+            SessionMessages.sessions_as_postgresql_added_message(conn_string)[0], "postgresql",
+        )
+
+    @synchronized
+    def load_postgresql(self, conn_string: str, lazy: bool = False, value_cache_bytes: int = 64 * 1024 * 1024):
+        """
+        Load sessions from PostgreSQL and restore them into the session manager (`lazy`: see load_sqlite).
+        """
+        return self._load_db(
+            conn_string,
+            lambda: self.storer.load_sessions_postgresql(conn_string, lazy),
+            SessionMessages.session_as_postgresql_loaded_message(conn_string), "postgresql",
+            value_cache_bytes if lazy else None,
+        )
+
+    def _save_db(self, target: str, full: bool, store_all: Callable, store_changes: Callable, message: str,
+                 backend: str = "db") -> bool:
+        self.flush_touches()
+        try:
+            if (full or self.synced_db != target) and self.lazy_db == target:
+                # A full rewrite replaces the rows the lazy values would be read from.
+                self._materialize_values()
+            if full or self.synced_db != target:
+                written = self.sessions
+                store_all()
+            elif self.dirty or self.removed:
+                written = self.dirty
+                store_changes()
+            else:
+                written = ()
+            if self.metrics is not None:
+                self._record_io(backend, "write", written)
+            self._reset_sync_state(target)
+            if self.debug:
+                self.logs["successful"].append(message)
+            return True
+        except Exception as e:
+            if self.debug:
+                self.logs["errors"].append(f"[SAVE ERROR] ({target}) {str(e)}")
+            return False
+
+    def _load_db(self, target: str, load_all: Callable, message: tuple, backend: str = "db",
+                 value_cache_bytes: Optional[int] = None):
+        try:
+            self.sessions = self._to_records(load_all().items())
+        except Exception as e:
+            raise ValueError(f"Failed to load sessions: {str(e)}")
+        self._set_lazy_source(target if value_cache_bytes is not None else None, value_cache_bytes)
+        if self.metrics is not None:
+            self._record_io(backend, "read", self.sessions)
+        self._rebuild_name_index()
+        self._rebuild_expiry_heap()
+        self._reset_sync_state(target)
+        self._rebuild_eviction()
+        if self.tokens is not None:
+            self.tokens.revoke_all()
+        if self.journal is not None:
+            self.journal.compact(self.sessions)
+        if self.logging:
+            log.info(message[0])
+        return message[1]
+
+    @synchronized
     def load(self, filename: str = None):
         """
         Load session data from a file and restore it into the session manager.
@@ -325,9 +994,26 @@ class SessionManager:
         ext = self._get_file_extension(filename)
 
         try:
-            with open(filename, 'r') as f:
-                data = json.load(f)
-            self.sessions = self._deserialize_session_data(data)
+            if ext == "jsonl":
+                self.sessions = self._to_records(self.storer.iter_sessions_jsonl(filename))
+            elif ext == "enc":
+                self.sessions = self._to_records(self.storer.iter_sessions_encrypted(self._require_encryptor(),
+                                                                                     filename))
+            else:
+                with open(filename, 'r') as f:
+                    data = json.load(f)
+                self.sessions = self._to_records(self._deserialize_session_data(data).items())
+            self._rebuild_name_index()
+            self._rebuild_expiry_heap()
+            self._reset_sync_state(None)
+            self._set_lazy_source(None)
+            self._rebuild_eviction()
+            if self.tokens is not None:
+                self.tokens.revoke_all()
+            if self.metrics is not None:
+                self.metrics.add_io_bytes(ext, "read", os.path.getsize(filename))
+            if self.journal is not None:
+                self.journal.compact(self.sessions)
             msg = SessionMessages.session_as_json_loaded_message(filename)
             if self.logging or self.logging:
                 log.info(msg[0])
@@ -336,16 +1022,32 @@ class SessionManager:
             raise ValueError("Error loading sessions: Invalid JSON format.")
         except FileNotFoundError:
             self.sessions = {}
+            self.name_index = {}
+            self.expiry_heap = []
+            self._rebuild_eviction()
             raise ValueError(f"[LOAD ERROR] File '{filename}' not found for extension '{ext}'")
         except Exception as e:
             raise ValueError(f"Failed to load sessions: {str(e)}")
 
 
+    @synchronized
     def clean_all(self):
         """
         Clear all sessions and overwrite the session file.
         """
+        if self.synced_db is not None:
+            self.removed.update(self.sessions)
+            self.dirty.clear()
+        self.touched.clear()
         self.sessions.clear()
+        self._set_lazy_source(None)
+        self.name_index.clear()
+        self.expiry_heap.clear()
+        self._rebuild_eviction()
+        if self.tokens is not None:
+            self.tokens.revoke_all()
+        if self.journal is not None:
+            self.journal.compact(self.sessions)
         with open(self.filename, 'w') as f:
             json.dump(self.sessions, f)
 
@@ -353,35 +1055,80 @@ class SessionManager:
         """get_id_by_unick_name
         Get the session ID for a given session name, if the session is not protected.
         """
-        for session_id, session in self.sessions.items():
-            if not session.get("protected") and session["unick_name"] == unick_name:
-                return session_id
-            if session.get("protected") and session["unick_name"] == unick_name:
-                if logging or self.logging:
-                    log.info(SessionMessages.protected_session_message(session_id)[0])
-                return SessionMessages.protected_session_message(session_id)[1]
-        return None
+        session_id = self.name_index.get(unick_name)
+        if session_id is None:
+            return None
+        if self.sessions[session_id].protected:
+            if logging or self.logging:
+                log.info(SessionMessages.protected_session_message(session_id)[0])
+            return SessionMessages.protected_session_message(session_id)[1]
+        return session_id
 
     def unlock(self, unick_name: str, password: str, logging:bool=False) -> Optional[str]:
         """
         Unlock a protected session for a given unick_name by verifying the hashed password.
         """
-        for session_id, session in self.sessions.items():
-            if session["unick_name"] == unick_name and session.get("protected"):
-                if verify_password(password, session.get("password")):
-                    session["protected"] = False
-                    session["password"] = None
-                    if logging or self.logging:
-                        log.info(SessionMessages.unlock_message(session_id)[0])
-                    return SessionMessages.unlock_message(session_id)[1]
-                else:
-                    return 
+        session_id = self.name_index.get(unick_name)
+        session = self.sessions.get(session_id)
+        if session is not None and session.protected:
+            stored_hash = session.password
+            # Verified outside the lock; the session must be unchanged to apply the unlock.
+            if self._verify_password(password, stored_hash):
+                with self._lock:
+                    if self.sessions.get(session_id) is not session or session.password != stored_hash:
+                        return SessionMessages.session_unlock_failed_message(session_id)[1]
+                    session.protected = 0
+                    session.password = None
+                    self._mark_dirty(session_id)
+                    self._revoke_token(session_id)
+                if logging or self.logging:
+                    log.info(SessionMessages.unlock_message(session_id)[0])
+                return SessionMessages.unlock_message(session_id)[1]
+            else:
+                return 
         if logging or self.logging:
             log.warning(SessionMessages.session_not_found_message(unick_name)[0])
         return SessionMessages.session_not_found_message(unick_name)[1]
+
+    def unlock_many(self, credentials: Dict[str, str], logging:bool=False) -> Dict[str, Optional[str]]:
+        """
+        Unlock several sessions at once from a {unick_name: password} dict.
+
+        With a PasswordHasher the passwords are verified in parallel on its pool.
+        Returns {unick_name: code} with the same codes as unlock(); a wrong
+        password gives SESSION_UNLOCK_FAILED.
+        """
+        results: Dict[str, Optional[str]] = {}
+        candidates = []
+        for unick_name, password in credentials.items():
+            session_id = self.name_index.get(unick_name)
+            session = self.sessions.get(session_id)
+            if session is None or not session.protected:
+                results[unick_name] = SessionMessages.session_not_found_message(unick_name)[1]
+            else:
+                candidates.append((unick_name, session_id, session, session.password, password))
+        pairs = [(password, stored_hash) for _, _, _, stored_hash, password in candidates]
+        if self.hasher:
+            verified = self.hasher.verify_many(pairs)
+        else:
+            verified = [verify_password(*pair) for pair in pairs]
+        with self._lock:
+            for (unick_name, session_id, session, stored_hash, _), ok in zip(candidates, verified):
+                if not ok or self.sessions.get(session_id) is not session or session.password != stored_hash:
+                    results[unick_name] = SessionMessages.session_unlock_failed_message(session_id)[1]
+                    continue
+                session.protected = 0
+                session.password = None
+                self._mark_dirty(session_id)
+                self._revoke_token(session_id)
+                results[unick_name] = SessionMessages.unlock_message(session_id)[1]
+                if logging or self.logging:
+                    log.info(SessionMessages.unlock_message(session_id)[0])
+        return results
     
 
 
+    @resolves_token
     def lock(self, session_id: str, password: str, logging:bool=False) -> Optional[str]:
         """
         Lock a session by setting a password.
@@ -390,11 +1137,11 @@ class SessionManager:
             if logging or self.logging:
                 log.warning(SessionMessages.session_not_found_message(session_id)[0])
             return SessionMessages.session_not_found_message(session_id)[1]
-        if self.sessions[session_id].get("protected"):
+        if self.sessions[session_id].protected:
             if logging or self.logging:
                 log.warning(SessionMessages.session_already_locked_message(session_id)[0])
             return SessionMessages.session_already_locked_message(session_id)[1]
-        if self.sessions[session_id].get("password"):
+        if self.sessions[session_id].password:
             if logging or self.logging:
                 log.warning(SessionMessages.session_already_locked_message(session_id)[0])
             return SessionMessages.session_already_locked_message(session_id)[1]
@@ -407,25 +1154,315 @@ class SessionManager:
                 log.error(SessionMessages.session_password_incorrect_message(session_id)[0])
             raise ValueError("Password must be at least 6 characters long.")
         
-        self.sessions[session_id]["protected"] = True
-        self.sessions[session_id]["password"] = hash_password(password)
-        self.store_sessions(self.filename)
-        self.load_sessions(self.filename)
-
-        return self.sessions[session_id]
+        hashed_password = self._hash_password(password)
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return SessionMessages.session_not_found_message(session_id)[1]
+            if session.protected or session.password:
+                return SessionMessages.session_already_locked_message(session_id)[1]
+            session.protected = 1
+            session.password = hashed_password
+            self._mark_dirty(session_id)
+            self._revoke_token(session_id)
+        return session
     
 
+    @resolves_token
+    @synchronized
+    def set_value(self, session_id: str, value: str) -> Optional[str]:
+        """
+        Replace the value associated with an unprotected session.
+        """
+        if session_id not in self.sessions:
+            return SessionMessages.session_not_found_message(session_id)[1]
+        if self.sessions[session_id].protected:
+            return SessionMessages.session_locked_message(session_id)[1]
+        if self.auto_renew:
+            self._renew(session_id)
+            self.touched.discard(session_id)  # written with the value below
+        self.sessions[session_id].value = self._pack_value(value, session_id)
+        if self.value_cache is not None:
+            self.value_cache.discard(session_id)
+        self._mark_dirty(session_id)
+        if self.eviction is not None:
+            self.eviction.touch(session_id)
+            self._track(session_id, self.sessions[session_id])
+            self._make_room(keep=session_id)
+
+    @synchronized
+    def enable_journal(self, path: str = "sessions.journal", snapshot_path: str = "sessions.jsonl",
+                       fsync: Union[str, int, float] = "always", compact_bytes: int = 64 * 1024 * 1024) -> int:
+        """
+        Switch to write-ahead journal mode and restore sessions from snapshot plus journal.
+
+        From now on every create, remove, lock, unlock and value change appends one
+        record to `path`; the journal is folded into the JSON-lines snapshot at
+        `snapshot_path` once it exceeds `compact_bytes`. `fsync` is "always",
+        "never" or an interval in milliseconds. When neither file exists yet, the
+        current sessions become the first snapshot. Returns the number of sessions.
+        """
+        if self.journal is not None:
+            self.journal.close()
+        fresh = not os.path.exists(path) and not os.path.exists(snapshot_path)
+        self.journal = SessionJournal(self.storer, path, snapshot_path, fsync, compact_bytes)
+        if fresh:
+            self.journal.compact(self.sessions)
+            return len(self.sessions)
+        self.sessions = self._to_records(self.journal.replay().items())
+        self._rebuild_name_index()
+        self._rebuild_expiry_heap()
+        self._reset_sync_state(None)
+        self._set_lazy_source(None)
+        self._rebuild_eviction()
+        if self.tokens is not None:
+            self.tokens.revoke_all()
+        if self.journal.needs_compaction():
+            self.journal.compact(self.sessions)
+        return len(self.sessions)
+
+    @synchronized
+    def disable_journal(self):
+        """
+        Leave journal mode after folding the journal into the snapshot.
+        """
+        if self.journal is not None:
+            self.journal.compact(self.sessions)
+            self.journal.close()
+            self.journal = None
+
+    @resolves_token
     def get_value(self, session_id: str) -> Optional[str]:
         """
-        Get the value associated with a session.
+        Get the value associated with a session (fetched on first use after a lazy load, decrypted,
+        decompressed and deserialized if needed).
         """
-        if session_id in self.sessions:
-            if self.sessions[session_id].get("protected"):
+        session = self.sessions.get(session_id)
+        if session is not None:
+            if session.protected:
                 return SessionMessages.session_locked_message(session_id)[1]
-            return self.sessions[session_id].get("value")
+            if self.eviction is not None:
+                self._touch(session_id)
+            if self.auto_renew:
+                self._renew(session_id)
+            value = session.value
+            if type(value) is LazyValue:
+                value_cache = self.value_cache
+                value = value_cache.get(session_id, value) if value_cache is not None else value.load()
+            if self.encryptor is not None:
+                value = self.encryptor.decrypt(value, session_id)
+            value = decompress_value(value)
+            if self.serializer is not None:
+                value = unpack_value(value)
+            return unescape_value(value)
         else:
             raise ValueError(f"Session ID {session_id} not found.")
 
+    def enable_metrics(self, metrics: Optional[SessionMetrics] = None) -> SessionMetrics:
+        """
+        Start recording counters, latencies and I/O bytes into `metrics` (a new SessionMetrics by default).
+        """
+        self.metrics = metrics or SessionMetrics()
+        self.metrics.register_gauge("sessions", lambda: len(self.sessions))
+        instrument(self, self.METRIC_OPERATIONS, self.metrics)
+        return self.metrics
+
+    def disable_metrics(self):
+        uninstrument(self, self.METRIC_OPERATIONS)
+        self.metrics = None
+
+    def enable_tokens(self, tokens: Optional[SessionTokens] = None) -> SessionTokens:
+        """
+        Make create() return signed tokens (`tokens`, a new SessionTokens by default) instead of bare IDs.
+
+        is_active() and get_time_remaining() answer a fresh token from its claims
+        without touching the store; the other single-session methods accept a
+        token wherever they take a session ID. Removing, locking, unlocking or
+        shortening a session revokes the tokens issued for it so far.
+        """
+        self.tokens = tokens or SessionTokens()
+        return self.tokens
+
+    def disable_tokens(self):
+        """
+        Return bare session IDs again; tokens issued earlier are no longer accepted.
+        """
+        self.tokens = None
+
+    @resolves_token
+    def issue_token(self, session_id: str) -> str:
+        """
+        Issue a new token for an existing session, e.g. after the old one went stale.
+        """
+        if self.tokens is None:
+            raise ValueError("Tokens are not enabled; call enable_tokens() first.")
+        session = self.get(session_id)
+        if not isinstance(session, Session):
+            return session
+        return self.tokens.issue(session_id, session.end, bool(session.protected))
+
+    @synchronized
+    def enable_compression(self, codec: Union[str, ValueCodec] = "zlib", threshold: int = 1024) -> ValueCompressor:
+        """
+        Keep values of at least `threshold` characters compressed with `codec`, in memory and on disk.
+
+        Values already held are compressed now and saved on the next save. Only
+        get_value() decompresses; get() and the stores see the compressed text.
+        """
+        self.compressor = ValueCompressor(codec, threshold)
+        self._repack_values(lambda session_id, value: value if is_compressed(value) or is_encrypted(value)
+                            else self.compressor.compress(value))
+        return self.compressor
+
+    def disable_compression(self):
+        """
+        Store new values uncompressed; values compressed earlier still read back through get_value().
+        """
+        self.compressor = None
+
+    @synchronized
+    def enable_serialization(self, serializer: Union[str, ValueSerializer] = "pickle") -> ValueSerializer:
+        """
+        Accept any value (dict, list, bytes, ...): everything but str and None is stored as serializer bytes.
+
+        Those bytes go as they are to memory, a SQLite BLOB or a PostgreSQL BYTEA
+        column (base64 only in JSON, CSV and the journal). get_value() returns the
+        object again; the serializer must be enabled in every process that reads
+        the values. Structured values already held are serialized now.
+        """
+        self.serializer = make_serializer(serializer)
+        self._repack_values(lambda session_id, value: value if is_serialized(value) or is_compressed(value)
+                            or is_encrypted(value) else self._encode_value(value, session_id))
+        return self.serializer
+
+    def disable_serialization(self):
+        """
+        Store new values as given; get_value() then returns serialized values as raw bytes.
+        """
+        self.serializer = None
+
+    @synchronized
+    def enable_encryption(self, key_ring: Optional[KeyRing] = None) -> ValueEncryptor:
+        """
+        Keep values AES-GCM encrypted with the active key of `key_ring`, in memory and in every store.
+
+        Use KeyRing(path) to keep the keys in a file that restarts and other
+        processes can read; the default ring lives in this process only. Values
+        already held are encrypted now (a lazy load is fetched first) and saved
+        on the next save. Only get_value() decrypts; get() and the stores see the
+        ciphertext. save()/load() with an '.enc' file name also encrypt the
+        snapshot as a whole.
+        """
+        encryptor = ValueEncryptor(key_ring or KeyRing())
+        previous = self.encryptor or encryptor
+        self._recrypt_values(lambda session_ids, values: encryptor.encrypt_many(
+            previous.decrypt_many(values, session_ids), session_ids))
+        self.encryptor = encryptor
+        return encryptor
+
+    @synchronized
+    def disable_encryption(self):
+        """
+        Decrypt every value held and store values in the clear from now on.
+        """
+        if self.encryptor is not None:
+            encryptor = self.encryptor
+            self._recrypt_values(lambda session_ids, values: encryptor.decrypt_many(values, session_ids))
+            self.encryptor = None
+
+    def rotate_encryption_key(self) -> str:
+        """
+        Make a new key active and re-encrypt every value held with it; returns the new key ID.
+
+        Older keys stay in the ring for values saved elsewhere; retire them with
+        KeyRing.retire() once nothing encrypted with them is left.
+        """
+        key_id = self._require_encryptor().key_ring.rotate()
+        self._reencrypt_values()
+        return key_id
+
+    @synchronized
+    def _reencrypt_values(self):
+        encryptor = self.encryptor
+        self._recrypt_values(lambda session_ids, values: encryptor.encrypt_many(
+            encryptor.decrypt_many(values, session_ids), session_ids))
+
+    def _require_encryptor(self) -> ValueEncryptor:
+        if self.encryptor is None:
+            raise ValueError("Encryption is not enabled; call enable_encryption() first.")
+        return self.encryptor
+
+    def _pack_value(self, value, session_id: str):
+        # The stored form of a value: escaped first (see escape_value), then serialized, compressed, encrypted.
+        return self._encode_value(escape_value(value), session_id)
+
+    def _encode_value(self, value, session_id: str):
+        if self.serializer is not None:
+            value = self.serializer.pack(value)
+        if self.compressor is not None:
+            value = self.compressor.compress(value)
+        if self.encryptor is not None:
+            value = self.encryptor.encrypt(value, session_id)
+        return value
+
+    def _repack_values(self, pack: Callable):
+        self._repack_many(lambda session_ids, values: [pack(session_id, value)
+                                                       for session_id, value in zip(session_ids, values)])
+
+    def _recrypt_values(self, recrypt: Callable[[List, List], List]):
+        # Every value has to pass through the new key: fetch the ones still on disk first.
+        if self.lazy_db is not None:
+            self._materialize_values()
+        self._repack_many(recrypt)
+
+    def _repack_many(self, pack_many: Callable[[List, List], List]):
+        # pack_many(session_ids, values) -> new values. Values still on disk after a lazy load are left as they are.
+        session_ids = [session_id for session_id, session in self.sessions.items()
+                       if type(session.value) is not LazyValue]
+        changed = []
+        packed = pack_many(session_ids, [self.sessions[session_id].value for session_id in session_ids])
+        for session_id, value in zip(session_ids, packed):
+            session = self.sessions[session_id]
+            if value is not session.value:
+                session.value = value
+                changed.append(session_id)
+        if changed:
+            if self.value_cache is not None:
+                for session_id in changed:
+                    self.value_cache.discard(session_id)
+            self._mark_dirty_many(changed)
+            if self.eviction is not None:
+                for session_id in changed:
+                    self._track(session_id, self.sessions[session_id])
+
+    @synchronized
+    def flush_touches(self) -> int:
+        """
+        Hand every deadline moved by sliding expiration to storage in one batch.
+
+        The sessions go through the usual change tracking (dirty set, journal, write
+        queue), so they reach the backend with the next save or flush. Returns the
+        number of sessions handed over.
+        """
+        self._last_touch_flush = time.monotonic()
+        if not self.touched:
+            return 0
+        touched, self.touched = self.touched, set()
+        touched = [session_id for session_id in touched if session_id in self.sessions]
+        self._mark_dirty_many(touched)
+        return len(touched)
+
+    def close(self):
+        """
+        Stop the reaper and close pooled storage connections.
+        """
+        self.stop_reaper()
+        self.flush_touches()
+        self.storer.close()
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
     def _get_file_extension(self, filename: str) -> str:
         if '.' not in filename:
             raise ValueError("Filename must include an extension (e.g., 'sessions.json').")
@@ -438,10 +1475,192 @@ class SessionManager:
             session["protected"] = session.get("protected", False)
             session["password"] = session.get("password")
             session["unick_name"] = session.get("unick_name", get_default_unick_name())
-            session["value"] = session.get("value")
+            session["value"] = value_from_text(session.get("value"))
         return sessions
 
 
+    @staticmethod
+    def _to_records(sessions: Iterable[Tuple[str, Dict]]) -> Dict[str, Session]:
+        return {session_id: Session.from_dict(session) for session_id, session in sessions}
+
+    def _record_io(self, backend: str, direction: str, session_ids: Iterable[str]):
+        self.metrics.add_io_bytes(backend, direction, sum(
+            payload_bytes(session_id, self.sessions[session_id])
+            for session_id in session_ids if session_id in self.sessions
+        ))
+
+    def _hash_password(self, password: str) -> str:
+        return self.hasher.hash(password) if self.hasher else hash_password(password)
+
+    def _hash_many(self, passwords: List[str]) -> List[str]:
+        if not passwords:
+            return []
+        return self.hasher.hash_many(passwords) if self.hasher else [hash_password(password) for password in passwords]
+
+    def _verify_password(self, password: str, stored_hash: str) -> bool:
+        return self.hasher.verify(password, stored_hash) if self.hasher else verify_password(password, stored_hash)
+
+    def _token_claims(self, token) -> Optional[TokenClaims]:
+        # Claims of a valid signed token; None for a plain session ID.
+        return self.tokens.verify(token) if self.tokens is not None else None
+
+    def _token_valid(self, claims: TokenClaims) -> bool:
+        # True when the claims alone prove the session active.
+        if time.time() <= claims.expires and self._token_fresh(claims):
+            if self.metrics is not None:
+                self.metrics.increment("token_hits")
+            return True
+        return False
+
+    def _token_fresh(self, claims: TokenClaims) -> bool:
+        return self.tokens.fresh(claims)
+
+    def _revoke_token(self, session_id: str):
+        if self.tokens is not None:
+            self.tokens.revoke((session_id,))
+
+    def _set_lazy_source(self, db_name: Optional[str], value_cache_bytes: Optional[int] = None):
+        self.lazy_db = db_name
+        self.value_cache = ValueCache(value_cache_bytes) if db_name is not None else None
+
+    def _materialize_values(self, values: Optional[Dict[str, object]] = None):
+        """
+        Fetch every value still on disk into its session record and leave lazy mode.
+
+        The values are read with one query, or taken from `values` (see _read_lazy_values).
+        """
+        if values is None:
+            values = self._read_lazy_values()
+        for session_id, session in self.sessions.items():
+            value = session.value
+            if type(value) is LazyValue:
+                session.value = values[session_id] if session_id in values else value.load()
+        self._set_lazy_source(None)
+
+    def _read_lazy_values(self) -> Dict[str, object]:
+        # The whole lazy source in one query; only the lookup of its backend takes the lock.
+        with self._lock:
+            lazy = next((session.value for session in self.sessions.values() if type(session.value) is LazyValue),
+                        None)
+        return lazy.backend.load_values() if lazy is not None else {}
+
+    def _reset_sync_state(self, db_name: Optional[str]):
+        self.dirty = set()
+        self.removed = set()
+        self.touched = set()
+        self.synced_db = db_name
+
+    @synchronized
+    def _renew(self, session_id: str):
+        # Memory only; flush_touches() writes the new deadline later.
+        session = self.sessions.get(session_id)
+        if session is None:
+            return  # removed by another thread since the caller looked
+        now = time.time()
+        end = now + self.renew_seconds
+        if session.end < now or session.end >= end:
+            return  # expired sessions are not revived, longer deadlines not shortened
+        session.end = end
+        self.touched.add(session_id)
+        if time.monotonic() - self._last_touch_flush >= self.touch_interval:
+            self.flush_touches()
+
+    def _mark_dirty(self, session_id: str):
+        if self.synced_db is not None:
+            self.dirty.add(session_id)
+        if self.journal is not None:
+            self.journal.record_put(session_id, self.sessions[session_id])
+            self._compact_journal_if_needed()
+
+    def _mark_dirty_many(self, session_ids: List[str]):
+        if self.synced_db is not None:
+            self.dirty.update(session_ids)
+        if self.journal is not None:
+            self.journal.record_puts((session_id, self.sessions[session_id]) for session_id in session_ids)
+            self._compact_journal_if_needed()
+
+    def _mark_removed(self, session_id: str):
+        self.touched.discard(session_id)
+        if self.synced_db is not None:
+            self.dirty.discard(session_id)
+            self.removed.add(session_id)
+        if self.journal is not None:
+            self.journal.record_remove(session_id)
+            self._compact_journal_if_needed()
+
+    def _mark_removed_many(self, session_ids: List[str]):
+        self.touched.difference_update(session_ids)
+        if self.synced_db is not None:
+            self.dirty.difference_update(session_ids)
+            self.removed.update(session_ids)
+        if self.journal is not None:
+            self.journal.record_removes(session_ids)
+            self._compact_journal_if_needed()
+
+    def _compact_journal_if_needed(self):
+        if self.journal.needs_compaction():
+            self.journal.compact(self.sessions)
+
+    def _track(self, session_id: str, session: Session):
+        self.eviction.add(session_id)
+        if self.max_bytes is not None:
+            size = session.nbytes()
+            self.used_bytes += size - self.session_bytes.get(session_id, 0)
+            self.session_bytes[session_id] = size
+
+    def _untrack(self, session_id: str):
+        self.eviction.remove(session_id)
+        self.used_bytes -= self.session_bytes.pop(session_id, 0)
+
+    def _touch(self, session_id: str):
+        with self._lock:
+            self.eviction.touch(session_id)
+
+    def _make_room(self, extra_sessions: int = 0, extra_bytes: int = 0, keep: Optional[str] = None):
+        """
+        Evict sessions until `extra_sessions` more sessions of `extra_bytes` fit within the limits.
+        """
+        while self.sessions and (
+            (self.max_sessions is not None and len(self.sessions) + extra_sessions > self.max_sessions)
+            or (self.max_bytes is not None and self.used_bytes + extra_bytes > self.max_bytes)
+        ):
+            victim = self.eviction.victim()
+            if victim is None or victim == keep:
+                break
+            self._evict(victim)
+            if self.metrics is not None:
+                self.metrics.increment("evictions")
+            if self.debug:
+                self.logs["debug"].append("EVICT -- %s", victim)
+            if self.logging:
+                log.info(f"Session {victim} evicted.")
+
+    def _evict(self, session_id: str):
+        self.remove(session_id)
+
+    def _rebuild_eviction(self):
+        if self.eviction is None:
+            return
+        self.eviction.clear()
+        self.session_bytes = {}
+        self.used_bytes = 0
+        for session_id, session in self.sessions.items():
+            self._track(session_id, session)
+        self._make_room()
+
+    def _rebuild_name_index(self):
+        self.name_index = {
+            session.unick_name: session_id
+            for session_id, session in self.sessions.items()
+        }
+
+    def _rebuild_expiry_heap(self):
+        self.expiry_heap = [
+            (session.end, session_id)
+            for session_id, session in self.sessions.items()
+        ]
+        heapq.heapify(self.expiry_heap)
+
     def _flatten_session(self, session_dict: Dict) -> Dict:
         return {
             "unick_name": session_dict["unick_name"],
@@ -0,0 +1,152 @@
+import base64
+import json
+import os
+import secrets
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from Crypto.Cipher import AES
+
+# Marks an encrypted value: PREFIX + key ID + ":" + kind + nonce + tag + ciphertext, all bytes.
+# The kind byte says whether the plaintext was a str (b"s") or bytes (b"b").
+ENCRYPTED_PREFIX = b"\x1d"
+NONCE_SIZE = 12
+TAG_SIZE = 16
+
+
+class KeyRing:
+    """
+    AES-256 keys by ID; the active one encrypts, all of them decrypt.
+
+    With `path` the ring is read from that JSON file, or created there with one
+    new key, so restarts and other processes can read the values. Without it
+    the keys live in this process only. Keep the file as secret as a password.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.keys: Dict[str, bytes] = {}
+        self.active: Optional[str] = None
+        if path is not None and os.path.exists(path):
+            with open(path, "r") as f:
+                data = json.load(f)
+            self.keys = {key_id: base64.b64decode(key) for key_id, key in data["keys"].items()}
+            self.active = data["active"]
+        else:
+            self.rotate()
+
+    def rotate(self) -> str:
+        """
+        Add a new random key, make it the active one and return its ID.
+        """
+        return self.add(os.urandom(32))
+
+    def add(self, key: bytes, key_id: Optional[str] = None, activate: bool = True) -> str:
+        if len(key) not in (16, 24, 32):
+            raise ValueError("AES keys are 16, 24 or 32 bytes long.")
+        key_id = key_id or secrets.token_hex(4)
+        if not key_id.isalnum():
+            raise ValueError(f"Invalid key ID: {key_id!r}")
+        self.keys[key_id] = key
+        if activate:
+            self.active = key_id
+        self.save()
+        return key_id
+
+    def retire(self, key_id: str):
+        """
+        Drop a key; values still encrypted with it can no longer be read.
+        """
+        if key_id == self.active:
+            raise ValueError("The active key cannot be retired; rotate first.")
+        self.keys.pop(key_id, None)
+        self.save()
+
+    def key(self, key_id: str) -> bytes:
+        key = self.keys.get(key_id)
+        if key is None:
+            raise ValueError(f"Unknown encryption key: {key_id}")
+        return key
+
+    def save(self):
+        # Written to a private temporary file and moved into place.
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"active": self.active,
+                       "keys": {key_id: base64.b64encode(key).decode("ascii") for key_id, key in self.keys.items()}},
+                      f)
+        os.replace(tmp_path, self.path)
+
+    def __repr__(self):
+        return f"<KeyRing(active={self.active}, keys={len(self.keys)}, path={self.path})>"
+
+
+def is_encrypted(value) -> bool:
+    return type(value) is bytes and value.startswith(ENCRYPTED_PREFIX)
+
+
+class ValueEncryptor:
+    """
+    Encrypts str and bytes values with AES-GCM under the active key of `key_ring`.
+
+    The header (key ID and value kind) and a `context` string (the session ID
+    for session values) are authenticated along with the value, so a tampered
+    or truncated value, or one copied to another session, fails to decrypt
+    instead of reading back wrong. None stays None; other types raise TypeError.
+    """
+
+    def __init__(self, key_ring: KeyRing):
+        self.key_ring = key_ring
+
+    def encrypt(self, value, context: str = "", nonce: Optional[bytes] = None):
+        kind = type(value)
+        if kind is str:
+            data, header = value.encode(), b"s"
+        elif kind is bytes:
+            data, header = value, b"b"
+        elif value is None:
+            return None
+        else:
+            raise TypeError(f"Only str and bytes values can be encrypted, not {kind.__name__}; "
+                            f"enable serialization for other types.")
+        header = ENCRYPTED_PREFIX + self.key_ring.active.encode() + b":" + header
+        nonce = nonce or os.urandom(NONCE_SIZE)
+        cipher = AES.new(self.key_ring.key(self.key_ring.active), AES.MODE_GCM, nonce=nonce)
+        cipher.update(header + context.encode())
+        ciphertext, tag = cipher.encrypt_and_digest(data)
+        return b"".join((header, nonce, tag, ciphertext))
+
+    def decrypt(self, value, context: str = ""):
+        """
+        Return the original value of an encrypted one; anything else is returned unchanged.
+
+        `context` must be the one the value was encrypted with.
+        """
+        if not is_encrypted(value):
+            return value
+        separator = value.index(b":")
+        start = separator + 2
+        cipher = AES.new(self.key_ring.key(value[1:separator].decode()), AES.MODE_GCM,
+                         nonce=value[start:start + NONCE_SIZE])
+        cipher.update(value[:start] + context.encode())
+        data = cipher.decrypt_and_verify(memoryview(value)[start + NONCE_SIZE + TAG_SIZE:],
+                                         value[start + NONCE_SIZE:start + NONCE_SIZE + TAG_SIZE])
+        return data.decode() if value[separator + 1:start] == b"s" else data
+
+    def encrypt_many(self, values: Sequence, contexts: Sequence[str]) -> List:
+        """
+        Encrypt many values in input order, each with its context, drawing all nonces from one os.urandom call.
+        """
+        nonces = os.urandom(NONCE_SIZE * len(values))
+        encrypt = self.encrypt
+        return [encrypt(value, context, nonces[i:i + NONCE_SIZE])
+                for i, value, context in zip(range(0, len(nonces), NONCE_SIZE), values, contexts)]
+
+    def decrypt_many(self, values: Iterable, contexts: Iterable[str]) -> List:
+        decrypt = self.decrypt
+        return [decrypt(value, context) for value, context in zip(values, contexts)]
+
+    def __repr__(self):
+        return f"<ValueEncryptor(active_key={self.key_ring.active})>"
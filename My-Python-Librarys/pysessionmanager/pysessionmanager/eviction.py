@@ -0,0 +1,166 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class EvictionPolicy:
+    """
+    Decides which session to drop when a capacity-bounded SessionManager is full.
+
+    The manager calls `add` for every new session, `touch` on every access and
+    `remove` whenever a session leaves; `victim` names the next session to evict.
+    `add` is repeated for a session whose size changed, which is not an access.
+    All calls happen under the manager's lock.
+    """
+
+    def add(self, session_id: str):
+        raise NotImplementedError
+
+    def touch(self, session_id: str):
+        pass
+
+    def remove(self, session_id: str):
+        raise NotImplementedError
+
+    def victim(self) -> Optional[str]:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LRUPolicy(EvictionPolicy):
+    """
+    Least recently used first: an OrderedDict kept in access order.
+    """
+
+    def __init__(self):
+        self.order: "OrderedDict[str, None]" = OrderedDict()
+
+    def add(self, session_id: str):
+        self.order[session_id] = None
+
+    def touch(self, session_id: str):
+        if session_id in self.order:
+            self.order.move_to_end(session_id)
+
+    def remove(self, session_id: str):
+        self.order.pop(session_id, None)
+
+    def victim(self) -> Optional[str]:
+        return next(iter(self.order), None)
+
+    def clear(self):
+        self.order.clear()
+
+
+class _FrequencyNode:
+    __slots__ = ("count", "items", "prev", "next")
+
+    def __init__(self, count: int):
+        self.count = count
+        self.items: "OrderedDict[str, None]" = OrderedDict()
+        self.prev: Optional["_FrequencyNode"] = None
+        self.next: Optional["_FrequencyNode"] = None
+
+
+class LFUPolicy(EvictionPolicy):
+    """
+    Least frequently used first, oldest first among equal counts.
+
+    Sessions sit in a linked list of access-count buckets, so touching,
+    removing and finding the victim are all O(1).
+    """
+
+    def __init__(self):
+        self.head = _FrequencyNode(0)  # sentinel; head.next has the lowest count
+        self.nodes: Dict[str, _FrequencyNode] = {}
+
+    def _insert_after(self, node: _FrequencyNode, count: int) -> _FrequencyNode:
+        new = _FrequencyNode(count)
+        new.prev, new.next = node, node.next
+        if node.next is not None:
+            node.next.prev = new
+        node.next = new
+        return new
+
+    def _unlink_if_empty(self, node: _FrequencyNode):
+        if not node.items and node is not self.head:
+            node.prev.next = node.next
+            if node.next is not None:
+                node.next.prev = node.prev
+
+    def add(self, session_id: str):
+        if session_id in self.nodes:
+            return
+        first = self.head.next
+        if first is None or first.count != 1:
+            first = self._insert_after(self.head, 1)
+        first.items[session_id] = None
+        self.nodes[session_id] = first
+
+    def touch(self, session_id: str):
+        node = self.nodes.get(session_id)
+        if node is None:
+            return
+        following = node.next
+        if following is None or following.count != node.count + 1:
+            following = self._insert_after(node, node.count + 1)
+        del node.items[session_id]
+        following.items[session_id] = None
+        self.nodes[session_id] = following
+        self._unlink_if_empty(node)
+
+    def remove(self, session_id: str):
+        node = self.nodes.pop(session_id, None)
+        if node is not None:
+            del node.items[session_id]
+            self._unlink_if_empty(node)
+
+    def victim(self) -> Optional[str]:
+        first = self.head.next
+        return next(iter(first.items)) if first is not None else None
+
+    def clear(self):
+        self.head = _FrequencyNode(0)
+        self.nodes.clear()
+
+
+class ExpiryPolicy(EvictionPolicy):
+    """
+    Earliest end_time first, read from the manager's own expiry heap.
+
+    Nothing extra is stored per session. Finding the victim drops stale heap
+    entries (and re-files renewed ones) first, so it is amortised O(log n)
+    rather than strictly O(1).
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def add(self, session_id: str):
+        pass
+
+    def remove(self, session_id: str):
+        pass
+
+    def victim(self) -> Optional[str]:
+        head = self.manager._peek_expiry()
+        return head[1] if head is not None else None
+
+    def clear(self):
+        pass
+
+
+def make_policy(policy, manager) -> EvictionPolicy:
+    """
+    Turn "lru", "lfu", "expiry" or a ready EvictionPolicy instance into a policy.
+    """
+    if isinstance(policy, EvictionPolicy):
+        return policy
+    if policy == "lru":
+        return LRUPolicy()
+    if policy == "lfu":
+        return LFUPolicy()
+    if policy == "expiry":
+        return ExpiryPolicy(manager)
+    raise ValueError(f"Unknown eviction policy: {policy}")
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+
+class SessionJournal:
+    """
+    Append-only write-ahead journal on top of a JSON-lines snapshot.
+
+    Every change appends one record ("put" with the session's current state, or
+    "del"). Once the journal grows past `compact_bytes`, `compact()` writes a new
+    snapshot and truncates the journal. Records are idempotent, so replaying a
+    journal over a snapshot it was already folded into is harmless.
+
+    `fsync` is "always", "never", or a number of milliseconds: the journal is then
+    fsynced at most that often, and a record appended since the last fsync is
+    on disk within that interval even if no other write follows (a timer
+    thread syncs it).
+    """
+
+    def __init__(self, storer, path: str = "sessions.journal", snapshot_path: str = "sessions.jsonl",
+                 fsync: Union[str, int, float] = "always", compact_bytes: int = 64 * 1024 * 1024):
+        if fsync not in ("always", "never") and not isinstance(fsync, (int, float)):
+            raise ValueError("fsync must be 'always', 'never' or an interval in milliseconds.")
+        self.storer = storer
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.fsync = fsync
+        self.compact_bytes = compact_bytes
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()  # the timer thread syncs the file too
+        self._repair_tail()
+        self._file = open(self.path, 'a')
+        self.size = self._file.tell()
+
+    def _repair_tail(self):
+        # Drop a torn last record so new appends don't get glued onto it.
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            pos = end
+            while pos > 0:
+                start = max(pos - 4096, 0)
+                f.seek(start)
+                chunk = f.read(pos - start)
+                newline = chunk.rfind(b"\n")
+                if newline != -1:
+                    pos = start + newline + 1
+                    break
+                pos = start
+            if pos != end:
+                f.truncate(pos)
+
+    def record_put(self, session_id: str, session: Dict):
+        self._append({"op": "put", "id": session_id, "s": self.storer._serialize_session(session)})
+
+    def record_remove(self, session_id: str):
+        self._append({"op": "del", "id": session_id})
+
+    def record_puts(self, sessions: Iterable[Tuple[str, Dict]]):
+        """
+        Append one "put" per (session_id, session) with a single write and fsync.
+        """
+        self._append_many({"op": "put", "id": session_id, "s": self.storer._serialize_session(session)}
+                          for session_id, session in sessions)
+
+    def record_removes(self, session_ids: Iterable[str]):
+        self._append_many({"op": "del", "id": session_id} for session_id in session_ids)
+
+    def _append(self, record: Dict):
+        self._append_many((record,))
+
+    def _append_many(self, records: Iterable[Dict]):
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        if not data:
+            return
+        with self._lock:
+            self._file.write(data)
+            self._file.flush()
+            self.size += len(data)
+            if self.fsync == "always":
+                os.fsync(self._file.fileno())
+            elif self.fsync != "never":
+                self._maybe_fsync()
+
+    def _maybe_fsync(self):
+        # Called with the lock held: fsync now if the interval has passed, otherwise when it does.
+        now = time.monotonic()
+        elapsed = (now - self._last_fsync) * 1000
+        if elapsed >= self.fsync:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+            self._unsynced = False
+            return
+        self._unsynced = True
+        if self._timer is None:
+            self._timer = threading.Timer((self.fsync - elapsed) / 1000, self._fsync_due)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _fsync_due(self):
+        with self._lock:
+            self._timer = None
+            if self._unsynced and not self._file.closed:
+                os.fsync(self._file.fileno())
+                self._last_fsync = time.monotonic()
+                self._unsynced = False
+
+    def sync(self):
+        """
+        Flush the journal to disk regardless of the fsync policy.
+        """
+        with self._lock:
+            self._file.flush()
+            if self.fsync != "never":
+                os.fsync(self._file.fileno())
+                self._last_fsync = time.monotonic()
+                self._unsynced = False
+
+    def needs_compaction(self) -> bool:
+        return self.size >= self.compact_bytes
+
+    def compact(self, sessions: Dict[str, Dict]):
+        """
+        Fold the journal into a fresh snapshot of `sessions` and truncate it.
+
+        Unless `fsync` is "never", the snapshot is on disk before the journal is
+        truncated, so a crash in between loses nothing.
+        """
+        durable = self.fsync != "never"
+        self.storer.store_sessions_jsonl(sessions, self.snapshot_path, durable=durable)
+        with self._lock:
+            self._file.close()
+            self._file = open(self.path, 'w')
+            if durable:
+                os.fsync(self._file.fileno())
+            self._last_fsync = time.monotonic()
+            self._unsynced = False
+            self.size = 0
+
+    def replay(self) -> Dict[str, Dict]:
+        """
+        Rebuild the session table from the snapshot plus every journal record.
+        """
+        try:
+            sessions = self.storer.load_sessions_jsonl(self.snapshot_path)
+        except FileNotFoundError:
+            sessions = {}
+        self._file.flush()
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn write at the tail after a crash
+                if record["op"] == "put":
+                    sessions[record["id"]] = self.storer._deserialize_session(record["s"])
+                else:
+                    sessions.pop(record["id"], None)
+        return sessions
+
+    def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self.sync()
+        with self._lock:
+            self._timer = None
+            self._file.close()
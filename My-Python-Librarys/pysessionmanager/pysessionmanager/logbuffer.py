@@ -0,0 +1,86 @@
+from collections import deque
+from typing import Iterator, List, NamedTuple
+
+
+class _LazyEntry(NamedTuple):
+    # Kept apart from plain tuples, which are valid log entries themselves.
+    message: str
+    args: tuple
+
+
+class LogBuffer:
+    """
+    Fixed-capacity, list-like log that formats its messages lazily.
+
+    `append(fmt, *args)` stores the format string and its arguments; the
+    `fmt % args` string is only built when the entry is read; an entry appended
+    without arguments (a string, tuple or anything else) is stored as is. Once `capacity`
+    entries are held, each new entry drops the oldest one. With a `sample_rate`
+    below 1.0 only that fraction of appends is kept (every n-th call, no random
+    numbers); `seen` still counts every call.
+    """
+
+    __slots__ = ("entries", "sample_rate", "seen", "_every", "_countdown")
+
+    def __init__(self, capacity: int = 1000, sample_rate: float = 1.0):
+        if capacity < 0:
+            raise ValueError("capacity must not be negative.")
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0.0 and 1.0.")
+        self.entries = deque(maxlen=capacity)
+        self.sample_rate = sample_rate
+        self.seen = 0
+        self._every = round(1 / sample_rate) if sample_rate else 0
+        self._countdown = 1
+
+    @property
+    def capacity(self) -> int:
+        return self.entries.maxlen
+
+    @property
+    def dropped(self) -> int:
+        """Entries that were sampled out or pushed out of the buffer."""
+        return self.seen - len(self.entries)
+
+    def append(self, message, *args):
+        self.seen += 1
+        if self._every != 1:
+            if not self._every:
+                return
+            self._countdown -= 1
+            if self._countdown:
+                return
+            self._countdown = self._every
+        self.entries.append(_LazyEntry(message, args) if args else message)
+
+    def clear(self):
+        self.entries.clear()
+        self.seen = 0
+
+    @staticmethod
+    def _format(entry):
+        if type(entry) is _LazyEntry:
+            return entry.message % entry.args
+        return entry
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._format(entry) for entry in list(self.entries)[index]]
+        return self._format(self.entries[index])
+
+    def __iter__(self) -> Iterator:
+        return (self._format(entry) for entry in list(self.entries))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __eq__(self, other):
+        if isinstance(other, (LogBuffer, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def to_list(self) -> List:
+        return list(self)
+
+    def __repr__(self):
+        return f"LogBuffer({self.to_list()!r}, capacity={self.capacity})"
@@ -0,0 +1,196 @@
+import bisect
+import functools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds: 1, 2.5 and 5 per decade from 1 µs to 10 s.
+DEFAULT_BUCKETS: Tuple[float, ...] = tuple(
+    base * 10.0 ** exponent for exponent in range(-6, 1) for base in (1.0, 2.5, 5.0)
+) + (10.0,)
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram (counts per upper bound, plus sum and count).
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the q-th quantile (None if empty).
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> Dict:
+        cumulative, total = {}, 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            cumulative[bound] = total
+        return {"count": self.count, "sum": self.sum, "buckets": cumulative,
+                "p50": self.quantile(0.5), "p99": self.quantile(0.99)}
+
+
+class SessionMetrics:
+    """
+    Counters, per-operation latency histograms and storage I/O byte counts.
+
+    One instance can be shared by several managers (e.g. every shard of a
+    ShardedSessionManager). `snapshot()` returns plain dicts, `to_prometheus()`
+    the Prometheus text exposition format, and `start_http_server()` serves that
+    on a local port for scraping.
+    """
+
+    def __init__(self, namespace: str = "pysessionmanager", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = buckets
+        self.counters: Dict[str, int] = {"hits": 0, "misses": 0, "expirations": 0, "evictions": 0}
+        self.histograms: Dict[str, Histogram] = {}
+        self.io_bytes: Dict[Tuple[str, str], int] = {}  # (backend, "read" | "write") -> bytes
+        self.gauges: Dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def increment(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def observe(self, operation: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                histogram = self.histograms[operation] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def add_io_bytes(self, backend: str, direction: str, amount: int):
+        key = (backend, direction)
+        with self._lock:
+            self.io_bytes[key] = self.io_bytes.get(key, 0) + amount
+
+    def register_gauge(self, name: str, func: Callable[[], float]):
+        """
+        Report `func()` as a gauge on every snapshot (e.g. the live session count).
+        """
+        self.gauges[name] = func
+
+    def reset(self):
+        with self._lock:
+            for counter in self.counters:
+                self.counters[counter] = 0
+            self.histograms.clear()
+            self.io_bytes.clear()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "latency": {operation: histogram.to_dict() for operation, histogram in self.histograms.items()},
+                "io_bytes": {f"{backend}_{direction}": amount
+                             for (backend, direction), amount in self.io_bytes.items()},
+                "gauges": {name: func() for name, func in self.gauges.items()},
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format (version 0.0.4).
+        """
+        ns = self.namespace
+        lines: List[str] = []
+        with self._lock:
+            for counter, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {ns}_{counter}_total counter")
+                lines.append(f"{ns}_{counter}_total {value}")
+            lines.append(f"# TYPE {ns}_io_bytes_total counter")
+            for (backend, direction), amount in sorted(self.io_bytes.items()):
+                lines.append(f'{ns}_io_bytes_total{{backend="{backend}",direction="{direction}"}} {amount}')
+            lines.append(f"# TYPE {ns}_operation_seconds histogram")
+            for operation, histogram in sorted(self.histograms.items()):
+                total = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    total += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{ns}_operation_seconds_bucket{{operation="{operation}",le="{le}"}} {total}')
+                lines.append(f'{ns}_operation_seconds_sum{{operation="{operation}"}} {histogram.sum!r}')
+                lines.append(f'{ns}_operation_seconds_count{{operation="{operation}"}} {histogram.count}')
+        for name, func in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {ns}_{name} gauge")
+            lines.append(f"{ns}_{name} {func()}")
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self, port: int = 9464, addr: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve to_prometheus() on http://addr:port/metrics from a daemon thread.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((addr, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self._server
+
+    def stop_http_server(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def instrument(obj, operations: Tuple[str, ...], metrics: SessionMetrics):
+    """
+    Time each named method of `obj` into `metrics` by shadowing it with a timed
+    wrapper on the instance.
+
+    Nothing is wrapped while metrics are off, so a disabled manager pays no
+    per-call cost; `uninstrument` removes the wrappers again.
+    """
+    for operation in operations:
+        method = getattr(type(obj), operation).__get__(obj)
+        setattr(obj, operation, _timed(operation, method, metrics))
+
+
+def uninstrument(obj, operations: Tuple[str, ...]):
+    for operation in operations:
+        obj.__dict__.pop(operation, None)
+
+
+def _timed(operation: str, method: Callable, metrics: SessionMetrics) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            metrics.observe(operation, time.perf_counter() - start)
+    return wrapper
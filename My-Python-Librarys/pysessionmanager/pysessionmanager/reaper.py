@@ -0,0 +1,113 @@
+import asyncio
+import datetime
+import threading
+import logging as log
+from typing import Callable, Optional
+
+
+class SessionReaper:
+    """
+    Background eviction of expired sessions for a SessionManager.
+
+    The reaper sleeps until the next session deadline (at least `min_interval` and
+    at most `max_interval` seconds), then removes due sessions in batches of at most
+    `batch_size` so the manager's lock is never held for long. A failing round
+    (say a journal I/O error) is logged and retried after at most a second;
+    it never ends the reaper.
+    """
+
+    def __init__(self, manager, batch_size: int = 1000, max_interval: float = 60.0,
+                 callback: Optional[Callable[[int, int], None]] = None, min_interval: float = 0.1):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        self.manager = manager
+        self.batch_size = batch_size
+        self.max_interval = max_interval
+        self.min_interval = min_interval
+        self.callback = callback
+        self.total_expired = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def reap_once(self) -> int:
+        """
+        Evict one batch of expired sessions and return how many were removed.
+        """
+        self.manager.flush_touches()
+        expired = self.manager.expire_due(limit=self.batch_size)
+        if expired:
+            self.total_expired += len(expired)
+            if self.callback:
+                try:
+                    self.callback(len(expired), len(self.manager.sessions))
+                except Exception as e:
+                    log.error(f"[REAPER ERROR] callback failed: {e}")
+        return len(expired)
+
+    def next_delay(self) -> float:
+        """
+        Seconds to sleep before the next session falls due.
+        """
+        deadline = self.manager.next_expiry()
+        if deadline is None:
+            return self.max_interval
+        delay = (deadline - datetime.datetime.now()).total_seconds()
+        # Deadlines closer together than min_interval are reaped in one wake-up.
+        return min(max(delay, self.min_interval), self.max_interval)
+
+    def _step(self) -> float:
+        # A full batch means more sessions may be due: come back right away.
+        try:
+            if self.reap_once() >= self.batch_size:
+                return 0.0
+            return self.next_delay()
+        except Exception as e:
+            self.errors += 1
+            log.error(f"[REAPER ERROR] {type(e).__name__}: {e}")
+            return min(max(self.min_interval, 1.0), self.max_interval)
+
+    def _run(self):
+        delay = 0.0
+        while not self._stop.wait(delay):
+            delay = self._step()
+
+    async def _run_async(self):
+        while not self._stop.is_set():
+            delay = self._step()
+            await asyncio.sleep(delay)
+
+    def start(self) -> threading.Thread:
+        """
+        Run the reaper in a daemon thread.
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="session-reaper", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def start_async(self) -> asyncio.Task:
+        """
+        Run the reaper as a task on the running asyncio event loop.
+        """
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run_async())
+        return self._task
+
+    def stop(self):
+        """
+        Stop the reaper thread or task.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def running(self) -> bool:
+        return (self._thread is not None and self._thread.is_alive()) or \
+            (self._task is not None and not self._task.done())
@@ -1,7 +1,13 @@
 #pip install pycryptodome
 # Importeren van de benodigde modules
+import os
 import uuid
+import hmac
+import asyncio
+import functools
 import hashlib
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
 from Crypto.Random import get_random_bytes
@@ -12,13 +18,115 @@ def hash_password(password: str) -> str:
 
 
 def verify_password(input_password: str, stored_hash: str) -> bool:
-    return hash_password(input_password) == stored_hash
+    if stored_hash and "$" in stored_hash:
+        return verify_encoded_hash(input_password, stored_hash)
+    return hmac.compare_digest(hash_password(input_password), stored_hash or "")
+
+
+def kdf_hash(password: str, algorithm: str = "pbkdf2_sha256", work_factor: int = 600_000,
+             salt: Optional[bytes] = None) -> str:
+    """
+    Hash a password with a slow KDF and return it as 'algorithm$work_factor$salt$hash'.
+
+    `work_factor` is the iteration count for pbkdf2_sha256 and N (a power of two)
+    for scrypt (r=8, p=1).
+    """
+    salt = salt or os.urandom(16)
+    if algorithm == "pbkdf2_sha256":
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, work_factor)
+    elif algorithm == "scrypt":
+        digest = hashlib.scrypt(password.encode(), salt=salt, n=work_factor, r=8, p=1,
+                                maxmem=256 * work_factor * 8 + 1024 * 1024)
+    else:
+        raise ValueError(f"Unsupported password hash algorithm: {algorithm}")
+    return f"{algorithm}${work_factor}${salt.hex()}${digest.hex()}"
+
+
+def verify_encoded_hash(input_password: str, stored_hash: str) -> bool:
+    try:
+        algorithm, work_factor, salt, _ = stored_hash.split("$")
+        expected = kdf_hash(input_password, algorithm, int(work_factor), bytes.fromhex(salt))
+    except ValueError:
+        return False
+    return hmac.compare_digest(expected, stored_hash)
+
+
+def _verify_pair(pair: Tuple[str, str]) -> bool:
+    return verify_password(*pair)
+
+
+class PasswordHasher:
+    """
+    Password hashing service that runs KDF work on a worker pool.
+
+    hashlib's pbkdf2_hmac and scrypt release the GIL, so the default thread pool
+    uses every core; `use_processes=True` switches to a process pool. Besides the
+    blocking `hash`/`verify`, it offers future-returning (`submit_*`), asyncio
+    (`*_async`) and batch (`verify_many`) variants. `verify` also accepts legacy
+    unsalted sha256 hashes.
+    """
+
+    def __init__(self, algorithm: str = "pbkdf2_sha256", work_factor: int = 600_000,
+                 workers: Optional[int] = None, use_processes: bool = False):
+        if algorithm not in ("pbkdf2_sha256", "scrypt"):
+            raise ValueError(f"Unsupported password hash algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.work_factor = work_factor
+        self.workers = workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self.pool = pool(max_workers=self.workers)
+
+    def hash(self, password: str) -> str:
+        return self.submit_hash(password).result()
+
+    def verify(self, password: str, stored_hash: str) -> bool:
+        return self.submit_verify(password, stored_hash).result()
+
+    def submit_hash(self, password: str) -> Future:
+        return self.pool.submit(kdf_hash, password, self.algorithm, self.work_factor)
+
+    def submit_verify(self, password: str, stored_hash: str) -> Future:
+        return self.pool.submit(verify_password, password, stored_hash)
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit_hash(password))
+
+    async def verify_async(self, password: str, stored_hash: str) -> bool:
+        return await asyncio.wrap_future(self.submit_verify(password, stored_hash))
+
+    def hash_many(self, passwords: Iterable[str]) -> List[str]:
+        """
+        Hash many passwords in parallel; results keep the input order.
+        """
+        return list(self.pool.map(functools.partial(kdf_hash, algorithm=self.algorithm,
+                                                    work_factor=self.work_factor), passwords))
+
+    def verify_many(self, pairs: Iterable[Tuple[str, str]]) -> List[bool]:
+        """
+        Verify many (password, stored_hash) pairs in parallel; results keep the input order.
+        """
+        return list(self.pool.map(_verify_pair, pairs))
+
+    async def verify_many_async(self, pairs: Iterable[Tuple[str, str]]) -> List[bool]:
+        futures = [asyncio.wrap_future(self.submit_verify(*pair)) for pair in pairs]
+        return list(await asyncio.gather(*futures))
+
+    def close(self):
+        self.pool.shutdown(wait=True)
 
 
 def generate_session_id() -> str:
     return str(uuid.uuid4())
 
 
+def generate_session_ids(count: int) -> List[str]:
+    """
+    Return `count` random (version 4) UUID strings drawn from a single os.urandom call.
+    """
+    data = os.urandom(16 * count)
+    return [str(uuid.UUID(bytes=data[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+
 
 class EncryptieDecryptie:
     def __init__(self):
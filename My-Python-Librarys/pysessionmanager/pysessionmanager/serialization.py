@@ -0,0 +1,153 @@
+import base64
+import io
+import marshal
+import pickle
+from typing import Any, Dict, Iterable
+
+# Marks a serialized value: PREFIX + serializer name + ":" + payload, all bytes.
+SERIALIZED_PREFIX = b"\x1e"
+
+# Marks a bytes value in text-only stores (JSON, JSON lines, CSV, journal): PREFIX + base64.
+BYTES_TEXT_PREFIX = "\x1eb64:"
+# Marks a str value there that itself starts with "\x1e": PREFIX + the string.
+STR_TEXT_PREFIX = "\x1es:"
+
+# What PickleSerializer unpickles by default: plain data, no callables.
+SAFE_PICKLE_GLOBALS = frozenset({
+    "builtins.bytearray", "builtins.complex", "builtins.dict", "builtins.frozenset", "builtins.list",
+    "builtins.range", "builtins.set", "builtins.slice", "builtins.tuple",
+    "collections.OrderedDict", "collections.deque",
+    "datetime.date", "datetime.datetime", "datetime.time", "datetime.timedelta", "datetime.timezone",
+    "decimal.Decimal", "uuid.SafeUUID", "uuid.UUID",
+})
+
+
+class ValueSerializer:
+    """
+    Turns structured session values into bytes and back, looked up by `name` when a value is read.
+    """
+
+    name = ""
+
+    def dumps(self, value) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data) -> Any:
+        raise NotImplementedError
+
+    def pack(self, value):
+        """
+        Serialize anything but str and None; strings stay on the plain text path.
+        """
+        if value is None or type(value) is str:
+            return value
+        return SERIALIZED_PREFIX + self.name.encode() + b":" + self.dumps(value)
+
+
+class _RestrictedUnpickler(pickle.Unpickler):
+
+    def __init__(self, file, allowed: frozenset):
+        super().__init__(file)
+        self.allowed = allowed
+
+    def find_class(self, module: str, name: str):
+        if f"{module}.{name}" not in self.allowed:
+            raise pickle.UnpicklingError(f"{module}.{name} is not allowed; list it in PickleSerializer(allowed=...).")
+        return super().find_class(module, name)
+
+
+class PickleSerializer(ValueSerializer):
+    """
+    Any picklable object, read back by an unpickler that only resolves the
+    globals in SAFE_PICKLE_GLOBALS plus `allowed` ("module.QualName" strings).
+
+    Unpickling an allowed class may still run its code, so only allow classes
+    you would trust with data from the store.
+    """
+
+    name = "pickle"
+
+    def __init__(self, protocol: int = 5, allowed: Iterable[str] = ()):
+        self.protocol = protocol
+        self.allowed = SAFE_PICKLE_GLOBALS | frozenset(allowed)
+
+    def dumps(self, value) -> bytes:
+        return pickle.dumps(value, protocol=self.protocol)
+
+    def loads(self, data) -> Any:
+        return _RestrictedUnpickler(io.BytesIO(data), self.allowed).load()
+
+
+class MarshalSerializer(ValueSerializer):
+    """
+    Built-in types only (dict, list, tuple, set, str, bytes, numbers); the fastest option.
+    """
+
+    name = "marshal"
+
+    def dumps(self, value) -> bytes:
+        return marshal.dumps(value)
+
+    def loads(self, data) -> Any:
+        return marshal.loads(data)
+
+
+SERIALIZERS: Dict[str, ValueSerializer] = {"pickle": PickleSerializer(), "marshal": MarshalSerializer()}
+
+
+def register_serializer(serializer: ValueSerializer):
+    """
+    Make `serializer` available for reading values back; needed in every process that reads them.
+    """
+    if not serializer.name or ":" in serializer.name:
+        raise ValueError(f"Invalid serializer name: {serializer.name!r}")
+    SERIALIZERS[serializer.name] = serializer
+
+
+def make_serializer(serializer) -> ValueSerializer:
+    if isinstance(serializer, str):
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown value serializer: {serializer}")
+        return SERIALIZERS[serializer]
+    register_serializer(serializer)
+    return serializer
+
+
+def is_serialized(value) -> bool:
+    return type(value) is bytes and value.startswith(SERIALIZED_PREFIX)
+
+
+def unpack_value(value):
+    """
+    Return the object behind a serialized value; anything else is returned unchanged.
+    """
+    if not is_serialized(value):
+        return value
+    separator = value.index(b":")
+    name = value[1:separator].decode()
+    serializer = SERIALIZERS.get(name)
+    if serializer is None:
+        raise ValueError(f"Unknown value serializer: {name}")
+    return serializer.loads(memoryview(value)[separator + 1:])
+
+
+def value_to_text(value):
+    """
+    Encode a value for a text-only store: bytes as BYTES_TEXT_PREFIX + base64, a str
+    starting with "\\x1e" behind STR_TEXT_PREFIX; other values pass through.
+    """
+    kind = type(value)
+    if kind is bytes:
+        return BYTES_TEXT_PREFIX + base64.b64encode(value).decode("ascii")
+    if kind is str and value.startswith("\x1e"):
+        return STR_TEXT_PREFIX + value
+    return value
+
+
+def value_from_text(value):
+    if type(value) is str and value.startswith("\x1e"):
+        if value.startswith(BYTES_TEXT_PREFIX):
+            return base64.b64decode(value[len(BYTES_TEXT_PREFIX):])
+        if value.startswith(STR_TEXT_PREFIX):
+            return value[len(STR_TEXT_PREFIX):]
+    return value
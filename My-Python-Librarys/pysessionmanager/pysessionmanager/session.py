@@ -0,0 +1,175 @@
+import datetime
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class LazyValue:
+    """
+    Stand-in for a session value that is still on disk.
+
+    `load()` fetches it from the backend the session was loaded from; the
+    record itself only holds this small placeholder.
+    """
+
+    __slots__ = ("backend", "session_id")
+
+    def __init__(self, backend, session_id: str):
+        self.backend = backend
+        self.session_id = session_id
+
+    def load(self):
+        return self.backend.load_value(self.session_id)
+
+    def __repr__(self):
+        return f"LazyValue({self.session_id!r})"
+
+
+class Session(MutableMapping):
+    """
+    Compact in-memory session record.
+
+    Times are stored as epoch seconds and `protected` as a small int, in
+    `__slots__` instead of a per-session dict. For backwards compatibility the
+    record also behaves like the old session dict: `session["end_time"]` returns
+    a datetime, `session["protected"]` a bool, and it compares equal to a dict
+    with the same contents.
+    """
+
+    __slots__ = ("unick_name", "start", "end", "protected", "password", "value")
+
+    KEYS = ("unick_name", "start_time", "end_time", "protected", "password", "value")
+
+    def __init__(self, unick_name: str, start: float, end: float, protected: int = 0,
+                 password: Optional[str] = None, value: Optional[str] = None):
+        self.unick_name = unick_name
+        self.start = start
+        self.end = end
+        self.protected = protected
+        self.password = password
+        self.value = value
+
+    @classmethod
+    def from_dict(cls, session: Dict) -> "Session":
+        """
+        Build a record from an old-style session dict (datetimes and a bool flag).
+        """
+        if isinstance(session, Session):
+            return session
+        return cls(
+            session["unick_name"],
+            session["start_time"].timestamp(),
+            session["end_time"].timestamp(),
+            1 if session.get("protected") else 0,
+            session.get("password"),
+            session.get("value"),
+        )
+
+    def copy(self) -> "Session":
+        return Session(self.unick_name, self.start, self.end, self.protected, self.password, self.value)
+
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by this record and its strings.
+        """
+        return sys.getsizeof(self) + sum(
+            sys.getsizeof(field) for field in (self.unick_name, self.password, self.value) if field is not None
+        )
+
+    def to_dict(self) -> Dict:
+        return {key: self[key] for key in self.KEYS}
+
+    def __getitem__(self, key: str):
+        if key == "start_time":
+            return datetime.datetime.fromtimestamp(self.start)
+        if key == "end_time":
+            return datetime.datetime.fromtimestamp(self.end)
+        if key == "protected":
+            return bool(self.protected)
+        if key == "value":
+            # Dict-style access (serializers, backends) always sees the real value.
+            return self.value.load() if type(self.value) is LazyValue else self.value
+        if key in ("unick_name", "password"):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        if key == "start_time":
+            self.start = value.timestamp()
+        elif key == "end_time":
+            self.end = value.timestamp()
+        elif key == "protected":
+            self.protected = 1 if value else 0
+        elif key in ("unick_name", "password", "value"):
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key: str):
+        raise TypeError("Session fields cannot be deleted.")
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return f"Session({self.to_dict()!r})"
+
+
+class SessionPage(NamedTuple):
+    """
+    One page from iter_sessions(): live (session_id, session) pairs and the cursor to resume after them.
+    """
+
+    sessions: List[Tuple[str, Session]]
+    cursor: Optional[str]  # None after the last page
+
+
+_MISSING = object()
+
+
+class ValueCache:
+    """
+    LRU cache of values fetched for lazily loaded sessions, bounded by their total size.
+
+    Values larger than `max_bytes` on their own are returned but not kept.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, object]" = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.used_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, lazy: LazyValue):
+        with self._lock:
+            value = self.entries.get(session_id, _MISSING)
+            if value is not _MISSING:
+                self.entries.move_to_end(session_id)
+                return value
+        value = lazy.load()  # outside the lock: this is a database round trip
+        size = sys.getsizeof(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            if session_id not in self.entries:
+                self.entries[session_id] = value
+                self.sizes[session_id] = size
+                self.used_bytes += size
+                while self.used_bytes > self.max_bytes:
+                    oldest, _ = self.entries.popitem(last=False)
+                    self.used_bytes -= self.sizes.pop(oldest)
+        return value
+
+    def discard(self, session_id: str):
+        with self._lock:
+            if self.entries.pop(session_id, _MISSING) is not _MISSING:
+                self.used_bytes -= self.sizes.pop(session_id)
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,414 @@
+import datetime
+import itertools
+import threading
+import logging as log
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from pysessionmanager.codes import SessionMessages
+from .compression import ValueCodec, ValueCompressor
+from .core import SessionManager, SessionStoring
+from .encryption import KeyRing, ValueEncryptor
+from .metrics import SessionMetrics
+from .security import PasswordHasher, generate_session_id, generate_session_ids
+from .serialization import ValueSerializer
+from .session import Session, SessionPage
+from .tokens import SessionTokens
+from .utils import get_default_unick_name
+
+
+class ShardedSessionManager:
+    """
+    Thread-safe SessionManager split into independently locked shards.
+
+    Session IDs hash to one of `shards` SessionManager instances, each with its
+    own lock, session dict, name index and expiry heap, so threads working on
+    different sessions rarely contend. A small registry keeps `unick_name`
+    unique across shards. Locks are always taken shard first, registry second.
+    """
+
+    def __init__(self, name: str, shards: int = 16, protect: bool = False, auto_renew: bool = False,
+                 min_password_length: int = 6, password_hasher: Optional[PasswordHasher] = None,
+                 log_capacity: int = 1000, debug_sample_rate: float = 1.0, max_sessions: Optional[int] = None,
+                 max_bytes: Optional[int] = None, eviction: str = "lru", renew_seconds: float = 3600.0,
+                 touch_interval: float = 5.0):
+        if shards < 1:
+            raise ValueError("shards must be at least 1.")
+        self.name = name
+        # Limits are split evenly; each shard evicts on its own.
+        per_shard = lambda limit: None if limit is None else -(-limit // shards)
+        self.shards: List[SessionManager] = [
+            SessionManager(f"{name}-{index}", protect, auto_renew, min_password_length, password_hasher,
+                           log_capacity, debug_sample_rate, per_shard(max_sessions), per_shard(max_bytes), eviction,
+                           renew_seconds, touch_interval)
+            for index in range(shards)
+        ]
+        for shard in self.shards:
+            shard.on_remove = self._forget_name
+        self.names: Dict[str, Optional[str]] = {}  # unick_name -> session_id (None while being created)
+        self._names_lock = threading.Lock()
+        self.storer = SessionStoring()
+        self.filename = "sessions.jsonl"
+        self.tokens: Optional[SessionTokens] = None
+        self.encryptor: Optional[ValueEncryptor] = None
+
+    def shard_for(self, session_id: str) -> SessionManager:
+        # A token routes by the session ID inside it; the shard is handed the token as is.
+        if self.tokens is not None:
+            session_id = self.tokens.session_id(session_id)
+        return self.shards[hash(session_id) % len(self.shards)]
+
+    @staticmethod
+    def _created(result: str, session_id: str) -> bool:
+        # create() returned the new ID, or a token for it.
+        return result == session_id or result.startswith(f"{session_id}.")
+
+    def _forget_name(self, session_id: str, session: Session):
+        # Called by a shard, under its lock, whenever a session leaves it.
+        with self._names_lock:
+            if self.names.get(session.unick_name) == session_id:
+                del self.names[session.unick_name]
+
+    def create(self, unick_name: str = None, duration_seconds: int = 3600, value: str = None,
+               password: Optional[str] = None, custom_metadata: dict = {}) -> str:
+        """
+        Create a session in the shard its new ID hashes to. See SessionManager.create.
+        """
+        if unick_name is None:
+            unick_name = get_default_unick_name()
+        with self._names_lock:
+            if unick_name in self.names:
+                return SessionMessages.SESSION_ALREADY_EXISTS
+            self.names[unick_name] = None
+        session_id = generate_session_id()
+        result = self.shard_for(session_id).create(unick_name, duration_seconds, value, password,
+                                                  custom_metadata, session_id=session_id)
+        with self._names_lock:
+            if self._created(result, session_id):
+                self.names[unick_name] = session_id
+            else:
+                del self.names[unick_name]
+        return result
+
+    def create_many(self, entries: Iterable[Union[str, Dict]], duration_seconds: int = 3600, value: str = None,
+                    password: Optional[str] = None) -> List[str]:
+        """
+        Create many sessions, one create_many() call per shard involved. See SessionManager.create_many.
+        """
+        entries = [{"unick_name": entry} if isinstance(entry, str) or entry is None else dict(entry)
+                   for entry in entries]
+        results: List[Optional[str]] = [None] * len(entries)
+        new_ids = iter(generate_session_ids(len(entries)))
+        per_shard: Dict[int, List[int]] = {}
+        with self._names_lock:
+            for index, entry in enumerate(entries):
+                entry["unick_name"] = entry.get("unick_name") or get_default_unick_name()
+                if entry["unick_name"] in self.names:
+                    results[index] = SessionMessages.SESSION_ALREADY_EXISTS
+                    continue
+                self.names[entry["unick_name"]] = None
+                entry["session_id"] = entry.get("session_id") or next(new_ids)
+                per_shard.setdefault(hash(entry["session_id"]) % len(self.shards), []).append(index)
+        for shard_index, indexes in per_shard.items():
+            shard_results = self.shards[shard_index].create_many(
+                [entries[index] for index in indexes], duration_seconds, value, password)
+            for index, result in zip(indexes, shard_results):
+                results[index] = result
+        with self._names_lock:
+            for indexes in per_shard.values():
+                for index in indexes:
+                    entry = entries[index]
+                    if self._created(results[index], entry["session_id"]):
+                        self.names[entry["unick_name"]] = entry["session_id"]
+                    else:
+                        del self.names[entry["unick_name"]]
+        return results
+
+    def remove(self, session_id: str):
+        return self.shard_for(session_id).remove(session_id)
+
+    def get_many(self, session_ids: Iterable[str]) -> Dict[str, Union[Session, str]]:
+        return self._per_shard(session_ids, lambda shard, ids: shard.get_many(ids))
+
+    def remove_many(self, session_ids: Iterable[str]) -> Dict[str, str]:
+        return self._per_shard(session_ids, lambda shard, ids: shard.remove_many(ids))
+
+    def extend(self, session_id: str, seconds: float) -> str:
+        return self.shard_for(session_id).extend(session_id, seconds)
+
+    def extend_many(self, session_ids: Iterable[str], seconds: float) -> Dict[str, str]:
+        return self._per_shard(session_ids, lambda shard, ids: shard.extend_many(ids, seconds))
+
+    def _per_shard(self, session_ids: Iterable[str], call: Callable) -> Dict:
+        # One call per shard involved; results come back in input order.
+        results: Dict = {}
+        groups: Dict[int, List[str]] = {}
+        for session_id in session_ids:
+            results[session_id] = None
+            groups.setdefault(hash(session_id) % len(self.shards), []).append(session_id)
+        for shard_index, ids in groups.items():
+            results.update(call(self.shards[shard_index], ids))
+        return results
+
+    def get(self, session_id: str) -> Optional[Session]:
+        return self.shard_for(session_id).get(session_id)
+
+    def is_active(self, session_id: str) -> bool:
+        return self.shard_for(session_id).is_active(session_id)
+
+    def get_time_remaining(self, session_id: str) -> float:
+        return self.shard_for(session_id).get_time_remaining(session_id)
+
+    def time_passed(self, session_id: str) -> float:
+        return self.shard_for(session_id).time_passed(session_id)
+
+    def get_value(self, session_id: str) -> Optional[str]:
+        return self.shard_for(session_id).get_value(session_id)
+
+    def set_value(self, session_id: str, value: str) -> Optional[str]:
+        return self.shard_for(session_id).set_value(session_id, value)
+
+    def lock(self, session_id: str, password: str, logging: bool = False) -> Optional[str]:
+        return self.shard_for(session_id).lock(session_id, password, logging)
+
+    def _shard_for_name(self, unick_name: str) -> Optional[SessionManager]:
+        session_id = self.names.get(unick_name)
+        return self.shard_for(session_id) if session_id else None
+
+    def unlock(self, unick_name: str, password: str, logging: bool = False) -> Optional[str]:
+        shard = self._shard_for_name(unick_name)
+        if shard is None:
+            return SessionMessages.session_not_found_message(unick_name)[1]
+        return shard.unlock(unick_name, password, logging)
+
+    def unlock_many(self, credentials: Dict[str, str], logging: bool = False) -> Dict[str, Optional[str]]:
+        """
+        Unlock several sessions at once, one unlock_many() call per shard involved.
+        """
+        results, per_shard = {}, {}
+        for unick_name, password in credentials.items():
+            shard = self._shard_for_name(unick_name)
+            if shard is None:
+                results[unick_name] = SessionMessages.session_not_found_message(unick_name)[1]
+            else:
+                per_shard.setdefault(id(shard), (shard, {}))[1][unick_name] = password
+        for shard, shard_credentials in per_shard.values():
+            results.update(shard.unlock_many(shard_credentials, logging))
+        return results
+
+    def get_with_unick_name(self, unick_name: str, logging: bool = False) -> Optional[str]:
+        shard = self._shard_for_name(unick_name)
+        return shard.get_with_unick_name(unick_name, logging) if shard else None
+
+    def iter_sessions(self, filter: Optional[Callable[[str, Session], bool]] = None, batch_size: int = 1000,
+                      cursor: Optional[str] = None) -> Iterator[SessionPage]:
+        """
+        Page through the shards one after another; the cursor is "<shard>/<shard cursor>".
+
+        A page never spans two shards, so pages at a shard boundary can be short.
+        """
+        first, inner = 0, None
+        if cursor:
+            index, _, inner = cursor.partition("/")
+            first, inner = int(index), inner or None
+        last = len(self.shards) - 1
+        for index in range(first, last + 1):
+            for page in self.shards[index].iter_sessions(filter, batch_size, inner):
+                if page.cursor is not None:
+                    yield SessionPage(page.sessions, f"{index}/{page.cursor}")
+                elif index == last:
+                    yield page
+                elif page.sessions:
+                    yield SessionPage(page.sessions, f"{index + 1}/")
+            inner = None
+
+    def get_all(self):
+        """
+        Merge get_all() over every shard, taking one shard lock at a time.
+        """
+        sessions, removed, protected = {}, [], []
+        for shard in self.shards:
+            shard_sessions, shard_removed, shard_protected = shard.get_all()
+            sessions.update(shard_sessions)
+            removed.extend(shard_removed)
+            protected.extend(shard_protected)
+        return sessions, removed, protected
+
+    def expire_due(self, now: Optional[datetime.datetime] = None, limit: Optional[int] = None) -> List[str]:
+        expired = []
+        for shard in self.shards:
+            expired.extend(shard.expire_due(now, None if limit is None else limit - len(expired)))
+            if limit is not None and len(expired) >= limit:
+                break
+        return expired
+
+    def next_expiry(self) -> Optional[datetime.datetime]:
+        deadlines = [deadline for deadline in (shard.next_expiry() for shard in self.shards) if deadline]
+        return min(deadlines) if deadlines else None
+
+    def start_reaper(self, batch_size: int = 1000, max_interval: float = 60.0,
+                     callback: Optional[Callable[[int, int], None]] = None,
+                     use_asyncio: bool = False, min_interval: float = 0.1):
+        """
+        Start one reaper per shard (see SessionManager.start_reaper).
+        """
+        return [shard.start_reaper(batch_size, max_interval, callback, use_asyncio, min_interval)
+                for shard in self.shards]
+
+    def stop_reaper(self):
+        for shard in self.shards:
+            shard.stop_reaper()
+
+    def save(self, filename: Optional[str] = None) -> bool:
+        """
+        Save every shard to one file, picking the format from the extension like SessionManager.save
+        (JSON, '.jsonl' JSON lines, '.enc' encrypted), holding one shard lock at a time.
+        """
+        def shard_items(shard):
+            with shard._lock:
+                items = list(shard.sessions.items())
+            yield from items
+
+        filename = filename or self.filename
+        try:
+            items = itertools.chain.from_iterable(shard_items(shard) for shard in self.shards)
+            ext = self.shards[0]._get_file_extension(filename)
+            if ext == "jsonl":
+                self.storer.store_sessions_jsonl(items, filename)
+            elif ext == "enc":
+                if self.encryptor is None:
+                    raise ValueError("Encryption is not enabled; call enable_encryption() first.")
+                self.storer.store_sessions_encrypted(items, self.encryptor, filename)
+            else:
+                self.storer.store_sessions_json(items, filename)
+            return True
+        except Exception as e:
+            log.error(f"[SAVE ERROR] ({filename}) {str(e)}")
+            return False
+
+    def load(self, filename: Optional[str] = None):
+        """
+        Load a JSON or JSON-lines snapshot and spread it over the shards.
+        """
+        loader = SessionManager(self.name)
+        loader.encryptor = self.encryptor
+        message = loader.load(filename or self.filename)
+        parts: List[Dict[str, Session]] = [{} for _ in self.shards]
+        for session_id, session in loader.sessions.items():
+            parts[hash(session_id) % len(self.shards)][session_id] = session
+        for shard, sessions in zip(self.shards, parts):
+            with shard._lock:
+                shard.sessions = sessions
+                shard._rebuild_name_index()
+                shard._rebuild_expiry_heap()
+                shard._rebuild_eviction()
+        with self._names_lock:
+            self.names = dict(loader.name_index)
+        if self.tokens is not None:
+            self.tokens.revoke_all()
+        return message
+
+    def clean_all(self):
+        """
+        Clear all sessions and overwrite the snapshot file.
+        """
+        for shard in self.shards:
+            with shard._lock:
+                shard.sessions.clear()
+                shard.name_index.clear()
+                shard.expiry_heap.clear()
+                shard._rebuild_eviction()
+        with self._names_lock:
+            self.names.clear()
+        if self.tokens is not None:
+            self.tokens.revoke_all()
+        self.save()
+
+    def enable_metrics(self, metrics: Optional[SessionMetrics] = None) -> SessionMetrics:
+        """
+        Record every shard into one shared SessionMetrics.
+        """
+        metrics = metrics or SessionMetrics()
+        for shard in self.shards:
+            shard.enable_metrics(metrics)
+        metrics.register_gauge("sessions", lambda: len(self))
+        return metrics
+
+    def disable_metrics(self):
+        for shard in self.shards:
+            shard.disable_metrics()
+
+    def enable_compression(self, codec: Union[str, ValueCodec] = "zlib", threshold: int = 1024) -> ValueCompressor:
+        """
+        Compress values in every shard (see SessionManager.enable_compression).
+        """
+        for shard in self.shards:
+            compressor = shard.enable_compression(codec, threshold)
+        return compressor
+
+    def disable_compression(self):
+        for shard in self.shards:
+            shard.disable_compression()
+
+    def enable_serialization(self, serializer: Union[str, ValueSerializer] = "pickle") -> ValueSerializer:
+        """
+        Accept structured values in every shard (see SessionManager.enable_serialization).
+        """
+        for shard in self.shards:
+            serializer = shard.enable_serialization(serializer)
+        return serializer
+
+    def disable_serialization(self):
+        for shard in self.shards:
+            shard.disable_serialization()
+
+    def enable_encryption(self, key_ring: Optional[KeyRing] = None) -> ValueEncryptor:
+        """
+        Encrypt values in every shard with one shared KeyRing (see SessionManager.enable_encryption).
+        """
+        key_ring = key_ring or KeyRing()
+        for shard in self.shards:
+            self.encryptor = shard.enable_encryption(key_ring)
+        return self.encryptor
+
+    def disable_encryption(self):
+        for shard in self.shards:
+            shard.disable_encryption()
+        self.encryptor = None
+
+    def rotate_encryption_key(self) -> str:
+        """
+        Rotate the shared key once and re-encrypt each shard under its own lock.
+        """
+        if self.encryptor is None:
+            raise ValueError("Encryption is not enabled; call enable_encryption() first.")
+        key_id = self.encryptor.key_ring.rotate()
+        for shard in self.shards:
+            shard._reencrypt_values()
+        return key_id
+
+    def enable_tokens(self, tokens: Optional[SessionTokens] = None) -> SessionTokens:
+        """
+        Issue signed tokens from every shard with one shared SessionTokens (see SessionManager.enable_tokens).
+        """
+        self.tokens = tokens or SessionTokens()
+        for shard in self.shards:
+            shard.enable_tokens(self.tokens)
+        return self.tokens
+
+    def disable_tokens(self):
+        self.tokens = None
+        for shard in self.shards:
+            shard.disable_tokens()
+
+    def issue_token(self, session_id: str) -> str:
+        return self.shard_for(session_id).issue_token(session_id)
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+
+    def __len__(self) -> int:
+        return sum(len(shard.sessions) for shard in self.shards)
+
+    def __repr__(self):
+        return f"<ShardedSessionManager(name={self.name}, shards={len(self.shards)}, sessions={len(self)})>"
@@ -0,0 +1,167 @@
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Dict, Iterable, List, Optional, Union
+
+from pysessionmanager.codes import SessionMessages
+from .backends import SharedSQLiteBackend
+from .security import PasswordHasher, generate_session_id, generate_session_ids
+from .session import Session
+from .tiered import TieredSessionManager
+from .tokens import TokenClaims
+from .utils import get_default_unick_name
+
+
+class SharedSessionManager(TieredSessionManager):
+    """
+    Session store shared by every worker process on one host (gunicorn, uwsgi, ...).
+
+    All workers open the same SQLite file. Each keeps a bounded L1 cache of the
+    sessions it has read, and every change is written through before the call
+    returns. Before serving from L1 a worker reads the database's change log and
+    drops the sessions other workers changed since its last look, so a session
+    created, changed or removed in one worker is seen by all the others. With
+    `max_staleness` > 0 that check runs at most once per `max_staleness` seconds
+    instead of on every read.
+
+    The manager may be created in the master before forking: the child drops
+    the inherited connections and starts its own flusher.
+    """
+
+    def __init__(self, name: str, filename: str = "sessions.db", l1_size: int = 10000, protect: bool = False,
+                 auto_renew: bool = False, min_password_length: int = 6,
+                 password_hasher: Optional[PasswordHasher] = None, eviction: str = "lru",
+                 max_staleness: float = 0.0, changelog_ttl: float = 300.0, purge_interval: float = 60.0,
+                 renew_seconds: float = 3600.0, touch_interval: float = 5.0):
+        self.origin = secrets.token_hex(8)
+        backend = SharedSQLiteBackend(filename, self.origin)
+        super().__init__(name, backend, l1_size, protect, auto_renew, min_password_length, password_hasher,
+                         eviction, flush_interval=purge_interval, purge_interval=purge_interval,
+                         write_through=True, renew_seconds=renew_seconds, touch_interval=touch_interval)
+        self.max_staleness = max_staleness
+        self.changelog_ttl = changelog_ttl
+        self.seq = backend.last_change()
+        self._last_sync = time.monotonic()
+        if hasattr(os, "register_at_fork"):
+            ref = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: _after_fork(ref))
+
+    def _sync(self):
+        """
+        Drop from L1 every session another process changed since the last sync.
+        """
+        if self.max_staleness and time.monotonic() - self._last_sync < self.max_staleness:
+            return
+        self._last_sync = time.monotonic()
+        changed, seq, pruned = self.backend.changes_since(self.seq)
+        if not changed and not pruned:
+            self.seq = max(self.seq, seq)
+            return
+        with self._lock:
+            self.seq = max(self.seq, seq)
+            if pruned:
+                # Idle for longer than changelog_ttl: some changes are gone from the log.
+                changed = list(self.sessions)
+            for session_id in changed:
+                if session_id in self.sessions:
+                    self._invalidate(session_id)
+            if self.tokens is not None:
+                if pruned:
+                    self.tokens.revoke_all()
+                else:
+                    self.tokens.revoke(changed)
+        if changed and self.metrics is not None:
+            self.metrics.increment("invalidations", len(changed))
+
+    def _load_through(self, session_id: str) -> Optional[Session]:
+        self._sync()
+        seq = self.seq
+        session = super()._load_through(session_id)
+        if self.seq != seq and session is not None:
+            # Another thread synced meanwhile; what we just read may predate that change.
+            with self._lock:
+                if self.sessions.get(session_id) is session:
+                    self._invalidate(session_id)
+        return session
+
+    def _find_id(self, unick_name: str) -> Optional[str]:
+        self._sync()
+        return super()._find_id(unick_name)
+
+    def _token_fresh(self, claims: TokenClaims) -> bool:
+        # Another process may have removed or changed the session; its changes revoke tokens here.
+        self._sync()
+        return super()._token_fresh(claims)
+
+    def create(self, unick_name: str = None, duration_seconds: int = 3600, value: str = None,
+               password: Optional[str] = None, custom_metadata: dict = {},
+               session_id: Optional[str] = None) -> str:
+        if unick_name is None:
+            unick_name = get_default_unick_name()
+        session_id = session_id or generate_session_id()
+        try:
+            return super().create(unick_name, duration_seconds, value, password, custom_metadata, session_id)
+        except sqlite3.IntegrityError:
+            # Another process took the name between our check and our insert.
+            with self._lock:
+                if session_id in self.sessions:
+                    self._invalidate(session_id)
+            return SessionMessages.SESSION_ALREADY_EXISTS
+
+    def create_many(self, entries: Iterable[Union[str, Dict]], duration_seconds: int = 3600, value: str = None,
+                    password: Optional[str] = None) -> List[str]:
+        entries = [{"unick_name": entry} if isinstance(entry, str) or entry is None else dict(entry)
+                   for entry in entries]
+        new_ids = iter(generate_session_ids(len(entries)))
+        for entry in entries:
+            entry["session_id"] = entry.get("session_id") or next(new_ids)
+        try:
+            return super().create_many(entries, duration_seconds, value, password)
+        except sqlite3.IntegrityError:
+            # Another process took one of the names: undo the batch in L1 and create one by one.
+            with self._lock:
+                for entry in entries:
+                    if entry["session_id"] in self.sessions:
+                        self._invalidate(entry["session_id"])
+            return [
+                self.create(entry.get("unick_name"), entry.get("duration_seconds", duration_seconds),
+                            entry.get("value", value), entry.get("password", password),
+                            session_id=entry["session_id"])
+                for entry in entries
+            ]
+
+    def purge_expired(self) -> int:
+        """
+        Delete expired sessions and old change-log entries from the database.
+        """
+        self.backend.prune_changes(self.changelog_ttl)
+        return super().purge_expired()
+
+    def _reinit_after_fork(self):
+        self.origin = self.backend.origin = secrets.token_hex(8)
+        self.backend.reset_after_fork()
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._run_flusher, name="session-flusher", daemon=True)
+        self._flusher.start()
+
+    def close(self):
+        """
+        Stop the flusher and close this process's database connections.
+        """
+        super().close()
+        self.backend.close()
+
+    def __repr__(self):
+        return f"<SharedSessionManager(name={self.name}, l1={len(self.sessions)}, file={self.backend.filename})>"
+
+
+def _after_fork(ref: weakref.ref):
+    manager = ref()
+    if manager is not None and not manager._stop.is_set():
+        manager._reinit_after_fork()
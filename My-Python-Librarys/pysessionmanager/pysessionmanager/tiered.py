@@ -0,0 +1,391 @@
+import datetime
+import heapq
+import threading
+import time
+import logging as log
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from pysessionmanager.codes import SessionMessages
+from .backends import PostgreSQLBackend, SQLiteBackend
+from .core import SessionManager
+from .security import PasswordHasher
+from .session import Session, SessionPage
+from .utils import get_default_unick_name, resolves_token
+
+_MISSING = object()
+
+
+class TieredSessionManager(SessionManager):
+    """
+    SessionManager whose `sessions` dict is a bounded L1 cache over a SQLite or
+    PostgreSQL table (L2).
+
+    Reads fall through to the database by primary key (or by `unick_name`) and
+    admit the session into L1. Writes update L1 immediately and are queued; a
+    background flusher writes the queue to the database in batches every
+    `flush_interval` seconds, or as soon as `batch_size` changes are waiting.
+    Sessions leaving L1 through eviction stay in the database, so the resident
+    set is bounded by `l1_size` however many sessions exist.
+
+    Until the queue is flushed, changes live only in this process; call
+    `flush()` or `close()` before shutting down. With `write_through=True` every
+    change is written to the database before the call returns instead. Expired sessions are removed
+    from L1 by `expire_due()` (or the reaper) as usual; the flusher deletes
+    expired rows from the database every `purge_interval` seconds.
+    """
+
+    def __init__(self, name: str, backend: Union[str, SQLiteBackend, PostgreSQLBackend] = "sessions.db",
+                 l1_size: int = 10000, protect: bool = False, auto_renew: bool = False,
+                 min_password_length: int = 6, password_hasher: Optional[PasswordHasher] = None,
+                 eviction: str = "lru", flush_interval: float = 0.1, batch_size: int = 1000,
+                 purge_interval: float = 60.0, write_through: bool = False, renew_seconds: float = 3600.0,
+                 touch_interval: float = 5.0):
+        super().__init__(name, protect, auto_renew, min_password_length, password_hasher,
+                         max_sessions=l1_size, eviction=eviction, renew_seconds=renew_seconds,
+                         touch_interval=touch_interval)
+        if isinstance(backend, str):
+            if backend.startswith(("postgresql://", "postgres://")) or "dbname=" in backend:
+                backend = self.storer.postgresql_backend(backend)
+            else:
+                backend = self.storer.sqlite_backend(backend)
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.purge_interval = purge_interval
+        self.write_through = write_through
+        self._last_purge = time.monotonic()
+        self.pending: Dict[str, Optional[Session]] = {}   # queued writes; None means delete
+        self.inflight: Dict[str, Optional[Session]] = {}  # batch being written right now
+        self.pending_names: Dict[str, str] = {}           # unick_name -> session_id not yet in L2
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._run_flusher, name="session-flusher", daemon=True)
+        self._flusher.start()
+
+    # Read-through
+
+    def _load_through(self, session_id: str) -> Optional[Session]:
+        """
+        Return the session from L1, the write queue or the database, admitting it into L1.
+        """
+        session = self.sessions.get(session_id)
+        if session is not None:
+            return session
+        with self._lock:
+            session = self.pending.get(session_id, _MISSING)
+            if session is _MISSING:
+                session = self.inflight.get(session_id, _MISSING)
+        if self.metrics is not None:
+            self.metrics.increment("l1_misses")
+        if session is _MISSING:
+            row = self.backend.load_one(session_id)
+            session = Session.from_dict(row) if row else None
+        if session is None:
+            return None
+        with self._lock:
+            existing = self.sessions.get(session_id)
+            if existing is not None:
+                return existing
+            if session_id in self.pending and self.pending[session_id] is None:
+                return None  # removed while we were reading
+            self._make_room(1, session.nbytes() if self.max_bytes is not None else 0)
+            self.sessions[session_id] = session
+            self.name_index[session.unick_name] = session_id
+            heapq.heappush(self.expiry_heap, (session.end, session_id))
+            self._track(session_id, session)
+        return session
+
+    def _find_id(self, unick_name: str) -> Optional[str]:
+        session_id = self.name_index.get(unick_name) or self.pending_names.get(unick_name)
+        if session_id is None:
+            session_id = self.backend.find_id(unick_name)
+        if session_id is None:
+            return None
+        session = self._load_through(session_id)
+        return session_id if session is not None and session.unick_name == unick_name else None
+
+    def create(self, unick_name: str = None, duration_seconds: int = 3600, value: str = None,
+               password: Optional[str] = None, custom_metadata: dict = {},
+               session_id: Optional[str] = None) -> str:
+        if unick_name is None:
+            unick_name = get_default_unick_name()
+        if self._find_id(unick_name) is not None:
+            return SessionMessages.SESSION_ALREADY_EXISTS
+        return super().create(unick_name, duration_seconds, value, password, custom_metadata, session_id)
+
+    @resolves_token
+    def get(self, session_id: str) -> Optional[Session]:
+        self._load_through(session_id)
+        return super().get(session_id)
+
+    def is_active(self, session_id: str) -> bool:
+        claims = self._token_claims(session_id)
+        if claims is None:
+            self._load_through(session_id)
+        elif not self._token_valid(claims):
+            # Stale or past its expiry: the session may have been extended, ask the store.
+            if self._load_through(claims.session_id) is None:
+                return False
+            session_id = claims.session_id
+        else:
+            return True
+        return super().is_active(session_id)
+
+    @resolves_token
+    def get_value(self, session_id: str) -> Optional[str]:
+        self._load_through(session_id)
+        return super().get_value(session_id)
+
+    @resolves_token
+    def set_value(self, session_id: str, value: str) -> Optional[str]:
+        self._load_through(session_id)
+        return super().set_value(session_id, value)
+
+    @resolves_token
+    def lock(self, session_id: str, password: str, logging: bool = False) -> Optional[str]:
+        self._load_through(session_id)
+        return super().lock(session_id, password, logging)
+
+    def unlock(self, unick_name: str, password: str, logging: bool = False) -> Optional[str]:
+        self._find_id(unick_name)
+        return super().unlock(unick_name, password, logging)
+
+    def unlock_many(self, credentials: Dict[str, str], logging: bool = False) -> Dict[str, Optional[str]]:
+        for unick_name in credentials:
+            self._find_id(unick_name)
+        return super().unlock_many(credentials, logging)
+
+    def get_with_unick_name(self, unick_name: str, logging: bool = False) -> Optional[str]:
+        self._find_id(unick_name)
+        return super().get_with_unick_name(unick_name, logging)
+
+    @resolves_token
+    def remove(self, session_id: str):
+        if self._load_through(session_id) is None:
+            return SessionMessages.SESSION_NOT_FOUND
+        return super().remove(session_id)
+
+    def create_many(self, entries: Iterable[Union[str, Dict]], duration_seconds: int = 3600, value: str = None,
+                    password: Optional[str] = None) -> List[str]:
+        # Names are checked against L1 and the database up front: L1 alone may not hold them.
+        entries = list(entries)
+        results: List[Optional[str]] = [None] * len(entries)
+        fresh = []
+        for index, entry in enumerate(entries):
+            unick_name = entry if isinstance(entry, str) or entry is None else entry.get("unick_name")
+            if self._find_id(unick_name or get_default_unick_name()) is not None:
+                results[index] = SessionMessages.SESSION_ALREADY_EXISTS
+            else:
+                fresh.append(index)
+        created = super().create_many([entries[index] for index in fresh], duration_seconds, value, password)
+        for index, result in zip(fresh, created):
+            results[index] = result
+        return results
+
+    def get_many(self, session_ids: Iterable[str]) -> Dict[str, Union[Session, str]]:
+        return self._in_chunks(session_ids, super().get_many, self.get)
+
+    def remove_many(self, session_ids: Iterable[str]) -> Dict[str, str]:
+        return self._in_chunks(session_ids, super().remove_many,
+                               lambda session_id: self.remove(session_id) or SessionMessages.SESSION_DELETE_SUCCESS)
+
+    def extend_many(self, session_ids: Iterable[str], seconds: float) -> Dict[str, str]:
+        return self._in_chunks(session_ids, lambda ids: SessionManager.extend_many(self, ids, seconds),
+                               lambda session_id: self.extend(session_id, seconds))
+
+    def _in_chunks(self, session_ids: Iterable[str], bulk: Callable, single: Callable) -> Dict:
+        """
+        Run a bulk call over chunks of half the L1 size, reading each chunk through first.
+
+        A session pushed out of L1 again before its chunk ran is retried on its own.
+        """
+        session_ids = list(session_ids)
+        results = {}
+        step = max(self.max_sessions // 2, 1)
+        for start in range(0, len(session_ids), step):
+            chunk = session_ids[start:start + step]
+            found = {session_id for session_id in chunk if self._load_through(session_id) is not None}
+            for session_id, result in bulk(chunk).items():
+                if result == SessionMessages.SESSION_NOT_FOUND and session_id in found:
+                    result = single(session_id)
+                results[session_id] = result
+        return results
+
+    def iter_sessions(self, filter: Optional[Callable[[str, Session], bool]] = None, batch_size: int = 1000,
+                      cursor: Optional[str] = None) -> Iterator[SessionPage]:
+        """
+        Page through every session in the database in session_id order (flushes the write queue first).
+
+        The cursor is the last session ID read, so resuming is exact however the
+        table changed. The records are read from the database, not from L1.
+        """
+        self.flush()
+        after = cursor or None
+        while True:
+            page: List[Tuple[str, Session]] = []
+            rows = self.backend.load_page(after, batch_size)
+            while rows:
+                for session_id, row in rows:
+                    after = session_id
+                    session = Session.from_dict(row)
+                    if filter is None or filter(session_id, session):
+                        page.append((session_id, session))
+                        if len(page) == batch_size:
+                            break
+                if len(page) == batch_size or len(rows) < batch_size:
+                    break
+                rows = self.backend.load_page(after, batch_size)
+            done = len(page) < batch_size
+            yield SessionPage(page, None if done else after)
+            if done:
+                return
+
+    def get_all(self):
+        """
+        Return every session in L1 and the database (flushes the write queue first).
+        """
+        removed_sessions = self.expire_due()
+        self.flush()
+        sessions = {
+            session_id: self._flatten_session(session)
+            for session_id, session in self.backend.load_all().items()
+        }
+        protected_sessions = [
+            session_id for session_id, session in sessions.items()
+            if session["protected"] and not session["password"]
+        ]
+        return sessions, removed_sessions, protected_sessions
+
+    # Write-behind
+
+    def _mark_dirty(self, session_id: str):
+        super()._mark_dirty(session_id)
+        session = self.sessions[session_id]
+        if self.write_through:
+            self.backend.store_changes({session_id: session}, (session_id,), ())
+            return
+        self.pending[session_id] = session
+        self.pending_names[session.unick_name] = session_id
+        if len(self.pending) >= self.batch_size:
+            self._wake.set()
+
+    def _mark_dirty_many(self, session_ids: List[str]):
+        super()._mark_dirty_many(session_ids)
+        if self.write_through:
+            self.backend.store_changes(self.sessions, session_ids, ())
+            return
+        for session_id in session_ids:
+            session = self.sessions[session_id]
+            self.pending[session_id] = session
+            self.pending_names[session.unick_name] = session_id
+        if len(self.pending) >= self.batch_size:
+            self._wake.set()
+
+    def _mark_removed_many(self, session_ids: List[str]):
+        super()._mark_removed_many(session_ids)
+        if self.write_through:
+            self.backend.store_changes({}, (), session_ids)
+            return
+        for session_id in session_ids:
+            self.pending[session_id] = None
+        if len(self.pending) >= self.batch_size:
+            self._wake.set()
+
+    def _mark_removed(self, session_id: str):
+        super()._mark_removed(session_id)
+        if self.write_through:
+            self.backend.store_changes({}, (), (session_id,))
+            return
+        self.pending[session_id] = None
+        if len(self.pending) >= self.batch_size:
+            self._wake.set()
+
+    def _evict(self, session_id: str):
+        # Leaving L1 is not a delete: the session stays in the database (or the write queue).
+        if session_id in self.touched:
+            self.touched.discard(session_id)
+            self._mark_dirty(session_id)  # keep its renewed deadline
+        session = self.sessions.pop(session_id)
+        if self.name_index.get(session.unick_name) == session_id:
+            del self.name_index[session.unick_name]
+        self._untrack(session_id)
+        if len(self.expiry_heap) > 2 * len(self.sessions) + 64:
+            self._rebuild_expiry_heap()
+
+    def _invalidate(self, session_id: str):
+        # The stored copy changed elsewhere: drop ours, renewed deadline included, without writing it back.
+        self.touched.discard(session_id)
+        self._evict(session_id)
+
+    def flush(self) -> int:
+        """
+        Write every queued change, renewed deadlines included, to the database now.
+
+        Returns the number of sessions written.
+        """
+        self.flush_touches()
+        return self._write_pending()
+
+    def _write_pending(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                if not self.pending:
+                    return 0
+                batch, self.pending = self.pending, {}
+                self.inflight = {
+                    session_id: session.copy() if session is not None else None
+                    for session_id, session in batch.items()
+                }
+            puts = {session_id: session for session_id, session in self.inflight.items() if session is not None}
+            removed = [session_id for session_id, session in self.inflight.items() if session is None]
+            try:
+                self.backend.store_changes(puts, puts, removed)
+            except Exception:
+                with self._lock:
+                    for session_id, session in batch.items():
+                        self.pending.setdefault(session_id, session)
+                    self.inflight = {}
+                raise
+            with self._lock:
+                self.inflight = {}
+                for unick_name, session_id in list(self.pending_names.items()):
+                    if session_id in batch and session_id not in self.pending:
+                        del self.pending_names[unick_name]
+            return len(batch)
+
+    def purge_expired(self) -> int:
+        """
+        Delete expired sessions from the database; returns the number of rows deleted.
+        """
+        self._last_purge = time.monotonic()
+        self.flush()
+        return self.backend.delete_expired(datetime.datetime.now())
+
+    def _run_flusher(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                if time.monotonic() - self._last_touch_flush >= self.touch_interval:
+                    self.flush_touches()
+                self._write_pending()
+                if time.monotonic() - self._last_purge >= self.purge_interval:
+                    self.purge_expired()
+            except Exception as e:
+                if self.debug:
+                    self.logs["errors"].append(f"[FLUSH ERROR] {str(e)}")
+                log.error(f"[FLUSH ERROR] {str(e)}")
+
+    def close(self):
+        """
+        Stop the flusher, write the remaining queue and close the database connections.
+        """
+        self._stop.set()
+        self._wake.set()
+        self._flusher.join()
+        self.flush()
+        super().close()
+
+    def __repr__(self):
+        return f"<TieredSessionManager(name={self.name}, l1={len(self.sessions)}, pending={len(self.pending)})>"
@@ -0,0 +1,96 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional
+
+
+class TokenClaims(NamedTuple):
+    session_id: str
+    expires: float  # the session's end_time when the token was issued, epoch seconds
+    issued_at: int  # epoch milliseconds
+    protected: bool
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+class SessionTokens:
+    """
+    HMAC-SHA256 signed session tokens plus the revocation set that goes with them.
+
+    A token reads "<session_id>.<expires>.<issued_at>.<flags>.<signature>", the
+    numbers in hex. While a token is younger than `ttl` seconds and its session
+    was not revoked after it was issued, it is "fresh": its claims can be
+    trusted without reading the store. Revoking a session does not reject its
+    older tokens, it makes them stale, and stale tokens are checked against the
+    store like a plain session ID. A revocation therefore only has to be kept
+    for `ttl` seconds, which keeps the set small.
+
+    Tokens verify in every process that shares `secret`; the default is a
+    random secret for this process only.
+    """
+
+    def __init__(self, secret: Optional[bytes] = None, ttl: float = 300.0):
+        self.secret = secret or os.urandom(32)
+        self.ttl_ms = int(ttl * 1000)
+        self.not_before = 0
+        self.revoked: "OrderedDict[str, int]" = OrderedDict()  # session_id -> revoked at (ms), oldest first
+        self._lock = threading.Lock()
+
+    def issue(self, session_id: str, expires: float, protected: bool = False) -> str:
+        body = f"{session_id}.{int(expires * 1000):x}.{_now_ms():x}.{1 if protected else 0}"
+        return f"{body}.{self._sign(body)}"
+
+    def _sign(self, body: str) -> str:
+        digest = hmac.new(self.secret, body.encode("utf-8", "surrogatepass"), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+    def verify(self, token) -> Optional[TokenClaims]:
+        """
+        Return the claims of a correctly signed token, or None for anything else (such as a plain session ID).
+        """
+        if type(token) is not str or token.count(".") < 4:
+            return None
+        body, _, signature = token.rpartition(".")
+        # Compared as bytes: compare_digest rejects str with non-ASCII characters with a TypeError.
+        if not hmac.compare_digest(signature.encode("utf-8", "surrogatepass"), self._sign(body).encode("ascii")):
+            return None
+        session_id, expires, issued_at, flags = body.rsplit(".", 3)
+        return TokenClaims(session_id, int(expires, 16) / 1000, int(issued_at, 16), flags == "1")
+
+    def session_id(self, token: str) -> str:
+        """
+        The session ID behind a valid token; anything else is returned unchanged.
+        """
+        claims = self.verify(token)
+        return token if claims is None else claims.session_id
+
+    def fresh(self, claims: TokenClaims) -> bool:
+        issued_at = claims.issued_at
+        if issued_at <= self.not_before or issued_at + self.ttl_ms <= _now_ms():
+            return False
+        revoked_at = self.revoked.get(claims.session_id)
+        return revoked_at is None or issued_at > revoked_at
+
+    def revoke(self, session_ids: Iterable[str]):
+        """
+        Make every token issued so far for these sessions stale.
+        """
+        now = _now_ms()
+        horizon = now - self.ttl_ms
+        with self._lock:
+            for session_id in session_ids:
+                self.revoked[session_id] = now
+                self.revoked.move_to_end(session_id)
+            while self.revoked and next(iter(self.revoked.values())) <= horizon:
+                self.revoked.popitem(last=False)
+
+    def revoke_all(self):
+        with self._lock:
+            self.not_before = _now_ms()
+            self.revoked.clear()
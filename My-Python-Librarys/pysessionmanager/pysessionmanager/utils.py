@@ -1,6 +1,38 @@
 import os
+import functools
 
 def get_default_unick_name() -> str:
     return os.getenv("DEFAULT_USER_ID", "default_user").lower()
 
 
+def synchronized(method):
+    """Run a method while holding the instance's `_lock`."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def resolves_token(method):
+    """Accept a signed session token wherever the method takes a session ID."""
+    @functools.wraps(method)
+    def wrapper(self, session_id, *args, **kwargs):
+        if self.tokens is not None:
+            session_id = self.tokens.session_id(session_id)
+        return method(self, session_id, *args, **kwargs)
+    return wrapper
+
+
+def fsync_directory(path: str):
+    """Make a rename or truncation inside `path`'s directory durable (a no-op where directories can't be opened)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
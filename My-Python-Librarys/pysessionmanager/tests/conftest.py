@@ -0,0 +1,17 @@
+import pytest
+
+from pysessionmanager import SessionManager
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    # Several methods write next to the working directory (sessions.json by default).
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def manager():
+    manager = SessionManager("test")
+    yield manager
+    manager.close()
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+
+import pytest
+
+from pysessionmanager.async_manager import AsyncSessionManager
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def journal_threads(manager):
+    """Record the thread of every journal append."""
+    threads = []
+    journal = manager.manager.journal
+    append_many = journal._append_many
+
+    def recording(records):
+        threads.append(threading.current_thread().name)
+        return append_many(records)
+
+    journal._append_many = recording
+    return threads
+
+
+def test_concurrent_creates_and_removes_keep_the_indexes_consistent():
+    async def scenario():
+        manager = AsyncSessionManager("test")
+        ids = await asyncio.gather(*(manager.create(f"user{i}") for i in range(200)))
+        assert len(set(ids)) == 200
+        await asyncio.gather(*(manager.remove(session_id) for session_id in ids[::2]))
+        inner = manager.manager
+        assert set(inner.sessions) == set(ids[1::2])
+        assert set(inner.name_index.values()) == set(ids[1::2])
+        assert await manager.get_with_unick_name("user1") == ids[1]
+        await manager.close()
+
+    run(scenario())
+
+
+def test_changes_stay_inline_without_a_journal():
+    async def scenario():
+        manager = AsyncSessionManager("test")
+        loop_thread = threading.current_thread().name
+        seen = []
+        create = manager.manager.create
+        manager.manager.create = lambda *args: seen.append(threading.current_thread().name) or create(*args)
+        await manager.create("a")
+        assert seen == [loop_thread]
+        await manager.close()
+
+    run(scenario())
+
+
+def test_journaled_changes_run_on_the_executor():
+    async def scenario():
+        manager = AsyncSessionManager("test")
+        await manager.enable_journal()
+        threads = journal_threads(manager)
+        session_id = await manager.create("a", value="v1")
+        await manager.set_value(session_id, "v2")
+        await manager.extend(session_id, 60)
+        await manager.remove(session_id)
+        await manager.expire_due()
+        assert threads and all(name.startswith("session-io") for name in threads)
+        await manager.close()
+
+    run(scenario())
+
+
+def test_journal_replay_after_async_changes():
+    async def scenario():
+        manager = AsyncSessionManager("test")
+        await manager.enable_journal()
+        kept = await manager.create("kept", value="v1")
+        gone = await manager.create("gone")
+        await manager.set_value(kept, "v2")
+        await manager.remove(gone)
+        await manager.close()
+
+        restored = AsyncSessionManager("test")
+        await restored.enable_journal()
+        assert set(restored.manager.sessions) == {kept}
+        assert await restored.get_value(kept) == "v2"
+        await restored.close()
+
+    run(scenario())
+
+
+def test_save_and_load_round_trip():
+    async def scenario():
+        manager = AsyncSessionManager("test")
+        ids = [await manager.create(f"user{i}", value=str(i)) for i in range(50)]
+        assert await manager.save("sessions.jsonl")
+        other = AsyncSessionManager("test")
+        await other.load("sessions.jsonl")
+        assert set(other.manager.sessions) == set(ids)
+        assert await other.get_value(ids[7]) == "7"
+        await manager.close()
+        await other.close()
+
+    run(scenario())
+
+
+def test_iter_sessions_pages_through_everything():
+    async def scenario():
+        manager = AsyncSessionManager("test")
+        ids = {await manager.create(f"user{i}") for i in range(25)}
+        seen = set()
+        async for page in manager.iter_sessions(batch_size=10):
+            assert len(page.sessions) <= 10
+            seen.update(session_id for session_id, _ in page.sessions)
+        assert seen == ids
+        await manager.close()
+
+    run(scenario())
+
+
+def test_saves_flush_renewed_deadlines_on_the_executor():
+    async def scenario():
+        manager = AsyncSessionManager("test", auto_renew=True, renew_seconds=600, touch_interval=3600)
+        await manager.enable_journal()
+        session_id = await manager.create("a", duration_seconds=60)
+        await manager.get(session_id)
+        assert manager.manager.touched == {session_id}
+        threads = journal_threads(manager)
+        assert await manager.save("sessions.json")
+        await manager.get(session_id)
+        assert await manager.save_sqlite("sessions.db")
+        assert threads and all(name.startswith("session-io") for name in threads)
+        assert manager.manager.touched == set()
+        await manager.close()
+
+    run(scenario())
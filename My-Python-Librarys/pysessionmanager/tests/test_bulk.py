@@ -0,0 +1,69 @@
+from pysessionmanager import SessionManager
+from pysessionmanager.codes import SessionMessages
+
+
+def test_create_many_mixes_names_and_dicts(manager):
+    ids = manager.create_many(["a", {"unick_name": "b", "value": "vb", "duration_seconds": 10}, "a"], value="v")
+    assert ids[2] == SessionMessages.SESSION_ALREADY_EXISTS
+    assert manager.get_value(ids[0]) == "v"
+    assert manager.get_value(ids[1]) == "vb"
+    assert manager.get_time_remaining(ids[1]) <= 10
+    assert manager.get_with_unick_name("b") == ids[1]
+
+
+def test_create_many_protected_hashes_every_password():
+    manager = SessionManager("test", protect=True)
+    ids = manager.create_many([{"unick_name": "a", "password": "secret-a"}, {"unick_name": "b"}, "c"],
+                              password="secret-default")
+    assert all(manager.sessions[session_id].protected for session_id in ids)
+    results = manager.unlock_many({"a": "secret-a", "b": "secret-default", "c": "wrong-one", "d": "x"})
+    assert results["a"] == SessionMessages.unlock_message(ids[0])[1]
+    assert results["b"] == SessionMessages.unlock_message(ids[1])[1]
+    assert results["c"] == SessionMessages.session_unlock_failed_message(ids[2])[1]
+    assert results["d"] == SessionMessages.session_not_found_message("d")[1]
+    assert not manager.sessions[ids[0]].protected and manager.sessions[ids[2]].protected
+    manager.close()
+
+
+def test_get_many_and_remove_many(manager):
+    ids = manager.create_many(["a", "b", "c"])
+    found = manager.get_many(ids + ["missing"])
+    assert found["missing"] == SessionMessages.SESSION_NOT_FOUND
+    assert found[ids[0]] is manager.sessions[ids[0]]
+
+    results = manager.remove_many([ids[0], ids[1], "missing"])
+    assert results == {ids[0]: SessionMessages.SESSION_DELETE_SUCCESS, ids[1]: SessionMessages.SESSION_DELETE_SUCCESS,
+                       "missing": SessionMessages.SESSION_NOT_FOUND}
+    assert set(manager.sessions) == {ids[2]}
+    assert manager.get_with_unick_name("a") is None
+
+
+def test_extend_many_moves_deadlines_and_logs_them(manager):
+    live, ended = manager.create_many([{"unick_name": "a", "duration_seconds": 100},
+                                       {"unick_name": "b", "duration_seconds": -1}])
+    before = manager.sessions[live].end
+    results = manager.extend_many([live, ended, "missing"], 50)
+    assert results == {live: SessionMessages.SESSION_EXTENDED, ended: SessionMessages.SESSION_TIMEOUT,
+                       "missing": SessionMessages.SESSION_NOT_FOUND}
+    assert manager.sessions[live].end == before + 50
+    assert SessionMessages.session_extended_message(live)[0] in list(manager.logs["successful"])
+
+
+def test_negative_extend_is_seen_by_expire_due(manager):
+    session_id = manager.create("a", duration_seconds=100)
+    assert manager.extend(session_id, -200) == SessionMessages.SESSION_EXTENDED
+    assert manager.expire_due() == [session_id]
+
+
+def test_bulk_changes_reach_sqlite_incrementally(manager):
+    ids = manager.create_many(["a", "b", "c"])
+    assert manager.save_sqlite("sessions.db")
+    manager.remove_many(ids[:1])
+    manager.extend_many(ids[1:], 60)
+    assert manager.save_sqlite("sessions.db")
+
+    other = SessionManager("test")
+    other.load_sqlite("sessions.db")
+    assert set(other.sessions) == set(ids[1:])
+    assert other.sessions[ids[1]]["end_time"] == manager.sessions[ids[1]]["end_time"]
+    other.close()
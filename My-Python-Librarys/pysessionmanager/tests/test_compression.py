@@ -0,0 +1,100 @@
+import zlib
+
+import pytest
+
+from pysessionmanager import SessionManager
+from pysessionmanager.compression import (ESCAPE_PREFIX, LzmaCodec, ValueCompressor, ZlibCodec, decompress_value,
+                                          escape_value, is_compressed, unescape_value)
+
+TRICKY = ["\x1f", "\x1fzlib:AAAA", "\x1fzlib:" + "x" * 2000, "\x1e", "\x1eb64:aGk=", "\x1d", "\x1c", "\x1c\x1c",
+          "", "plain", b"\x1fzlib:x\x9c", b"\x1epickle:\x80", b"\x1d", b"\x1c", b""]
+
+
+@pytest.mark.parametrize("value", TRICKY)
+def test_escape_round_trip(value):
+    assert unescape_value(escape_value(value)) == value
+    assert not is_compressed(escape_value(value))
+
+
+def test_large_values_are_compressed_and_read_back(manager):
+    manager.enable_compression(threshold=100)
+    text = "hello world " * 1000
+    session_id = manager.create("a", value=text)
+    assert is_compressed(manager.get(session_id)["value"])
+    assert len(manager.get(session_id)["value"]) < len(text)
+    assert manager.get_value(session_id) == text
+    small = manager.create("b", value="short")
+    assert manager.get(small)["value"] == "short"
+
+
+@pytest.mark.parametrize("compression", [False, True])
+@pytest.mark.parametrize("value", TRICKY)
+def test_marker_values_read_back_unchanged(compression, value):
+    manager = SessionManager("test")
+    if compression:
+        manager.enable_compression(threshold=1)
+    session_id = manager.create("a", value=value)
+    assert manager.get_value(session_id) == value
+    manager.save("sessions.json")
+    other = SessionManager("test")
+    other.load("sessions.json")
+    assert other.get_value(session_id) == value
+    manager.close()
+    other.close()
+
+
+def test_compressed_values_survive_disabling_compression(manager):
+    manager.enable_compression(threshold=10)
+    session_id = manager.create("a", value="x" * 500)
+    manager.disable_compression()
+    assert manager.get_value(session_id) == "x" * 500
+    later = manager.create("b", value="\x1fzlib:not compressed")
+    assert manager.get_value(later) == "\x1fzlib:not compressed"
+
+
+def test_enable_compression_compresses_held_values(manager):
+    session_id = manager.create("a", value="y" * 5000)
+    escaped = manager.create("b", value="\x1f" + "z" * 5000)
+    manager.enable_compression(threshold=100)
+    assert is_compressed(manager.get(session_id)["value"])
+    assert manager.get_value(session_id) == "y" * 5000
+    assert manager.get_value(escaped) == "\x1f" + "z" * 5000
+
+
+@pytest.mark.parametrize("codec", [ZlibCodec(), LzmaCodec()])
+def test_decompression_is_capped(codec):
+    bomb = codec.compress(b"\0" * 1_000_000)
+    assert len(bomb) < 10_000
+    assert codec.decompress(bomb, 1_000_000) == b"\0" * 1_000_000
+    with pytest.raises(ValueError):
+        codec.decompress(bomb, 1000)
+    with pytest.raises(ValueError):
+        codec.decompress(bomb[:len(bomb) // 2], 1_000_000)
+
+
+def test_decompress_value_applies_the_cap():
+    compressor = ValueCompressor("zlib", threshold=1)
+    packed = compressor.compress("a" * 100_000)
+    assert decompress_value(packed) == "a" * 100_000
+    with pytest.raises(ValueError):
+        decompress_value(packed, max_length=10_000)
+
+
+def test_compressed_bytes_values(manager):
+    manager.enable_compression(threshold=10)
+    data = bytes(range(256)) * 10 + b"\0" * 5000
+    session_id = manager.create("a", value=data)
+    assert type(manager.get(session_id)["value"]) is bytes
+    assert manager.get_value(session_id) == data
+    manager.save("sessions.jsonl")
+    other = SessionManager("test")
+    other.load("sessions.jsonl")
+    assert other.get_value(session_id) == data
+    other.close()
+
+
+def test_escape_prefix_is_only_added_for_marker_values():
+    assert escape_value("abc") == "abc"
+    assert escape_value("\x1fabc") == ESCAPE_PREFIX + "\x1fabc"
+    assert escape_value({"a": 1}) == {"a": 1}
+    assert zlib.decompress(ZlibCodec().compress(b"x")) == b"x"
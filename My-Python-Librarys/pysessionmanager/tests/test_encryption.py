@@ -0,0 +1,145 @@
+import os
+
+import pytest
+
+from pysessionmanager import KeyRing, SessionManager, ShardedSessionManager
+from pysessionmanager.encryption import ValueEncryptor, is_encrypted
+
+
+def test_values_are_encrypted_and_bound_to_their_session(manager):
+    manager.enable_encryption()
+    first = manager.create("a", value="secret")
+    second = manager.create("b", value=b"\x00bytes")
+    stored = manager.get(first)["value"]
+    assert is_encrypted(stored) and b"secret" not in stored
+    assert manager.get_value(first) == "secret"
+    assert manager.get_value(second) == b"\x00bytes"
+
+    manager.sessions[second].value = stored  # copied onto another session
+    with pytest.raises(ValueError):
+        manager.get_value(second)
+
+
+def test_tampered_values_fail_to_decrypt(manager):
+    manager.enable_encryption()
+    session_id = manager.create("a", value="secret")
+    stored = bytearray(manager.get(session_id)["value"])
+    stored[-1] ^= 1
+    manager.sessions[session_id].value = bytes(stored)
+    with pytest.raises(ValueError):
+        manager.get_value(session_id)
+
+
+def test_non_text_values_are_refused(manager):
+    manager.enable_encryption()
+    with pytest.raises(TypeError):
+        manager.create("a", value={"a": 1})
+    with pytest.raises(TypeError):
+        ValueEncryptor(KeyRing()).encrypt(5)
+    assert manager.get_value(manager.create("b")) is None
+    manager.enable_serialization()
+    session_id = manager.create("c", value={"a": 1})
+    assert is_encrypted(manager.get(session_id)["value"])
+    assert manager.get_value(session_id) == {"a": 1}
+
+
+def test_create_many_and_set_value(manager):
+    manager.enable_encryption()
+    ids = manager.create_many(["a", {"unick_name": "b", "value": "vb"}], value="va")
+    assert [manager.get_value(session_id) for session_id in ids] == ["va", "vb"]
+    manager.set_value(ids[0], "changed")
+    assert manager.get_value(ids[0]) == "changed"
+
+
+def test_rotation_reencrypts_and_old_keys_can_be_retired(manager):
+    ring = KeyRing("keys.json")
+    manager.enable_encryption(ring)
+    session_id = manager.create("a", value="secret")
+    old_key = ring.active
+    new_key = manager.rotate_encryption_key()
+    assert new_key != old_key and ring.active == new_key
+    assert manager.get(session_id)["value"][1:].startswith(new_key.encode())
+    ring.retire(old_key)
+    assert manager.get_value(session_id) == "secret"
+    assert oct(os.stat("keys.json").st_mode & 0o777) == "0o600"
+    assert KeyRing("keys.json").keys == ring.keys
+    with pytest.raises(ValueError):
+        ring.retire(new_key)
+
+
+def test_values_saved_with_an_old_key_load_after_rotation(manager):
+    ring = KeyRing()
+    manager.enable_encryption(ring)
+    session_id = manager.create("a", value="secret")
+    manager.save("sessions.json")
+    manager.rotate_encryption_key()
+
+    other = SessionManager("test")
+    other.enable_encryption(ring)
+    other.load("sessions.json")
+    assert other.get_value(session_id) == "secret"
+    other.close()
+
+
+def test_disable_encryption_restores_plain_values(manager):
+    manager.enable_encryption()
+    session_id = manager.create("a", value="secret")
+    manager.disable_encryption()
+    assert manager.get(session_id)["value"] == "secret"
+
+
+@pytest.mark.parametrize("frame_bytes", [64, 1024 * 1024])
+def test_encrypted_snapshot_round_trip(manager, frame_bytes):
+    manager.enable_encryption()
+    ids = [manager.create(f"user{i}", value=f"v{i}") for i in range(20)]
+    manager.storer.store_sessions_encrypted(manager.sessions, manager.encryptor, "s.enc", frame_bytes)
+    loaded = dict(manager.storer.iter_sessions_encrypted(manager.encryptor, "s.enc"))
+    assert set(loaded) == set(ids)
+    with open("s.enc", "rb") as f:
+        assert b"user1" not in f.read()
+
+
+def frames(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    result = []
+    while data:
+        length = int.from_bytes(data[:4], "big")
+        result.append(data[:4 + length])
+        data = data[4 + length:]
+    return result
+
+
+@pytest.mark.parametrize("edit", [lambda parts: parts[:-1], lambda parts: parts[:-2] + parts[-1:],
+                                  lambda parts: [parts[1], parts[0]] + parts[2:], lambda parts: []])
+def test_cut_or_reordered_snapshots_are_rejected(manager, edit):
+    manager.enable_encryption()
+    for i in range(20):
+        manager.create(f"user{i}", value=f"v{i}")
+    manager.storer.store_sessions_encrypted(manager.sessions, manager.encryptor, "s.enc", 64)
+    parts = frames("s.enc")
+    assert len(parts) > 3
+    with open("s.enc", "wb") as f:
+        f.write(b"".join(edit(parts)))
+    with pytest.raises(ValueError):
+        list(manager.storer.iter_sessions_encrypted(manager.encryptor, "s.enc"))
+
+
+def test_save_and_load_enc_files(manager):
+    manager.enable_encryption()
+    session_id = manager.create("a", value="secret")
+    assert manager.save("sessions.jsonl.enc")
+    other = SessionManager("test")
+    other.encryptor = manager.encryptor
+    other.load("sessions.jsonl.enc")
+    assert other.get_value(session_id) == "secret"
+    other.close()
+
+
+def test_sharded_rotation():
+    manager = ShardedSessionManager("test", shards=4)
+    manager.enable_encryption()
+    ids = [manager.create(f"user{i}", value=f"v{i}") for i in range(40)]
+    manager.rotate_encryption_key()
+    assert [manager.get_value(session_id) for session_id in ids] == [f"v{i}" for i in range(40)]
+    manager.close()
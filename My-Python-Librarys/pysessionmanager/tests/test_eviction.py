@@ -0,0 +1,85 @@
+import pytest
+
+from pysessionmanager import SessionManager
+from pysessionmanager.eviction import LFUPolicy, LRUPolicy, make_policy
+
+
+def test_lru_policy_order():
+    policy = LRUPolicy()
+    for session_id in "abc":
+        policy.add(session_id)
+    policy.touch("a")
+    assert policy.victim() == "b"
+    policy.remove("b")
+    assert policy.victim() == "c"
+
+
+def test_lfu_policy_counts_touches_not_adds():
+    policy = LFUPolicy()
+    for session_id in "abc":
+        policy.add(session_id)
+    policy.touch("a")
+    policy.add("a")  # re-tracked after a size change
+    assert policy.nodes["a"].count == 2
+    policy.touch("b")
+    policy.touch("b")
+    assert policy.victim() == "c"
+    policy.remove("c")
+    assert policy.victim() == "a"
+    policy.clear()
+    assert policy.victim() is None
+
+
+def test_make_policy_rejects_unknown_names():
+    with pytest.raises(ValueError):
+        make_policy("random", None)
+
+
+def test_max_sessions_evicts_least_recently_used():
+    manager = SessionManager("test", max_sessions=3)
+    a, b, c = (manager.create(name) for name in "abc")
+    manager.get(a)
+    d = manager.create("d")
+    assert set(manager.sessions) == {a, c, d}
+    assert manager.get_with_unick_name("b") is None
+    manager.close()
+
+
+def test_set_value_counts_one_access_under_lfu():
+    manager = SessionManager("test", max_sessions=10, eviction="lfu")
+    session_id = manager.create("a")
+    manager.set_value(session_id, "v")
+    assert manager.eviction.nodes[session_id].count == 2  # create + one write
+    manager.get(session_id)
+    assert manager.eviction.nodes[session_id].count == 3
+    manager.close()
+
+
+def test_repacking_values_is_not_an_access():
+    manager = SessionManager("test", max_sessions=10, eviction="lfu")
+    ids = [manager.create(f"user{i}", value="x" * 2000) for i in range(3)]
+    manager.enable_compression(threshold=100)
+    assert [manager.eviction.nodes[session_id].count for session_id in ids] == [1, 1, 1]
+    manager.close()
+
+
+def test_lfu_evicts_the_least_used():
+    manager = SessionManager("test", max_sessions=2, eviction="lfu")
+    hot = manager.create("hot")
+    cold = manager.create("cold")
+    for _ in range(3):
+        manager.get(hot)
+    manager.set_value(cold, "v")
+    manager.create("new")
+    assert hot in manager.sessions and cold not in manager.sessions
+    manager.close()
+
+
+def test_max_bytes_bounds_the_memory():
+    manager = SessionManager("test", max_bytes=20_000)
+    for i in range(20):
+        manager.create(f"user{i}", value="x" * 2000)
+    assert manager.used_bytes <= 20_000
+    assert len(manager.sessions) < 20
+    assert manager.used_bytes == sum(session.nbytes() for session in manager.sessions.values())
+    manager.close()
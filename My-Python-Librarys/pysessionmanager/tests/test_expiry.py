@@ -0,0 +1,67 @@
+import datetime
+import time
+
+import pytest
+
+from pysessionmanager import SessionManager
+
+
+def test_expire_due_removes_only_sessions_past_their_end(manager):
+    expired = manager.create("old", duration_seconds=-1)
+    live = manager.create("new", duration_seconds=3600)
+
+    assert manager.expire_due() == [expired]
+    assert expired not in manager.sessions
+    assert live in manager.sessions
+    assert manager.get_with_unick_name("old") is None
+
+
+def test_expire_due_respects_now_and_limit(manager):
+    ids = [manager.create(f"user{i}", duration_seconds=10 + i) for i in range(5)]
+    later = datetime.datetime.now() + datetime.timedelta(seconds=100)
+
+    assert manager.expire_due(now=later, limit=2) == ids[:2]
+    assert manager.expire_due(now=later) == ids[2:]
+    assert manager.sessions == {}
+
+
+def test_next_expiry_follows_extend(manager):
+    first = manager.create("a", duration_seconds=100)
+    manager.create("b", duration_seconds=200)
+    assert manager.next_expiry().timestamp() == pytest.approx(manager.sessions[first].end)
+
+    manager.extend(first, 1000)
+    second = manager.get_with_unick_name("b")
+    assert manager.next_expiry().timestamp() == pytest.approx(manager.sessions[second].end)
+
+
+def test_get_all_expires_and_lists_protected_sessions(manager):
+    expired = manager.create("old", duration_seconds=-1)
+    live = manager.create("new")
+
+    sessions, removed, protected = manager.get_all()
+    assert list(sessions) == [live]
+    assert removed == [expired]
+    assert protected == []
+
+
+def test_protected_session_without_password_expires_once_unlocked(manager):
+    session_id = manager.create("locked", duration_seconds=-1)
+    manager.sessions[session_id].protected = 1
+
+    assert manager.expire_due() == []
+    assert manager.expire_due() == []
+    assert session_id in manager.sessions
+
+    manager.sessions[session_id].protected = 0
+    assert manager.expire_due() == [session_id]
+
+
+def test_expiry_heap_is_rebuilt_after_many_removals():
+    manager = SessionManager("test")
+    ids = [manager.create(f"user{i}") for i in range(500)]
+    for session_id in ids[:450]:
+        manager.remove(session_id)
+    assert len(manager.expiry_heap) <= 2 * len(manager.sessions) + 64
+    assert manager.next_expiry() is not None
+    assert time.time() < manager.next_expiry().timestamp()
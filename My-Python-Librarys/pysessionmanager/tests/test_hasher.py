@@ -0,0 +1,72 @@
+import asyncio
+import uuid
+
+import pytest
+
+from pysessionmanager import PasswordHasher, SessionManager
+from pysessionmanager.security import (generate_session_ids, hash_password, kdf_hash, verify_encoded_hash,
+                                       verify_password)
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(work_factor=1000, workers=2)
+    yield hasher
+    hasher.close()
+
+
+@pytest.mark.parametrize("algorithm, work_factor", [("pbkdf2_sha256", 1000), ("scrypt", 1024)])
+def test_kdf_hashes_are_salted_and_verify(algorithm, work_factor):
+    first = kdf_hash("secret", algorithm, work_factor)
+    second = kdf_hash("secret", algorithm, work_factor)
+    assert first != second
+    assert first.startswith(f"{algorithm}${work_factor}$")
+    assert verify_encoded_hash("secret", first)
+    assert not verify_encoded_hash("wrong", first)
+
+
+def test_verify_accepts_legacy_sha256_hashes():
+    assert verify_password("secret", hash_password("secret"))
+    assert not verify_password("secret", hash_password("other"))
+    assert not verify_password("secret", None)
+    assert not verify_encoded_hash("secret", "garbage$x$zz$00")
+
+
+def test_unknown_algorithm_is_rejected():
+    with pytest.raises(ValueError):
+        PasswordHasher("md5")
+
+
+def test_batches_keep_input_order(hasher):
+    passwords = [f"password{i}" for i in range(8)]
+    hashes = hasher.hash_many(passwords)
+    assert hasher.verify_many(zip(passwords, hashes)) == [True] * 8
+    assert hasher.verify_many(zip(reversed(passwords), hashes)) == [False] * 8
+
+
+def test_futures_and_asyncio(hasher):
+    stored = hasher.submit_hash("secret").result()
+    assert hasher.submit_verify("secret", stored).result()
+
+    async def scenario():
+        stored = await hasher.hash_async("secret")
+        assert await hasher.verify_async("secret", stored)
+        assert await hasher.verify_many_async([("secret", stored), ("wrong", stored)]) == [True, False]
+
+    asyncio.run(scenario())
+
+
+def test_manager_uses_the_pool(hasher):
+    manager = SessionManager("test", protect=True, password_hasher=hasher)
+    ids = manager.create_many([{"unick_name": f"user{i}", "password": f"password{i}"} for i in range(4)])
+    assert all(manager.sessions[session_id].password.startswith("pbkdf2_sha256$1000$") for session_id in ids)
+    manager.unlock_many({"user0": "password0", "user1": "wrong-password"})
+    assert not manager.sessions[ids[0]].protected
+    assert manager.sessions[ids[1]].protected
+    manager.close()
+
+
+def test_generate_session_ids_are_unique_v4_uuids():
+    ids = generate_session_ids(1000)
+    assert len(set(ids)) == 1000
+    assert all(uuid.UUID(session_id).version == 4 for session_id in ids)
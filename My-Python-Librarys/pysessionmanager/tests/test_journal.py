@@ -0,0 +1,126 @@
+import os
+import time
+
+import pytest
+
+from pysessionmanager import SessionManager
+from pysessionmanager.journal import SessionJournal
+
+
+def reopen():
+    manager = SessionManager("test")
+    manager.enable_journal()
+    return manager
+
+
+def test_replay_restores_creates_changes_and_removes(manager):
+    manager.enable_journal()
+    kept = manager.create("kept", value="v1")
+    gone = manager.create("gone")
+    manager.set_value(kept, "v2")
+    manager.remove(gone)
+    manager.journal.close()
+    manager.journal = None
+
+    restored = reopen()
+    assert set(restored.sessions) == {kept}
+    assert restored.get_value(kept) == "v2"
+    assert restored.get_with_unick_name("kept") == kept
+    restored.close()
+
+
+def test_torn_tail_is_ignored_and_repaired(manager):
+    manager.enable_journal()
+    session_id = manager.create("a")
+    manager.journal.close()
+    manager.journal = None
+    with open("sessions.journal", "a") as f:
+        f.write('{"op":"put","id":"torn"')
+
+    restored = reopen()
+    assert set(restored.sessions) == {session_id}
+    later = restored.create("b")
+    restored.journal.close()
+    restored.journal = None
+
+    again = reopen()
+    assert set(again.sessions) == {session_id, later}
+    again.close()
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(manager):
+    manager.enable_journal(compact_bytes=2000)
+    ids = [manager.create(f"user{i}", value="x" * 50) for i in range(30)]
+    assert os.path.getsize("sessions.journal") < 2000
+    assert manager.journal.size == os.path.getsize("sessions.journal")
+    assert not os.path.exists("sessions.jsonl.tmp")
+    manager.journal.close()
+    manager.journal = None
+
+    restored = reopen()
+    assert set(restored.sessions) == set(ids)
+    restored.close()
+
+
+def test_compaction_syncs_the_snapshot_before_truncating(manager, monkeypatch):
+    manager.enable_journal()
+    manager.create("a")
+    events = []
+    real_fsync, real_replace = os.fsync, os.replace
+
+    def fsync(fd):
+        events.append(("fsync", os.path.getsize("sessions.journal")))
+        real_fsync(fd)
+
+    def replace(src, dst):
+        events.append(("replace", dst))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, "fsync", fsync)
+    monkeypatch.setattr(os, "replace", replace)
+    manager.journal.compact(manager.sessions)
+
+    # snapshot file, rename, directory: all while the journal still holds its records
+    assert events[0][0] == "fsync" and events[0][1] > 0
+    assert events[1] == ("replace", "sessions.jsonl")
+    assert events[2][0] == "fsync" and events[2][1] > 0
+    assert events[-1] == ("fsync", 0)
+
+
+def test_compaction_skips_fsync_when_disabled(manager, monkeypatch):
+    calls = []
+    monkeypatch.setattr(os, "fsync", calls.append)
+    journal = SessionJournal(manager.storer, fsync="never")
+    journal.compact({})
+    journal.close()
+    assert calls == []
+
+
+def test_invalid_fsync_policy_is_rejected(manager):
+    with pytest.raises(ValueError):
+        SessionJournal(manager.storer, fsync="sometimes")
+
+
+def test_interval_policy_syncs_an_idle_journal(manager, monkeypatch):
+    journal = SessionJournal(manager.storer, fsync=50)
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: synced.append(fd) or real_fsync(fd))
+    journal.record_remove("a")  # just after opening: within the interval, deferred
+    journal.record_remove("b")
+    assert synced == []
+    deadline = time.monotonic() + 2
+    while not synced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(synced) == 1  # one fsync for both records, with no further write
+    assert journal._timer is None
+    journal.close()
+
+
+def test_close_cancels_a_pending_interval_fsync(manager):
+    journal = SessionJournal(manager.storer, fsync=60_000)
+    journal.record_remove("a")
+    assert journal._timer is not None
+    journal.close()
+    assert not journal._timer
+    assert journal._unsynced is False
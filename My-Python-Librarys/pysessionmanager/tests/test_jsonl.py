@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+from pysessionmanager import SessionManager
+
+
+def test_jsonl_round_trip(manager):
+    ids = [manager.create(f"user{i}", value=f"value {i}\nwith newline") for i in range(100)]
+    manager.create("raw", value=b"\x00\xff")
+    assert manager.save("sessions.jsonl")
+    with open("sessions.jsonl") as f:
+        lines = f.readlines()
+    assert len(lines) == 101
+    assert all(json.loads(line)["session_id"] for line in lines)
+
+    other = SessionManager("test")
+    other.load("sessions.jsonl")
+    assert set(ids) <= set(other.sessions)
+    assert other.get_value(ids[42]) == "value 42\nwith newline"
+    assert other.get_value(other.get_with_unick_name("raw")) == b"\x00\xff"
+    assert other.get_with_unick_name("user7") == ids[7]
+    other.close()
+
+
+def test_iter_sessions_jsonl_streams_pairs(manager):
+    ids = [manager.create(f"user{i}") for i in range(5)]
+    manager.storer.store_sessions_jsonl(manager.snapshot(chunk_size=2), "s.jsonl")
+    pairs = manager.storer.iter_sessions_jsonl("s.jsonl")
+    first = next(pairs)
+    assert first[0] == ids[0] and first[1]["unick_name"] == "user0"
+    assert [session_id for session_id, _ in pairs] == ids[1:]
+
+
+def test_blank_lines_are_skipped(manager):
+    manager.create("a")
+    manager.save("sessions.jsonl")
+    with open("sessions.jsonl", "a") as f:
+        f.write("\n\n")
+    assert len(manager.storer.load_sessions_jsonl("sessions.jsonl")) == 1
+
+
+def test_failed_write_leaves_the_old_snapshot(manager):
+    manager.create("a")
+    manager.save("sessions.jsonl")
+    with open("sessions.jsonl") as f:
+        before = f.read()
+
+    def broken():
+        yield "b", {"unick_name": "b"}  # no times: serializing fails mid-write
+
+    with pytest.raises(KeyError):
+        manager.storer.store_sessions_jsonl(broken(), "sessions.jsonl")
+    with open("sessions.jsonl") as f:
+        assert f.read() == before
+
+
+def test_snapshot_copies_are_independent(manager):
+    session_id = manager.create("a", value="v")
+    snapshot = dict(manager.snapshot())
+    manager.set_value(session_id, "changed")
+    assert snapshot[session_id].value == "v"
+
+
+def test_json_snapshot_is_written_entry_by_entry(manager):
+    ids = [manager.create(f"user{i}") for i in range(10)]
+    manager.save("sessions.json")
+    with open("sessions.json") as f:
+        assert set(json.load(f)) == set(ids)
+    assert os.path.getsize("sessions.json") > 0
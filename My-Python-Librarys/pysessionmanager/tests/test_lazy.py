@@ -0,0 +1,142 @@
+import asyncio
+import threading
+
+from pysessionmanager import SessionManager
+from pysessionmanager.async_manager import AsyncSessionManager
+from pysessionmanager.session import LazyValue, ValueCache
+
+
+def saved(count=5, value="x" * 1000):
+    manager = SessionManager("writer")
+    session_ids = [manager.create(f"user{i}", value=f"{i}{value}") for i in range(count)]
+    assert manager.save_sqlite("sessions.db")
+    manager.close()
+    return session_ids
+
+
+def test_lazy_load_keeps_values_on_disk_until_read():
+    session_ids = saved()
+    manager = SessionManager("test")
+    manager.load_sqlite("sessions.db", lazy=True)
+    assert all(type(session.value) is LazyValue for session in manager.sessions.values())
+    assert len(manager.value_cache) == 0
+
+    assert manager.get_value(session_ids[2]).startswith("2x")
+    assert len(manager.value_cache) == 1
+    assert type(manager.sessions[session_ids[2]].value) is LazyValue
+    manager.close()
+
+
+def test_value_cache_is_bounded_by_size():
+    session_ids = saved(count=10, value="x" * 10000)
+    manager = SessionManager("test")
+    manager.load_sqlite("sessions.db", lazy=True, value_cache_bytes=30000)
+    for session_id in session_ids:
+        assert manager.get_value(session_id)[0] == str(session_ids.index(session_id))
+    assert manager.value_cache.used_bytes <= 30000
+    assert 0 < len(manager.value_cache) < len(session_ids)
+    assert session_ids[-1] in manager.value_cache.entries
+    assert session_ids[0] not in manager.value_cache.entries
+    manager.close()
+
+
+def test_value_cache_skips_values_larger_than_the_cache():
+    class Source:
+        calls = 0
+
+        def load_value(self, session_id):
+            Source.calls += 1
+            return "y" * 1000
+
+    cache = ValueCache(max_bytes=100)
+    assert cache.get("a", LazyValue(Source(), "a")) == "y" * 1000
+    assert cache.get("a", LazyValue(Source(), "a")) == "y" * 1000
+    assert Source.calls == 2
+    assert len(cache) == 0
+
+
+def test_set_value_replaces_the_cached_value():
+    session_ids = saved()
+    manager = SessionManager("test")
+    manager.load_sqlite("sessions.db", lazy=True)
+    manager.get_value(session_ids[0])
+    manager.set_value(session_ids[0], "new")
+    assert session_ids[0] not in manager.value_cache.entries
+    assert manager.get_value(session_ids[0]) == "new"
+    assert manager.save_sqlite("sessions.db")
+    assert manager.get_value(session_ids[1]).startswith("1x")
+    manager.close()
+
+
+def test_saving_elsewhere_copies_the_values_from_disk():
+    session_ids = saved()
+    manager = SessionManager("test")
+    manager.load_sqlite("sessions.db", lazy=True)
+    assert manager.save_sqlite("copy.db")
+    assert manager.lazy_db == "sessions.db"
+
+    reader = SessionManager("reader")
+    reader.load_sqlite("copy.db")
+    assert reader.get_value(session_ids[4]).startswith("4x")
+    reader.close()
+    manager.close()
+
+
+def test_full_rewrite_of_the_source_materializes_the_values():
+    session_ids = saved()
+    manager = SessionManager("test")
+    manager.load_sqlite("sessions.db", lazy=True)
+    assert manager.save_sqlite("sessions.db", full=True)
+    assert manager.value_cache is None and manager.lazy_db is None
+    assert all(type(session.value) is str for session in manager.sessions.values())
+    assert manager.get_value(session_ids[3]).startswith("3x")
+    manager.close()
+
+
+def test_materializing_reads_the_source_in_one_query():
+    session_ids = saved(count=20)
+    manager = SessionManager("test")
+    manager.load_sqlite("sessions.db", lazy=True)
+    backend = manager.storer.sqlite_backend("sessions.db")
+    calls = []
+    load_value, load_values = backend.load_value, backend.load_values
+    backend.load_value = lambda session_id: calls.append("one") or load_value(session_id)
+    backend.load_values = lambda: calls.append("all") or load_values()
+    manager._materialize_values()
+    assert calls == ["all"]
+    assert manager.get_value(session_ids[7]).startswith("7x")
+    manager.close()
+
+
+def test_async_full_save_materializes_off_the_loop_and_outside_the_lock():
+    session_ids = saved(count=20)
+
+    async def scenario():
+        manager = AsyncSessionManager("test")
+        await manager.load_sqlite("sessions.db", lazy=True)
+        inner = manager.manager
+        backend = inner.storer.sqlite_backend("sessions.db")
+        seen, free = [], []
+        load_values = backend.load_values
+
+        def probe():
+            if inner._lock.acquire(blocking=False):
+                free.append(True)
+                inner._lock.release()
+
+        def recording():
+            seen.append(threading.current_thread().name)
+            thread = threading.Thread(target=probe)
+            thread.start()
+            thread.join()
+            return load_values()
+
+        backend.load_values = recording
+        assert await manager.save_sqlite("sessions.db", full=True)
+        assert len(seen) == 1 and seen[0].startswith("session-io")
+        assert free == [True]
+        assert inner.lazy_db is None
+        assert await manager.get_value(session_ids[3]) == "3" + "x" * 1000
+        await manager.close()
+
+    asyncio.run(scenario())
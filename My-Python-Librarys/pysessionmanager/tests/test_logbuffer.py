@@ -0,0 +1,58 @@
+import pytest
+
+from pysessionmanager import SessionManager
+from pysessionmanager.codes import SessionMessages
+from pysessionmanager.logbuffer import LogBuffer
+
+
+def test_lazy_entries_are_formatted_on_read():
+    logs = LogBuffer()
+    logs.append("GET -- %s (%d)", "abc", 3)
+    logs.append("plain")
+    assert list(logs) == ["GET -- abc (3)", "plain"]
+    assert logs[0] == "GET -- abc (3)"
+    assert logs == ["GET -- abc (3)", "plain"]
+
+
+def test_tuple_entries_are_stored_unchanged():
+    logs = LogBuffer()
+    message = SessionMessages.session_password_incorrect_message("alice")
+    logs.append(message)
+    logs.append(("%s", "not a format"))
+    logs.append("after")
+    assert list(logs) == [message, ("%s", "not a format"), "after"]
+    assert logs[-1] == "after"
+
+
+def test_capacity_drops_the_oldest():
+    logs = LogBuffer(capacity=3)
+    for i in range(5):
+        logs.append("n=%d", i)
+    assert logs.to_list() == ["n=2", "n=3", "n=4"]
+    assert logs.dropped == 2
+
+
+def test_sampling_keeps_every_nth_append():
+    logs = LogBuffer(sample_rate=0.25)
+    for i in range(8):
+        logs.append("n=%d", i)
+    assert logs.seen == 8
+    assert len(logs) == 2
+    off = LogBuffer(sample_rate=0.0)
+    off.append("x")
+    assert len(off) == 0 and off.seen == 1
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        LogBuffer(capacity=-1)
+    with pytest.raises(ValueError):
+        LogBuffer(sample_rate=2.0)
+
+
+def test_password_on_unprotected_create_keeps_the_logs_readable(manager):
+    session_id = manager.create("alice", password="ignored")
+    manager.get("missing")
+    manager.is_active(session_id)
+    assert manager.logs["errors"][0] == SessionMessages.session_password_incorrect_message("alice")
+    assert "IS_ACTIVE -- " + session_id in list(manager.logs["debug"])
@@ -0,0 +1,82 @@
+import urllib.request
+
+from pysessionmanager import SessionManager, SessionMetrics
+from pysessionmanager.metrics import Histogram
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram((0.001, 0.01, 0.1))
+    for seconds in (0.0005, 0.0005, 0.005, 0.05, 5.0):
+        histogram.observe(seconds)
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.quantile(0.4) == 0.001
+    assert histogram.quantile(0.8) == 0.1
+    assert histogram.quantile(1.0) == float("inf")
+    assert histogram.to_dict()["buckets"][0.01] == 3
+    assert Histogram().quantile(0.5) is None
+
+
+def test_manager_counts_hits_misses_and_latency(manager):
+    metrics = manager.enable_metrics()
+    session_id = manager.create("a")
+    manager.get(session_id)
+    manager.get("missing")
+    manager.save("sessions.json")
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["hits"] == 1
+    assert snapshot["counters"]["misses"] == 1
+    assert snapshot["latency"]["create"]["count"] == 1
+    assert snapshot["latency"]["get"]["count"] == 2
+    assert snapshot["io_bytes"]["json_write"] > 0
+    assert snapshot["gauges"]["sessions"] == 1
+
+
+def test_disabled_metrics_remove_the_wrappers(manager):
+    manager.enable_metrics()
+    assert "get" in manager.__dict__
+    manager.disable_metrics()
+    assert "get" not in manager.__dict__
+    manager.get(manager.create("a"))
+    assert manager.metrics is None
+
+
+def test_expirations_and_evictions_are_counted():
+    manager = SessionManager("test", max_sessions=2)
+    metrics = manager.enable_metrics()
+    manager.create("old", duration_seconds=-1)
+    manager.create("a")
+    manager.create("b")
+    manager.expire_due()
+    manager.create("c")
+    manager.create("d")
+    counters = metrics.snapshot()["counters"]
+    assert counters["evictions"] >= 1
+    manager.close()
+
+
+def test_prometheus_text_and_http(manager):
+    metrics = manager.enable_metrics(SessionMetrics(namespace="test"))
+    manager.create("a")
+    text = metrics.to_prometheus()
+    assert "# TYPE test_hits_total counter" in text
+    assert 'test_operation_seconds_count{operation="create"} 1' in text
+    assert 'test_operation_seconds_bucket{operation="create",le="+Inf"} 1' in text
+    assert "test_sessions 1" in text
+
+    server = metrics.start_http_server(port=0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            assert response.read().decode() == metrics.to_prometheus()
+    finally:
+        metrics.stop_http_server()
+
+
+def test_reset_keeps_the_counter_names():
+    metrics = SessionMetrics()
+    metrics.increment("hits", 3)
+    metrics.observe("get", 0.001)
+    metrics.add_io_bytes("sqlite", "write", 100)
+    metrics.reset()
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["hits"] == 0
+    assert snapshot["latency"] == {} and snapshot["io_bytes"] == {}
@@ -0,0 +1,51 @@
+from pysessionmanager import SessionManager
+from pysessionmanager.codes import SessionMessages
+
+
+def test_lookup_by_name(manager):
+    session_id = manager.create("alice")
+    assert manager.name_index == {"alice": session_id}
+    assert manager.get_with_unick_name("alice") == session_id
+    assert manager.get_with_unick_name("bob") is None
+
+
+def test_duplicate_names_are_refused(manager):
+    manager.create("alice")
+    assert manager.create("alice") == SessionMessages.SESSION_ALREADY_EXISTS
+    assert len(manager.sessions) == 1
+
+
+def test_remove_and_expire_free_the_name(manager):
+    session_id = manager.create("alice")
+    manager.remove(session_id)
+    assert manager.get_with_unick_name("alice") is None
+    again = manager.create("alice", duration_seconds=-1)
+    assert manager.get_with_unick_name("alice") == again
+    manager.expire_due()
+    assert "alice" not in manager.name_index
+    assert manager.create("alice") in manager.sessions
+
+
+def test_protected_sessions_are_not_revealed_by_name():
+    manager = SessionManager("test", protect=True)
+    session_id = manager.create("alice", password="secret-pw")
+    assert manager.get_with_unick_name("alice") == SessionMessages.protected_session_message(session_id)[1]
+    assert manager.unlock("alice", "secret-pw") == SessionMessages.unlock_message(session_id)[1]
+    assert manager.get_with_unick_name("alice") == session_id
+    manager.close()
+
+
+def test_index_is_rebuilt_on_load(manager):
+    ids = {manager.create(f"user{i}"): f"user{i}" for i in range(10)}
+    manager.save("sessions.json")
+    other = SessionManager("test")
+    other.load("sessions.json")
+    assert other.name_index == {name: session_id for session_id, name in ids.items()}
+    other.close()
+
+
+def test_clean_all_clears_the_index(manager):
+    manager.create("alice")
+    manager.clean_all()
+    assert manager.name_index == {}
+    assert manager.get_with_unick_name("alice") is None
@@ -0,0 +1,76 @@
+from pysessionmanager import ShardedSessionManager, TieredSessionManager
+
+
+def collect(pages):
+    return [session_id for page in pages for session_id, _ in page.sessions]
+
+
+def test_pages_cover_every_session_once(manager):
+    session_ids = [manager.create(f"user{i}") for i in range(25)]
+    pages = list(manager.iter_sessions(batch_size=10))
+    assert [len(page.sessions) for page in pages] == [10, 10, 5]
+    assert pages[-1].cursor is None
+    assert collect(pages) == session_ids
+
+
+def test_filter_fills_whole_pages(manager):
+    session_ids = [manager.create(f"user{i}", value=str(i % 3)) for i in range(30)]
+    pages = list(manager.iter_sessions(lambda session_id, session: session.value == "0", batch_size=4))
+    assert [len(page.sessions) for page in pages] == [4, 4, 2]
+    assert collect(pages) == session_ids[::3]
+
+
+def test_resume_from_a_cursor_in_a_new_call(manager):
+    session_ids = [manager.create(f"user{i}") for i in range(12)]
+    first = next(manager.iter_sessions(batch_size=5))
+    rest = collect(manager.iter_sessions(batch_size=5, cursor=first.cursor))
+    assert collect([first]) + rest == session_ids
+
+
+def test_cursor_survives_removals_and_creates(manager):
+    session_ids = [manager.create(f"user{i}") for i in range(10)]
+    first = next(manager.iter_sessions(batch_size=4))
+    manager.remove(session_ids[0])
+    manager.remove(session_ids[7])
+    added = manager.create("added")
+    rest = collect(manager.iter_sessions(batch_size=4, cursor=first.cursor))
+    assert rest == session_ids[4:7] + session_ids[8:] + [added]
+
+
+def test_removing_during_iteration_does_not_raise(manager):
+    session_ids = [manager.create(f"user{i}") for i in range(20)]
+    seen = []
+    for page in manager.iter_sessions(batch_size=5):
+        for session_id, _ in page.sessions:
+            seen.append(session_id)
+            manager.remove(session_id)
+    assert seen == session_ids
+    assert manager.sessions == {}
+
+
+def test_sharded_pages_resume_across_shards():
+    manager = ShardedSessionManager("test", shards=3)
+    session_ids = {manager.create(f"user{i}") for i in range(20)}
+    first = next(manager.iter_sessions(batch_size=3))
+    rest = collect(manager.iter_sessions(batch_size=3, cursor=first.cursor))
+    seen = collect([first]) + rest
+    assert len(seen) == len(session_ids) and set(seen) == session_ids
+    manager.close()
+
+
+def test_tiered_pages_come_from_the_database(tmp_path):
+    manager = TieredSessionManager("test", str(tmp_path / "tiered.db"), l1_size=4, flush_interval=3600)
+    session_ids = sorted(manager.create(f"user{i}") for i in range(10))
+    pages = list(manager.iter_sessions(batch_size=4))
+    assert collect(pages) == session_ids
+    resumed = collect(manager.iter_sessions(batch_size=4, cursor=pages[0].cursor))
+    assert resumed == session_ids[4:]
+    manager.close()
+
+
+def test_cursor_survives_removal_of_the_session_it_points_to(manager):
+    session_ids = [manager.create(f"user{i}") for i in range(10)]
+    first = next(manager.iter_sessions(batch_size=4))
+    manager.remove(session_ids[4])
+    rest = collect(manager.iter_sessions(batch_size=4, cursor=first.cursor))
+    assert rest == session_ids[5:]
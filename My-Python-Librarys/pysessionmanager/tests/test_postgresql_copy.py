@@ -0,0 +1,100 @@
+import datetime
+from contextlib import contextmanager
+
+import pytest
+
+from pysessionmanager.backends import (PostgreSQLBackend, copy_escape, copy_line, copy_unescape, parse_copy_line,
+                                       postgresql_row)
+
+
+def session(value, protected=False, password=None):
+    start = datetime.datetime(2026, 1, 2, 3, 4, 5, 678000)
+    return {"unick_name": "alice", "start_time": start, "end_time": start + datetime.timedelta(hours=1),
+            "protected": protected, "password": password, "value": value}
+
+
+@pytest.mark.parametrize("text", [
+    "", "plain", "back\\slash", "\\N", "tab\there", "new\nline", "cr\rlf\r\n",
+    "\b\f\v all controls \t\n\r", "\\x41 and \\101", "héllo wörld ✓ 🎉", "\x00\x01\x7f",
+])
+def test_copy_escape_round_trip(text):
+    escaped = copy_escape(text)
+    assert not set(escaped) & set("\b\f\n\r\t\v")
+    assert copy_unescape(escaped) == text
+
+
+@pytest.mark.parametrize("field, expected", [
+    (r"a\bb", "a\bb"), (r"\f\v", "\f\v"), (r"\101", "A"), (r"\x41", "A"), (r"\x4g", "\x04g"),
+    (r"\303\251", "é"), (r"\xc3\xa9", "é"), (r"\q", "q"), (r"\\", "\\"), ("\\N", None), ("x\\N", "xN"),
+])
+def test_copy_unescape_postgresql_forms(field, expected):
+    assert copy_unescape(field) == expected
+
+
+def test_copy_line_round_trip():
+    for value in ("multi\nline\tvalue\b", b"\x00\xffbytes", None):
+        row = postgresql_row("id-1", session(value, protected=True, password="h\\ash"))
+        line = copy_line(row)
+        assert line.endswith("\n") and line.count("\n") == 1
+        assert parse_copy_line(line[:-1]) == row
+
+
+class FakeCursor:
+    """Stands in for a psycopg2 cursor: COPY FROM reads the file in small chunks, COPY TO writes bytes."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def execute(self, query, params=None):
+        if query.startswith("DELETE"):
+            self.table.clear()
+
+    def copy_expert(self, query, file):
+        if "FROM STDIN" in query:
+            while True:
+                chunk = file.read(7)
+                if not chunk:
+                    break
+                self.table.append(chunk)
+        else:
+            data = "".join(self.table).encode()
+            for i in range(0, len(data), 5):  # splits multi-byte characters across writes
+                file.write(data[i:i + 5])
+
+
+class FakeConnection:
+    def __init__(self, table):
+        self.table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return FakeCursor(self.table)
+
+
+@pytest.fixture
+def backend():
+    backend = PostgreSQLBackend.__new__(PostgreSQLBackend)
+    table = []
+
+    @contextmanager
+    def connection():
+        yield FakeConnection(table)
+
+    backend.connection = connection
+    return backend
+
+
+def test_store_all_and_load_all_round_trip(backend):
+    sessions = {
+        "a": session("tabs\tand\nnewlines ✓"),
+        "b": session(b"\x00\x01\xfe", protected=True, password="pw"),
+        "c": session(None),
+        "d": session("\\b\b\f\v é"),
+    }
+    backend.store_all(sessions)
+    assert backend.load_all() == sessions
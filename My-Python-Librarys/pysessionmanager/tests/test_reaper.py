@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from pysessionmanager import SessionManager
+from pysessionmanager.reaper import SessionReaper
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+def test_reaper_thread_removes_sessions_as_they_fall_due(manager):
+    calls = []
+    manager.create("soon", duration_seconds=0.2)
+    manager.create("later", duration_seconds=3600)
+    reaper = manager.start_reaper(min_interval=0.01, callback=lambda expired, left: calls.append((expired, left)))
+    try:
+        wait_for(lambda: len(manager.sessions) == 1)
+    finally:
+        manager.stop_reaper()
+    assert calls == [(1, 1)]
+    assert reaper.total_expired == 1
+    assert not reaper.running
+
+
+def test_reap_once_works_in_batches(manager):
+    manager.create_many([f"user{i}" for i in range(25)], duration_seconds=-1)
+    reaper = SessionReaper(manager, batch_size=10)
+    assert [reaper.reap_once() for _ in range(4)] == [10, 10, 5, 0]
+    assert reaper.total_expired == 25
+
+
+def test_reaper_survives_errors(manager, monkeypatch):
+    failures = []
+
+    def broken_flush():
+        if len(failures) < 2:
+            failures.append(1)
+            raise OSError("disk full")
+        return 0
+
+    monkeypatch.setattr(manager, "flush_touches", broken_flush)
+    manager.create("soon", duration_seconds=-1)
+    reaper = manager.start_reaper(min_interval=0.01, max_interval=0.05)
+    try:
+        wait_for(lambda: not manager.sessions)
+        assert reaper.running
+    finally:
+        manager.stop_reaper()
+    assert reaper.errors == 2
+
+
+def test_reaper_survives_failing_callback(manager):
+    def callback(expired, remaining):
+        raise RuntimeError("boom")
+
+    manager.create("a", duration_seconds=-1)
+    reaper = manager.start_reaper(callback=callback, min_interval=0.01)
+    manager.stop_reaper()
+    assert reaper.total_expired == 1
+    assert reaper.errors == 0
+
+
+def test_reaper_as_asyncio_task():
+    async def main():
+        manager = SessionManager("test")
+        manager.create("soon", duration_seconds=0.1)
+        manager.start_reaper(use_asyncio=True, min_interval=0.01)
+        for _ in range(200):
+            if not manager.sessions:
+                break
+            await asyncio.sleep(0.01)
+        manager.stop_reaper()
+        return len(manager.sessions)
+
+    assert asyncio.run(main()) == 0
+
+
+def test_batch_size_must_be_positive(manager):
+    with pytest.raises(ValueError):
+        manager.start_reaper(batch_size=0)
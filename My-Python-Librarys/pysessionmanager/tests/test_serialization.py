@@ -0,0 +1,103 @@
+import datetime
+import decimal
+import pickle
+import uuid
+from collections import OrderedDict, deque
+
+import pytest
+
+from pysessionmanager import PickleSerializer, SessionManager
+from pysessionmanager.serialization import SERIALIZERS, is_serialized, unpack_value, value_from_text, value_to_text
+
+
+class Cart:
+    def __init__(self, items):
+        self.items = items
+
+    def __eq__(self, other):
+        return isinstance(other, Cart) and other.items == self.items
+
+
+class Exploit:
+    def __reduce__(self):
+        return (print, ("pwned",))
+
+
+@pytest.fixture(autouse=True)
+def restore_serializers():
+    saved = dict(SERIALIZERS)
+    yield
+    SERIALIZERS.clear()
+    SERIALIZERS.update(saved)
+
+
+@pytest.mark.parametrize("mode", ["pickle", "marshal"])
+def test_structured_values_round_trip(manager, mode):
+    manager.enable_serialization(mode)
+    value = {"cart": [1, 2, 3], "token": b"\x00\x01", "nested": {"a": (1, 2)}}
+    session_id = manager.create("a", value=value)
+    assert is_serialized(manager.get(session_id)["value"])
+    assert manager.get_value(session_id) == value
+    text = manager.create("b", value="plain text")
+    assert manager.get(text)["value"] == "plain text"
+
+
+@pytest.mark.parametrize("ext", ["json", "jsonl", "csv"])
+def test_serialized_values_survive_text_stores(manager, ext):
+    manager.enable_serialization()
+    value = {"when": datetime.datetime(2026, 1, 2), "amount": decimal.Decimal("1.50"), "id": uuid.uuid4(),
+             "order": OrderedDict(a=1), "queue": deque([1, 2]), "tags": {"x", "y"}, "frozen": frozenset({1})}
+    session_id = manager.create("a", value=value)
+    manager.save(f"sessions.{ext}")
+    other = SessionManager("test")
+    other.enable_serialization()
+    other.load(f"sessions.{ext}")
+    assert other.get_value(session_id) == value
+    other.close()
+
+
+@pytest.mark.parametrize("value", ["\x1eb64:aGVsbG8=", "\x1es:x", "\x1e", "plain", b"\x1eb64:", b"", None])
+def test_text_encoding_keeps_the_type(value):
+    assert value_from_text(value_to_text(value)) == value
+    assert type(value_from_text(value_to_text(value))) is type(value)
+
+
+def test_user_string_that_looks_like_bytes_is_not_unpickled(manager):
+    manager.enable_serialization()
+    payload = "\x1eb64:" + __import__("base64").b64encode(b"\x1epickle:" + pickle.dumps(Exploit())).decode()
+    session_id = manager.create("a", value=payload)
+    manager.save("sessions.json")
+    other = SessionManager("test")
+    other.enable_serialization()
+    other.load("sessions.json")
+    assert other.get_value(session_id) == payload
+    other.close()
+
+
+def test_restricted_unpickler_refuses_other_globals():
+    data = b"\x1epickle:" + pickle.dumps(Exploit())
+    with pytest.raises(pickle.UnpicklingError):
+        unpack_value(data)
+    with pytest.raises(pickle.UnpicklingError):
+        unpack_value(b"\x1epickle:" + pickle.dumps(Cart([1])))
+
+
+def test_allowed_classes_are_unpickled(manager):
+    manager.enable_serialization(PickleSerializer(allowed={f"{__name__}.Cart"}))
+    session_id = manager.create("a", value=Cart([1, 2]))
+    assert manager.get_value(session_id) == Cart([1, 2])
+
+
+def test_enable_serialization_packs_held_values_once(manager):
+    structured = manager.create("a", value={"a": 1})
+    raw = manager.create("b", value=b"\x1epickle:not really")
+    manager.enable_serialization()
+    assert manager.get_value(structured) == {"a": 1}
+    assert manager.get_value(raw) == b"\x1epickle:not really"
+
+
+def test_unknown_serializer_is_rejected(manager):
+    with pytest.raises(ValueError):
+        manager.enable_serialization("yaml")
+    with pytest.raises(ValueError):
+        unpack_value(b"\x1eyaml:data")
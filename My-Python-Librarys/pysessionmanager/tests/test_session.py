@@ -0,0 +1,68 @@
+import datetime
+
+import pytest
+
+from pysessionmanager.session import LazyValue, Session
+
+
+def old_style(**overrides):
+    start = datetime.datetime(2026, 1, 2, 3, 4, 5)
+    session = {"unick_name": "alice", "start_time": start, "end_time": start + datetime.timedelta(hours=1),
+               "protected": True, "password": "hash", "value": "v"}
+    session.update(overrides)
+    return session
+
+
+def test_session_has_no_instance_dict():
+    session = Session("alice", 1.0, 2.0)
+    assert not hasattr(session, "__dict__")
+    with pytest.raises(AttributeError):
+        session.extra = 1
+
+
+def test_session_behaves_like_the_old_dict():
+    session = Session.from_dict(old_style())
+    assert session == old_style()
+    assert session["end_time"] == old_style()["end_time"]
+    assert session["protected"] is True and session.protected == 1
+    assert dict(session) == session.to_dict() == old_style()
+    assert Session.from_dict(session) is session
+
+
+def test_session_item_assignment_updates_the_slots():
+    session = Session.from_dict(old_style(protected=False))
+    later = datetime.datetime(2030, 1, 1)
+    session["end_time"] = later
+    session["protected"] = True
+    session["value"] = "new"
+    assert session.end == later.timestamp()
+    assert session.protected == 1
+    assert session.value == "new"
+    with pytest.raises(KeyError):
+        session["unknown"] = 1
+    with pytest.raises(TypeError):
+        del session["value"]
+
+
+def test_copy_is_independent():
+    session = Session("alice", 1.0, 2.0, value="a")
+    copy = session.copy()
+    copy.value = "b"
+    assert session.value == "a"
+    assert copy == Session("alice", 1.0, 2.0, value="b")
+
+
+def test_lazy_value_is_loaded_on_item_access():
+    class Backend:
+        def load_value(self, session_id):
+            return f"value of {session_id}"
+
+    session = Session("alice", 1.0, 2.0, value=LazyValue(Backend(), "id-1"))
+    assert type(session.value) is LazyValue
+    assert session["value"] == "value of id-1"
+
+
+def test_nbytes_counts_the_strings():
+    small = Session("a", 1.0, 2.0)
+    large = Session("a", 1.0, 2.0, value="x" * 10_000)
+    assert large.nbytes() - small.nbytes() >= 10_000
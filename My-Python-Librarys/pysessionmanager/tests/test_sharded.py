@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pysessionmanager import SessionManager, ShardedSessionManager
+from pysessionmanager.codes import SessionMessages
+
+
+@pytest.fixture
+def sharded():
+    manager = ShardedSessionManager("test", shards=4)
+    yield manager
+    manager.close()
+
+
+def all_ids(manager):
+    return {session_id for shard in manager.shards for session_id in shard.sessions}
+
+
+def test_sessions_are_spread_over_the_shards(sharded):
+    ids = [sharded.create(f"user{i}") for i in range(200)]
+    assert all_ids(sharded) == set(ids)
+    assert all(shard.sessions for shard in sharded.shards)
+    for session_id in ids:
+        assert session_id in sharded.shard_for(session_id).sessions
+
+
+def test_names_stay_unique_across_threads(sharded):
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda i: sharded.create(f"user{i % 50}"), range(400)))
+    created = [result for result in results if result != SessionMessages.SESSION_ALREADY_EXISTS]
+    assert len(created) == 50
+    assert set(sharded.names.values()) == set(created) == all_ids(sharded)
+
+
+def test_concurrent_creates_removes_and_reads(sharded):
+    ids = [sharded.create(f"user{i}", value=str(i)) for i in range(300)]
+
+    def work(i):
+        session_id = ids[i]
+        assert sharded.get_value(session_id) == str(i)
+        if i % 3 == 0:
+            sharded.remove(session_id)
+        else:
+            sharded.set_value(session_id, f"new {i}")
+        return sharded.create(f"extra{i}")
+
+    with ThreadPoolExecutor(8) as pool:
+        extra = list(pool.map(work, range(300)))
+    kept = {session_id for i, session_id in enumerate(ids) if i % 3} | set(extra)
+    assert all_ids(sharded) == kept
+    assert set(sharded.names.values()) == kept
+    assert sharded.get_value(ids[1]) == "new 1"
+    assert sharded.get_with_unick_name("user0") is None
+    assert sharded.create("user0") in all_ids(sharded)
+
+
+def test_bulk_calls_group_by_shard(sharded):
+    ids = sharded.create_many([f"user{i}" for i in range(40)] + ["user0"])
+    assert ids[-1] == SessionMessages.SESSION_ALREADY_EXISTS
+    assert set(sharded.get_many(ids[:40])) == set(ids[:40])
+    removed = sharded.remove_many(ids[:10])
+    assert all(result == SessionMessages.SESSION_DELETE_SUCCESS for result in removed.values())
+    assert sharded.get_with_unick_name("user3") is None
+    assert sharded.extend_many(ids[10:20], 60) == {session_id: SessionMessages.SESSION_EXTENDED
+                                                   for session_id in ids[10:20]}
+
+
+def test_expire_due_and_next_expiry_cover_every_shard(sharded):
+    expired = [sharded.create(f"old{i}", duration_seconds=-1) for i in range(10)]
+    live = sharded.create("new", duration_seconds=100)
+    assert sorted(sharded.expire_due()) == sorted(expired)
+    assert all_ids(sharded) == {live}
+    assert set(sharded.names) == {"new"}
+    assert sharded.next_expiry() is not None
+
+
+def test_save_and_load(sharded):
+    ids = [sharded.create(f"user{i}", value=f"v{i}") for i in range(50)]
+    assert sharded.save("sessions.jsonl")
+    other = ShardedSessionManager("test", shards=3)
+    other.load("sessions.jsonl")
+    assert all_ids(other) == set(ids)
+    assert other.get_value(ids[5]) == "v5"
+    assert other.get_with_unick_name("user9") == ids[9]
+    other.close()
+
+
+def test_save_and_load_json(sharded):
+    ids = [sharded.create(f"user{i}", value=f"v{i}") for i in range(20)]
+    assert sharded.save("sessions.json")
+    with open("sessions.json") as f:
+        assert f.read(1) == "{"
+    other = ShardedSessionManager("test", shards=3)
+    other.load("sessions.json")
+    assert all_ids(other) == set(ids)
+    assert other.get_value(ids[3]) == "v3"
+    other.close()
+
+
+def test_get_survives_a_concurrent_remove():
+    manager = SessionManager("test", max_sessions=10, auto_renew=True)
+    session_id = manager.create("alice", value="one")
+    touch = manager._touch
+
+    def removing_touch(touched_id):
+        # Another thread removes the session between the lookup and the touch.
+        manager.remove(touched_id)
+        touch(touched_id)
+
+    manager._touch = removing_touch
+    assert manager.get(session_id).unick_name == "alice"
+    assert manager.get(session_id) == SessionMessages.SESSION_NOT_FOUND
+    other = manager.create("bob", value="two")
+    assert manager.get_value(other) == "two"
+    assert other not in manager.sessions
+    manager.close()
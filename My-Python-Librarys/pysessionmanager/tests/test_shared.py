@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from pysessionmanager import SharedSessionManager
+from pysessionmanager.codes import SessionMessages
+
+
+@pytest.fixture
+def workers(tmp_path):
+    path = str(tmp_path / "shared.db")
+    first = SharedSessionManager("test", path)
+    second = SharedSessionManager("test", path)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def test_sessions_created_in_one_worker_are_seen_by_another(workers):
+    first, second = workers
+    session_id = first.create("alice", value="one")
+    assert second.get_value(session_id) == "one"
+    assert second.get_with_unick_name("alice") == session_id
+    assert second.create("alice") == SessionMessages.SESSION_ALREADY_EXISTS
+
+
+def test_changes_invalidate_cached_copies(workers):
+    first, second = workers
+    session_id = first.create("alice", value="one")
+    assert second.get_value(session_id) == "one"
+    assert session_id in second.sessions
+
+    first.set_value(session_id, "two")
+    assert second.get_value(session_id) == "two"
+
+    first.remove(session_id)
+    assert second.get(session_id) == SessionMessages.SESSION_NOT_FOUND
+    assert session_id not in second.sessions
+
+
+def test_bulk_creates_are_seen_and_names_stay_unique(workers):
+    first, second = workers
+    first.create("taken")
+    results = second.create_many(["taken", "free"])
+    assert results[0] == SessionMessages.SESSION_ALREADY_EXISTS
+    assert first.get_with_unick_name("free") == results[1]
+
+
+def test_max_staleness_delays_the_change_check(tmp_path):
+    path = str(tmp_path / "shared.db")
+    first = SharedSessionManager("test", path)
+    second = SharedSessionManager("test", path, max_staleness=0.2)
+    session_id = first.create("alice", value="one")
+    time.sleep(0.25)
+    assert second.get_value(session_id) == "one"
+
+    first.set_value(session_id, "two")
+    assert second.get_value(session_id) == "one"  # served from L1 within the staleness window
+    time.sleep(0.25)
+    assert second.get_value(session_id) == "two"
+    first.close()
+    second.close()
+
+
+def test_invalidations_are_counted(workers):
+    first, second = workers
+    metrics = second.enable_metrics()
+    session_id = first.create("alice", value="one")
+    second.get_value(session_id)
+    first.set_value(session_id, "two")
+    second.get_value(session_id)
+    assert metrics.snapshot()["counters"]["invalidations"] >= 1
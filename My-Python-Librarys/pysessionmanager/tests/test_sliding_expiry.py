@@ -0,0 +1,98 @@
+import threading
+import time
+
+from pysessionmanager import SessionManager
+from pysessionmanager.shared import SharedSessionManager
+
+
+def test_reads_slide_the_deadline_in_memory():
+    manager = SessionManager("test", auto_renew=True, renew_seconds=600, touch_interval=3600)
+    session_id = manager.create("a", duration_seconds=60)
+    manager.get(session_id)
+    assert manager.get_time_remaining(session_id) > 590
+    assert manager.touched == {session_id}
+    manager.close()
+
+
+def test_expired_sessions_are_not_revived_and_long_deadlines_not_shortened():
+    manager = SessionManager("test", auto_renew=True, renew_seconds=600, touch_interval=3600)
+    expired = manager.create("old", duration_seconds=-1)
+    long = manager.create("long", duration_seconds=7200)
+    end = manager.sessions[long].end
+    manager.get(expired)
+    manager.get(long)
+    assert manager.sessions[expired].end < time.time()
+    assert manager.sessions[long].end == end
+    assert manager.touched == set()
+    manager.close()
+
+
+def test_flush_touches_hands_deadlines_to_the_journal():
+    manager = SessionManager("test", auto_renew=True, renew_seconds=600, touch_interval=3600)
+    manager.enable_journal()
+    session_id = manager.create("a", duration_seconds=60)
+    manager.get(session_id)
+    assert manager.flush_touches() == 1
+    assert manager.touched == set()
+    manager.journal.close()
+    manager.journal = None
+
+    restored = SessionManager("test")
+    restored.enable_journal()
+    assert restored.get_time_remaining(session_id) > 590
+    restored.close()
+
+
+def test_concurrent_reads_and_flushes():
+    manager = SessionManager("test", auto_renew=True, renew_seconds=600, touch_interval=3600)
+    ids = [manager.create(f"user{i}", duration_seconds=60) for i in range(500)]
+    errors = []
+    stop = threading.Event()
+
+    def reader():
+        try:
+            while not stop.is_set():
+                for session_id in ids:
+                    manager.get(session_id)
+                    manager.sessions[session_id].end -= 100  # so the next read renews again
+        except Exception as e:
+            errors.append(e)
+
+    def flusher():
+        try:
+            while not stop.is_set():
+                manager.flush_touches()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader) for _ in range(3)] + [threading.Thread(target=flusher)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    manager.close()
+
+
+def test_renewed_stale_copy_does_not_undo_another_workers_change(tmp_path):
+    path = str(tmp_path / "shared.db")
+    first = SharedSessionManager("test", path, auto_renew=True, renew_seconds=600, touch_interval=3600)
+    second = SharedSessionManager("test", path)
+    locked = first.create("locked", duration_seconds=60)
+    removed = first.create("removed", duration_seconds=60)
+    first.get(locked)
+    first.get(removed)
+    assert first.touched == {locked, removed}
+
+    assert second.lock(locked, "password1") is not None
+    second.remove(removed)
+    first.get_with_unick_name("anything")  # syncs and drops both stale copies
+
+    assert first.touched == set()
+    assert first.get(locked)["protected"] is True
+    assert first.get_with_unick_name("removed") is None
+    assert second.backend.load_one(removed) is None
+    first.close()
+    second.close()
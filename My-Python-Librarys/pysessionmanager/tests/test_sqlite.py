@@ -0,0 +1,59 @@
+import gc
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pysessionmanager.backends import SQLiteBackend
+
+
+def test_each_thread_reuses_its_own_connection(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "s.db"))
+    main = backend.connection()
+    assert backend.connection() is main
+    with ThreadPoolExecutor(2) as pool:
+        others = set(pool.map(lambda _: id(backend.connection()), range(20)))
+    assert id(main) not in others
+    assert len(others) <= 2
+    backend.close()
+
+
+def test_wal_mode_and_pragmas(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "s.db"), cache_size_kb=1024)
+    conn = backend.connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -1024
+    backend.close()
+
+
+def test_connections_of_finished_threads_are_closed(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "s.db"))
+    opened = []
+
+    def work():
+        conn = backend.connection()
+        conn.execute("SELECT 1")
+        opened.append(conn)
+
+    for _ in range(50):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    gc.collect()
+    assert backend.open_connections() == 1  # the main thread's
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute("SELECT 1")
+    backend.close()
+    assert backend.open_connections() == 0
+
+
+def test_close_closes_every_connection(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "s.db"))
+    conn = backend.connection()
+    backend.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    # A new connection is opened on the next use.
+    assert backend.connection().execute("SELECT 1").fetchone() == (1,)
+    backend.close()
@@ -0,0 +1,81 @@
+import sqlite3
+
+from pysessionmanager import SessionManager
+
+
+def rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {row[0]: row for row in conn.execute("SELECT * FROM sessions")}
+    finally:
+        conn.close()
+
+
+def spy(manager, filename):
+    calls = []
+    backend = manager.storer.sqlite_backend(filename)
+    store_all, store_changes = backend.store_all, backend.store_changes
+    backend.store_all = lambda *args: (calls.append("all"), store_all(*args))
+    backend.store_changes = lambda sessions, dirty, removed: (
+        calls.append(("changes", set(dirty), set(removed))), store_changes(sessions, dirty, removed))
+    return calls
+
+
+def test_first_save_rewrites_then_only_changes_are_written(manager):
+    calls = spy(manager, "sessions.db")
+    kept, changed, removed = (manager.create(name, value=name) for name in ("kept", "changed", "removed"))
+    assert manager.save_sqlite("sessions.db")
+    assert calls == ["all"]
+
+    manager.set_value(changed, "new")
+    manager.remove(removed)
+    added = manager.create("added")
+    assert manager.save_sqlite("sessions.db")
+    assert calls[1] == ("changes", {changed, added}, {removed})
+    stored = rows("sessions.db")
+    assert set(stored) == {kept, changed, added}
+    assert stored[changed][6] == "new"
+
+    assert manager.save_sqlite("sessions.db")
+    assert len(calls) == 2  # nothing changed, nothing written
+
+
+def test_full_and_other_targets_rewrite(manager):
+    calls = spy(manager, "other.db")
+    manager.create("a")
+    manager.save_sqlite("sessions.db")
+    manager.save_sqlite("other.db")
+    manager.create("b")
+    manager.save_sqlite("other.db", full=True)
+    assert calls == ["all", "all"]
+
+
+def test_load_then_save_is_incremental(manager):
+    ids = [manager.create(f"user{i}") for i in range(5)]
+    manager.save_sqlite("sessions.db")
+    other = SessionManager("test")
+    other.load_sqlite("sessions.db")
+    calls = spy(other, "sessions.db")
+    other.remove(ids[0])
+    other.save_sqlite("sessions.db")
+    assert calls == [("changes", set(), {ids[0]})]
+    assert set(rows("sessions.db")) == set(ids[1:])
+    other.close()
+
+
+def test_failed_save_keeps_the_changes(manager):
+    session_id = manager.create("a")
+    manager.save_sqlite("sessions.db")
+    manager.set_value(session_id, "v")
+    backend = manager.storer.sqlite_backend("sessions.db")
+    store_changes = backend.store_changes
+
+    def failing(*args):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    backend.store_changes = failing
+    assert manager.save_sqlite("sessions.db") is False
+    assert session_id in manager.dirty
+    backend.store_changes = store_changes
+    assert manager.save_sqlite("sessions.db")
+    assert rows("sessions.db")[session_id][6] == "v"
@@ -0,0 +1,87 @@
+import pytest
+
+from pysessionmanager import TieredSessionManager
+from pysessionmanager.codes import SessionMessages
+
+
+@pytest.fixture
+def tiered(tmp_path):
+    manager = TieredSessionManager("test", str(tmp_path / "tiered.db"), l1_size=4, flush_interval=3600)
+    yield manager
+    manager.close()
+
+
+def test_changes_are_queued_until_flush(tiered):
+    session_id = tiered.create("a", value="one")
+    assert tiered.backend.load_one(session_id) is None
+    assert session_id in tiered.pending
+    assert tiered.flush() == 1
+    assert tiered.backend.load_one(session_id)["unick_name"] == "a"
+    assert tiered.pending == {}
+
+
+def test_evicted_sessions_stay_in_the_database(tiered):
+    session_ids = [tiered.create(f"user{i}", value=str(i)) for i in range(10)]
+    tiered.flush()
+    assert len(tiered.sessions) == 4
+    first = session_ids[0]
+    assert first not in tiered.sessions
+    assert tiered.backend.load_one(first) is not None
+
+    assert tiered.get_value(first) == "0"
+    assert first in tiered.sessions
+    assert len(tiered.sessions) == 4
+    assert tiered.get_with_unick_name("user1") == session_ids[1]
+
+
+def test_read_through_serves_queued_writes_of_evicted_sessions(tiered):
+    session_ids = [tiered.create(f"user{i}", value=str(i)) for i in range(6)]
+    assert session_ids[0] not in tiered.sessions
+    assert tiered.backend.load_one(session_ids[0]) is None
+    assert tiered.get_value(session_ids[0]) == "0"
+    assert tiered.create("user0") == SessionMessages.SESSION_ALREADY_EXISTS
+
+
+def test_remove_of_an_evicted_session_deletes_the_row(tiered):
+    session_ids = [tiered.create(f"user{i}") for i in range(6)]
+    tiered.flush()
+    assert session_ids[0] not in tiered.sessions
+    tiered.remove(session_ids[0])
+    tiered.flush()
+    assert tiered.backend.load_one(session_ids[0]) is None
+    assert tiered.get(session_ids[0]) == SessionMessages.SESSION_NOT_FOUND
+
+
+def test_bulk_calls_span_more_sessions_than_l1(tiered):
+    session_ids = [tiered.create(f"user{i}") for i in range(10)]
+    tiered.flush()
+    extended = tiered.extend_many(session_ids, 60)
+    assert all(result != SessionMessages.SESSION_NOT_FOUND for result in extended.values())
+    removed = tiered.remove_many(session_ids)
+    assert set(removed) == set(session_ids)
+    tiered.flush()
+    assert tiered.backend.load_all() == {}
+
+
+def test_write_through_stores_before_returning(tmp_path):
+    manager = TieredSessionManager("test", str(tmp_path / "tiered.db"), l1_size=4, flush_interval=3600,
+                                   write_through=True)
+    session_id = manager.create("a", value="one")
+    assert manager.pending == {}
+    manager.set_value(session_id, "two")
+    reader = TieredSessionManager("test", str(tmp_path / "tiered.db"), flush_interval=3600)
+    assert reader.get_value(session_id) == "two"
+    manager.remove(session_id)
+    assert manager.backend.load_one(session_id) is None
+    reader.close()
+    manager.close()
+
+
+def test_close_flushes_the_queue(tmp_path):
+    path = str(tmp_path / "tiered.db")
+    manager = TieredSessionManager("test", path, flush_interval=3600)
+    session_id = manager.create("a", value="one")
+    manager.close()
+    reopened = TieredSessionManager("test", path, flush_interval=3600)
+    assert reopened.get_value(session_id) == "one"
+    reopened.close()
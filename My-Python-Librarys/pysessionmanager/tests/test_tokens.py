@@ -0,0 +1,131 @@
+import time
+
+import pytest
+
+from pysessionmanager import SessionTokens
+from pysessionmanager.codes import SessionMessages
+
+
+def token_hits(manager):
+    return manager.metrics.snapshot()["counters"].get("token_hits", 0)
+
+
+def test_issue_and_verify():
+    tokens = SessionTokens(secret=b"k" * 32)
+    token = tokens.issue("abc-123", 1700000000.5, protected=True)
+    claims = tokens.verify(token)
+    assert claims.session_id == "abc-123"
+    assert claims.expires == 1700000000.5
+    assert claims.protected is True
+    assert tokens.fresh(claims)
+    assert tokens.session_id(token) == "abc-123"
+    assert tokens.session_id("plain-id") == "plain-id"
+
+
+def test_tampered_or_foreign_tokens_are_rejected():
+    tokens = SessionTokens()
+    token = tokens.issue("abc", time.time() + 60)
+    body, _, signature = token.rpartition(".")
+    session_id, expires, issued_at, flags = body.split(".")
+    longer = f"{session_id}.{int(expires, 16) + 10**6:x}.{issued_at}.{flags}.{signature}"
+    assert tokens.verify(longer) is None
+    assert tokens.verify(token[:-1] + ("A" if token[-1] != "A" else "B")) is None
+    assert SessionTokens().verify(token) is None
+    assert tokens.verify(None) is None
+
+
+def test_tokens_go_stale_after_ttl_and_revocation():
+    tokens = SessionTokens(ttl=0.05)
+    claims = tokens.verify(tokens.issue("abc", time.time() + 60))
+    time.sleep(0.06)
+    assert not tokens.fresh(claims)
+
+    tokens = SessionTokens()
+    old = tokens.verify(tokens.issue("abc", time.time() + 60))
+    other = tokens.verify(tokens.issue("other", time.time() + 60))
+    time.sleep(0.002)
+    tokens.revoke(["abc"])
+    time.sleep(0.002)
+    new = tokens.verify(tokens.issue("abc", time.time() + 60))
+    assert not tokens.fresh(old)
+    assert tokens.fresh(other)
+    assert tokens.fresh(new)
+
+    tokens.revoke_all()
+    assert not tokens.fresh(new) and not tokens.fresh(other)
+    assert tokens.revoked == {}
+
+
+def test_revocations_are_dropped_after_ttl():
+    tokens = SessionTokens(ttl=0.01)
+    tokens.revoke(["a", "b"])
+    time.sleep(0.02)
+    tokens.revoke(["c"])
+    assert list(tokens.revoked) == ["c"]
+
+
+def test_fresh_tokens_skip_the_store(manager):
+    manager.enable_metrics()
+    manager.enable_tokens()
+    token = manager.create("alice", value="one")
+    assert manager.tokens.verify(token) is not None
+    assert manager.is_active(token)
+    assert token_hits(manager) == 1
+    assert manager.get_time_remaining(token) > 3500
+    assert manager.get_value(token) == "one"
+    assert manager.get_with_unick_name("alice") == manager.tokens.session_id(token)
+
+
+def test_changes_revoke_the_tokens_issued_so_far(manager):
+    manager.enable_metrics()
+    manager.enable_tokens()
+    locked = manager.create("locked")
+    shortened = manager.create("shortened")
+    removed = manager.create("removed")
+    time.sleep(0.002)
+    manager.lock(locked, "password1")
+    manager.extend_many([manager.tokens.session_id(shortened)], -10)
+    manager.remove(removed)
+
+    assert manager.is_active(locked)  # still active, but answered from the store
+    assert manager.is_active(shortened)
+    assert not manager.is_active(removed)
+    assert token_hits(manager) == 0
+
+    time.sleep(0.002)
+    assert manager.is_active(manager.issue_token(locked))
+    assert token_hits(manager) == 1
+
+
+def test_loading_revokes_every_token(manager):
+    manager.enable_tokens()
+    token = manager.create("alice")
+    manager.save("sessions.json")
+    manager.load("sessions.json")
+    assert not manager.tokens.fresh(manager.tokens.verify(token))
+    assert manager.is_active(token)
+
+
+def test_expired_claims_fall_back_to_the_store(manager):
+    manager.enable_tokens()
+    token = manager.create("alice", duration_seconds=0.05)
+    manager.extend(token, 60)
+    time.sleep(0.06)
+    assert manager.is_active(token)  # the claims say expired, the store knows it was extended
+
+
+def test_disabled_tokens_are_no_longer_accepted(manager):
+    manager.enable_tokens()
+    token = manager.create("alice")
+    manager.disable_tokens()
+    assert manager.get(token) == SessionMessages.SESSION_NOT_FOUND
+
+
+def test_non_ascii_tokens_are_rejected(manager):
+    manager.enable_tokens()
+    token = manager.create("alice")
+    for bad in ("aé.b.c.d.é", token[:-1] + "é", "\ud800.b.c.d.e", token.replace(".", ".\udcff", 1)):
+        assert manager.tokens.verify(bad) is None
+        with pytest.raises(KeyError):  # an unknown session ID, as for any other string
+            manager.is_active(bad)
+    assert manager.get(token[:-1] + "é") == SessionMessages.SESSION_NOT_FOUND